@@ -32,6 +32,9 @@ The :py:mod:`pyPRISM.potential` module provides pair potentials for describing
 the *inter*-molecular interactions in a system. Pairwise interactions are also
 how the chemistry of the system is described.
 
+The :py:mod:`pyPRISM.sweep` module provides drivers for efficiently solving
+series of related systems e.g. parameter sweeps in temperature or density.
+
 The :py:mod:`pyPRISM.trajectory` module contains classes for working with
 molecular simulation trajectories.
 
@@ -55,6 +58,9 @@ from pyPRISM import calculate
 from pyPRISM import closure
 from pyPRISM import potential
 from pyPRISM import omega
+from pyPRISM import sweep
+from pyPRISM.sweep import solve_many
+from pyPRISM.sweep import solve_batch
 
 from pyPRISM import util
 
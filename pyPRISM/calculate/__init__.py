@@ -22,3 +22,5 @@ from pyPRISM.calculate.spinodal_condition  import spinodal_condition
 from pyPRISM.calculate.initial_guess       import initial_guess
 from pyPRISM.calculate.refDirectCorr       import refDirectCorr
 from pyPRISM.calculate.refTotalCorr        import refTotalCorr
+from pyPRISM.calculate.hard_sphere_py      import hard_sphere_py
+from pyPRISM.calculate.hard_sphere_guess   import hard_sphere_guess
@@ -0,0 +1,52 @@
+#!python
+from pyPRISM.calculate.hard_sphere_py import hard_sphere_py
+
+def hard_sphere_guess(sys):
+    r'''Calculate an initial guess from the analytical Percus-Yevick hard-sphere solution
+
+    Parameters
+    ----------
+    sys: pyPRISM.core.System
+        A System of atomic sites with the site densities and diameters set.
+
+    Returns
+    -------
+    guess: np.ndarray, size (rank*rank*length)
+        Array of guess values for :math:`\gamma_{\alpha,\beta}(r) =
+        h_{\alpha,\beta}(r) - c_{\alpha,\beta}(r)` which can be passed to the
+        solve methods of :class:`pyPRISM.core.PRISM`
+
+
+    **Description**
+
+        The hard-sphere mixture with the site diameters of the System is a
+        good reference for systems whose potentials are dominated by the
+        repulsive cores, e.g. Weeks-Chandler-Andersen or weakly attractive
+        Lennard-Jones sites. Starting from this guess rather than from zeros
+        typically saves a large fraction of the nonlinear iterations.
+
+        For atomic hard-sphere systems with Percus-Yevick closures, the PRISM
+        solve methods use this guess automatically if no guess is given.
+
+    Example
+    -------
+    .. code-block:: python
+
+        import pyPRISM
+
+        sys = pyPRISM.System(['A','B'])
+
+        # ** populate system variables **
+
+        guess = pyPRISM.calculate.hard_sphere_guess(sys)
+
+        PRISM = sys.createPRISM()
+
+        PRISM.solve(guess)
+
+    '''
+    directCorr,totalCorr = hard_sphere_py(sys)
+
+    guess = totalCorr.data - directCorr.data
+
+    return guess.reshape((-1,))
@@ -0,0 +1,176 @@
+#!python
+from pyPRISM.core.Space import Space
+from pyPRISM.core.MatrixArray import MatrixArray
+from pyPRISM.omega.SingleSite import SingleSite
+from pyPRISM.omega.NoIntra import NoIntra
+import numpy as np
+
+def hard_sphere_py(sys):
+    r'''Calculate the analytical Percus-Yevick solution of a hard-sphere mixture
+
+    Parameters
+    ----------
+    sys: pyPRISM.core.System
+        A System of atomic sites with the site densities and diameters set.
+        The potentials and closures of the System are not used.
+
+    Returns
+    -------
+    directCorr: pyPRISM.core.MatrixArray
+        Real-space direct correlation functions
+
+    totalCorr: pyPRISM.core.MatrixArray
+        Real-space total correlation functions
+
+
+    **Mathematical Definition**
+
+    .. math::
+
+        r c_{\alpha,\beta}(r) = -Q^{\prime}_{\alpha,\beta}(r) + 2\pi\sum_{\lambda}\rho_{\lambda}
+        \int_{S_{\lambda,\alpha}}^{R_{\lambda,\alpha}} Q_{\lambda,\alpha}(t)\,
+        Q^{\prime}_{\lambda,\beta}(r+t)\,dt
+
+    .. math::
+
+        Q_{\alpha,\beta}(r) = \frac{1}{2}a_{\alpha}(r^2 - R_{\alpha,\beta}^2) + b_{\alpha}(r - R_{\alpha,\beta})
+
+    .. math::
+
+        a_{\alpha} = \frac{1 - \xi_3 + 3\sigma_{\alpha}\xi_2}{(1 - \xi_3)^2}
+        \qquad
+        b_{\alpha} = -\frac{3\sigma_{\alpha}^2\xi_2}{2(1 - \xi_3)^2}
+        \qquad
+        \xi_n = \frac{\pi}{6}\sum_{\lambda}\rho_{\lambda}\sigma_{\lambda}^n
+
+    .. math::
+
+        \hat{H}(k) = (I - \hat{C}(k)\rho)^{-1}\hat{C}(k)
+
+    **Variable Definitions**
+
+        - :math:`c_{\alpha,\beta}(r)`
+            Direct correlation function between site types :math:`\alpha`
+            and :math:`\beta` with :math:`\sigma_{\alpha}\leq\sigma_{\beta}`
+
+        - :math:`Q_{\alpha,\beta}(r)`
+            Baxter factor function, which is non-zero for
+            :math:`S_{\alpha,\beta} < r < R_{\alpha,\beta}`
+
+        - :math:`R_{\alpha,\beta}, S_{\alpha,\beta}`
+            :math:`(\sigma_{\alpha}+\sigma_{\beta})/2` and
+            :math:`(\sigma_{\alpha}-\sigma_{\beta})/2`
+
+        - :math:`\sigma_{\alpha}, \rho_{\alpha}`
+            Diameter and number density of site type :math:`\alpha`
+
+        - :math:`\rho`
+            Diagonal matrix of the site number densities
+
+    **Description**
+
+        The Percus-Yevick closure is exactly solvable for additive mixtures
+        of hard spheres. This function evaluates Baxter's solution for the
+        direct correlation functions in closed form on the Real-space grid
+        of the System's domain. The total correlation functions are then
+        obtained from the atomic Ornstein-Zernike equation using the
+        domain's transforms.
+
+        The result is the PY solution of the hard-sphere mixture with the
+        site diameters of the System, independent of the potentials and
+        closures stored in the System. This makes it a useful reference for
+        soft-potential systems with similar diameters (see
+        :func:`pyPRISM.calculate.hard_sphere_guess`).
+
+    .. warning::
+
+        Only atomic systems are supported, i.e. every intra-molecular
+        correlation function on the diagonal must be
+        :class:`pyPRISM.omega.SingleSite` and every other one
+        :class:`pyPRISM.omega.NoIntra`.
+
+
+    Example
+    -------
+    .. code-block:: python
+
+        import pyPRISM
+
+        sys = pyPRISM.System(['A','B'])
+        sys.domain = pyPRISM.Domain(dr=0.01,length=4096)
+        sys.density['A'] = 0.3
+        sys.density['B'] = 0.1
+        sys.diameter['A'] = 1.0
+        sys.diameter['B'] = 1.5
+        sys.omega['A','A'] = pyPRISM.omega.SingleSite()
+        sys.omega['A','B'] = pyPRISM.omega.NoIntra()
+        sys.omega['B','B'] = pyPRISM.omega.SingleSite()
+
+        directCorr,totalCorr = pyPRISM.calculate.hard_sphere_py(sys)
+
+        rdf_AB = totalCorr['A','B'] + 1.0
+
+    '''
+
+    for (i,j),(t1,t2),omega in sys.omega.iterpairs():
+        if i==j:
+            atomic = isinstance(omega,SingleSite)
+        else:
+            atomic = isinstance(omega,NoIntra)
+        if not atomic:
+            raise ValueError('The Percus-Yevick hard-sphere solution is only available for atomic systems!')
+
+    sys.density.check()
+    sys.diameter.check()
+
+    rank = sys.rank
+    r = sys.domain.r
+    rho = np.array([sys.density[t] for t in sys.types],dtype=float)
+    sigma = np.array([sys.diameter[t] for t in sys.types],dtype=float)
+
+    xi2 = np.pi/6.0 * np.sum(rho*sigma**2)
+    xi3 = np.pi/6.0 * np.sum(rho*sigma**3)
+    a = (1.0 - xi3 + 3.0*sigma*xi2)/(1.0 - xi3)**2
+    b = -1.5*sigma**2*xi2/(1.0 - xi3)**2
+
+    R = (sigma[:,np.newaxis] + sigma[np.newaxis,:])/2.0
+    S = (sigma[:,np.newaxis] - sigma[np.newaxis,:])/2.0
+
+    # polynomial coefficients of Q_ij(t) = q2*t**2 + q1*t + q0
+    q2 = np.repeat(0.5*a[:,np.newaxis],rank,axis=1)
+    q1 = np.repeat(b[:,np.newaxis],rank,axis=1)
+    q0 = -(q2*R**2 + q1*R)
+
+    directCorr = MatrixArray(length=sys.domain.length,rank=rank,space=Space.Real,types=sys.types)
+    for m in range(rank):
+        for n in range(m,rank):
+            # The factorization is only valid for r>S_ij, so it is always
+            # evaluated with the smaller site as the first index
+            i,j = (m,n) if sigma[m]<=sigma[n] else (n,m)
+
+            rc = np.where(r<R[i,j],-(2.0*q2[i,j]*r + q1[i,j]),0.0)
+            for l in range(rank):
+                lo = np.maximum(S[l,i],S[l,j] - r)
+                hi = np.minimum(R[l,i],R[l,j] - r)
+
+                # Q_li(t) multiplied by Q'_lj(r+t) = p1*t + p0
+                p1 = 2.0*q2[l,j]
+                p0 = 2.0*q2[l,j]*r + q1[l,j]
+                c3 = q2[l,i]*p1
+                c2 = q2[l,i]*p0 + q1[l,i]*p1
+                c1 = q1[l,i]*p0 + q0[l,i]*p1
+                c0 = q0[l,i]*p0
+                F = lambda t: ((c3/4.0*t + c2/3.0)*t + c1/2.0)*t**2 + c0*t
+                rc += 2.0*np.pi*rho[l]*np.where(hi>lo,F(hi) - F(lo),0.0)
+
+            directCorr.data[:,i,j] = rc/r
+            directCorr.data[:,j,i] = rc/r
+
+    totalCorr = directCorr.get_copy()
+    sys.domain.MatrixArray_to_fourier(totalCorr)
+    C = totalCorr.data
+    IC = np.eye(rank) - C*rho[np.newaxis,np.newaxis,:]
+    totalCorr.data = np.linalg.solve(IC,C)
+    sys.domain.MatrixArray_to_real(totalCorr)
+
+    return directCorr,totalCorr
@@ -1,11 +1,60 @@
 #!python
 import numpy as np
 class AtomicClosure:
-    '''Baseclass for all atomic closures
+    r'''Baseclass for all atomic closures
     
     Note
     ----
-    Currently, this class doesn't do anything besides group all of the
-    *atomic* closures under a single inheritance heirarchy. 
+    Besides grouping all of the *atomic* closures under a single inheritance
+    heirarchy, this class defines the kernel interface. Closures which
+    implement kernel(gamma,potential) as a staticmethod are evaluated for
+    all pairs of sites with the same closure in a single vectorized call by
+    :class:`pyPRISM.core.PRISM`. Closures which leave kernel as None are
+    evaluated pair-by-pair via calculate(r,gamma).
+
+    Closures may also implement derivative(gamma,potential), the derivative
+    of the closure relation with respect to :math:`\gamma`, as a
+    staticmethod. This is used for exact Jacobian-vector products in
+    :func:`pyPRISM.core.PRISM.PRISM.jvp`.
+
+    Closures whose direct correlation function does not depend on
+    :math:`\gamma` at all set depends_on_gamma to False. If this is true of
+    all closures in a System, :class:`pyPRISM.core.PRISM` calculates the
+    solution directly rather than iteratively. Closures whose direct
+    correlation function is an affine function of :math:`\gamma`, including
+    the hard core condition, set affine to True. If this is true of all
+    closures in a System, :func:`pyPRISM.core.PRISM.PRISM.solve` uses
+    :func:`pyPRISM.core.PRISM.PRISM.solve_newton` in place of the krylov
+    method.
     '''
+    kernel = None
+    derivative = None
+    depends_on_gamma = True
+    affine = False
+
+    def calculate_derivative(self,r,gamma):
+        r'''Derivative of the direct correlation function with respect to :math:`\gamma`
+
+        Arguments
+        ---------
+        r: np.ndarray
+            array of real-space values associated with :math:`\gamma`
+
+        gamma: np.ndarray
+            array of :math:`\gamma` values at which the derivative is
+            evaluated
+        '''
+        if self.derivative is None:
+            raise NotImplementedError('{} does not define a derivative'.format(type(self).__name__))
+
+        assert self.potential is not None,'Potential for this closure is not set!'
+        if self.apply_hard_core:
+            assert self.sigma is not None, 'If apply_hard_core=True, sigma parameter must be set!'
+            # inside the core, c = -1 - gamma
+            value = -np.ones_like(gamma)
+            mask = r>self.sigma
+            value[mask] = self.derivative(gamma[mask],self.potential[mask])
+        else:
+            value = self.derivative(gamma,self.potential)
+        return value
         
@@ -108,6 +108,25 @@ class HyperNettedChain(AtomicClosure):
 
         
         
+    @staticmethod
+    def kernel(gamma,potential):
+        r'''Closure relation without the hard core condition
+
+        Arguments
+        ---------
+        gamma: np.ndarray
+            :math:`\gamma` values of any shape
+
+        potential: np.ndarray
+            potential values (divided by kT) of the same shape as gamma
+        '''
+        return np.exp(gamma - potential) - 1.0 - gamma
+
+    @staticmethod
+    def derivative(gamma,potential):
+        r'''Derivative of the closure relation with respect to gamma (see kernel)'''
+        return np.exp(gamma - potential) - 1.0
+
     def calculate(self,r,gamma):
         '''Calculate direct correlation function based on supplied :math:`\gamma`
 
@@ -134,9 +153,9 @@ class HyperNettedChain(AtomicClosure):
 
             # calculate closure outside hard core
             mask = r>self.sigma
-            self.value[mask] = np.exp(gamma[mask] - self.potential[mask]) - 1.0 - gamma[mask]
+            self.value[mask] = self.kernel(gamma[mask],self.potential[mask])
         else:
-            self.value = np.exp(gamma - self.potential) - 1.0 - gamma
+            self.value = self.kernel(gamma,self.potential)
 
         
         return self.value
@@ -101,6 +101,26 @@ class MartynovSarkisov(AtomicClosure):
     def __repr__(self):
         return '<AtomicClosure: MartynovSarkisov>'
     
+    @staticmethod
+    def kernel(gamma,potential):
+        r'''Closure relation without the hard core condition
+
+        Arguments
+        ---------
+        gamma: np.ndarray
+            :math:`\gamma` values of any shape
+
+        potential: np.ndarray
+            potential values (divided by kT) of the same shape as gamma
+        '''
+        return np.exp(np.sqrt(gamma - potential + 0.5) - 1.0) - 1.0 - gamma
+
+    @staticmethod
+    def derivative(gamma,potential):
+        r'''Derivative of the closure relation with respect to gamma (see kernel)'''
+        s = np.sqrt(gamma - potential + 0.5)
+        return np.exp(s - 1.0)/(2.0*s) - 1.0
+
     def calculate(self,r,gamma):
         '''Calculate direct correlation function based on supplied :math:`\gamma`
 
@@ -128,9 +148,9 @@ class MartynovSarkisov(AtomicClosure):
 
             # calculate closure outside hard core
             mask = r>self.sigma
-            self.value[mask] = np.exp(np.sqrt(gamma[mask] - self.potential[mask] + 0.5) - 1.0) - 1.0 - gamma[mask]
+            self.value[mask] = self.kernel(gamma[mask],self.potential[mask])
         else:
-            self.value = np.exp(np.sqrt(gamma - self.potential + 0.5) - 1.0) - 1.0 - gamma
+            self.value = self.kernel(gamma,self.potential)
 
         
         return self.value
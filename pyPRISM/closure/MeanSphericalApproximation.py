@@ -83,10 +83,37 @@ class MeanSphericalApproximation(AtomicClosure):
                     interactions are not being used.''')
 
         
+    # c is affine in gamma, also inside the hard core
+    affine = True
+
+    @property
+    def depends_on_gamma(self):
+        '''Without the hard core condition, this closure does not depend on gamma'''
+        return self.apply_hard_core
+
     def __repr__(self):
         return '<AtomicClosure: MeanSphericalApproximation>'
     
         
+    @staticmethod
+    def kernel(gamma,potential):
+        r'''Closure relation without the hard core condition
+
+        Arguments
+        ---------
+        gamma: np.ndarray
+            :math:`\gamma` values of any shape
+
+        potential: np.ndarray
+            potential values (divided by kT) of the same shape as gamma
+        '''
+        return np.zeros_like(gamma) - potential
+
+    @staticmethod
+    def derivative(gamma,potential):
+        r'''Derivative of the closure relation with respect to gamma (see kernel)'''
+        return np.zeros_like(gamma)
+
     def calculate(self,r,gamma):
         '''Calculate direct correlation function based on supplied :math:`\gamma`
 
@@ -111,9 +138,9 @@ class MeanSphericalApproximation(AtomicClosure):
 
             # calculate closure outside hard core
             mask = r>self.sigma
-            self.value[mask] = -self.potential[mask]
+            self.value[mask] = self.kernel(gamma[mask],self.potential[mask])
         else:
-            self.value = -self.potential
+            self.value = self.kernel(gamma,self.potential)
 
         
         return self.value
@@ -3,11 +3,78 @@
 import numpy as np
 
 class MolecularClosure:
-    '''Baseclass for all *molecular* closures
+    r'''Baseclass for all *molecular* closures
     
     .. note::
 
-        Currently, this class doesn't do anything besides group all of the
-        *molecular* closures under a single inheritance heirarchy. 
+        Besides grouping all of the *molecular* closures under a single
+        inheritance heirarchy, this class provides a cache for the
+        convolutions of the potential and reference correlation functions
+        which do not depend on :math:`\gamma` and therefore only need to be
+        calculated once per solve.
+
+        As for :class:`pyPRISM.closure.AtomicClosure`, closures whose direct
+        correlation function does not depend on :math:`\gamma` at all set
+        depends_on_gamma to False and closures which are affine in
+        :math:`\gamma` set affine to True.
     '''
-        
+    depends_on_gamma = True
+    affine = False
+
+    def __getstate__(self):
+        # cached transforms are derived data and are not copied or pickled
+        state = self.__dict__.copy()
+        state.pop('_transforms',None)
+        return state
+
+    def _cached(self,name,compute,*inputs):
+        '''Return compute(), only re-evaluating it if any of the inputs change
+
+        Arguments
+        ---------
+        name: str
+            Name of the cached quantity
+
+        compute: callable
+            Function of no arguments which calculates the quantity
+
+        inputs: np.ndarray or float
+            Everything the quantity depends on. These are compared by value
+            with the inputs of the cached evaluation.
+        '''
+        transforms = self.__dict__.setdefault('_transforms',{})
+        if name in transforms:
+            saved,value = transforms[name]
+            if all(np.array_equal(old,new) for old,new in zip(saved,inputs)):
+                return value
+
+        value = compute()
+        transforms[name] = ([np.array(x,copy=True) for x in inputs],value)
+        return value
+
+    def _convolute(self,domain,array,omega_k_i,omega_k_j):
+        r'''Real-space convolution of array with :math:`\hat{\omega}_{\alpha,\alpha}` and :math:`\hat{\omega}_{\beta,\beta}`'''
+        array_k = domain.to_fourier(array)
+        return domain.to_real(omega_k_i*array_k*omega_k_j)
+
+    def _masked_potential(self,r):
+        '''Copy of the potential with the hard core (r<=sigma) set to zero'''
+        # We need to set the potential for r<=sigma equal to 0 for the fft to work correctly
+        # IMPORTANT: Use np.copy() to avoid modifying self.potential in place
+        potential_calculation = np.copy(self.potential)
+        potential_calculation[r<=self.sigma] = 0.0
+        return potential_calculation
+
+    def calculate_derivative(self,domain,gamma,omega_k_i,omega_k_j,cr0,hk0,hk):
+        r'''Derivative of the direct correlation function with respect to :math:`\gamma`
+
+        The arguments are identical to those of calculate. This default
+        applies to closures which only depend on :math:`\gamma` through the
+        hard core condition (i.e. :math:`c=-1-\gamma` inside the core). Any
+        dependence on the total correlation function of the previous
+        iteration (hk) is treated as fixed.
+        '''
+        value = np.zeros_like(gamma)
+        if self.apply_hard_core:
+            value[domain.r <= self.sigma] = -1.0
+        return value
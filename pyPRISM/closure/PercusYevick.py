@@ -84,6 +84,25 @@ class PercusYevick(AtomicClosure):
     def __repr__(self):
         return '<AtomicClosure: PercusYevick>'
     
+    @staticmethod
+    def kernel(gamma,potential):
+        r'''Closure relation without the hard core condition
+
+        Arguments
+        ---------
+        gamma: np.ndarray
+            :math:`\gamma` values of any shape
+
+        potential: np.ndarray
+            potential values (divided by kT) of the same shape as gamma
+        '''
+        return (np.exp(-potential)-1.0)*(1.0+gamma)
+
+    @staticmethod
+    def derivative(gamma,potential):
+        r'''Derivative of the closure relation with respect to gamma (see kernel)'''
+        return (np.exp(-potential)-1.0)*np.ones_like(gamma)
+
     def calculate(self,r,gamma):
         '''Calculate direct correlation function based on supplied :math:`\gamma`
 
@@ -110,9 +129,9 @@ class PercusYevick(AtomicClosure):
 
             # calculate closure outside hard core
             mask = r>self.sigma
-            self.value[mask] = (np.exp(-self.potential[mask])-1.0)*(1.0+gamma[mask])
+            self.value[mask] = self.kernel(gamma[mask],self.potential[mask])
         else:
-            self.value = (np.exp(-self.potential)-1.0)*(1.0+gamma)
+            self.value = self.kernel(gamma,self.potential)
 
         
         return self.value
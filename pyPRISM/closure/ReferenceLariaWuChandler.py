@@ -76,6 +76,24 @@ class ReferenceLariaWuChandler(MolecularClosure):
     def __repr__(self):
         return '<MolecularClosure: ReferenceMolecularPercusYevick>'
     
+    def _reference(self,domain,omega_k_i,omega_k_j,cr0,hk0):
+        '''Real-space reference total correlation function and convoluted potential and reference direct correlation function'''
+        r = domain.r
+        # None of these depend on gamma and they are only recalculated when
+        # the potential, omega or reference correlation functions change
+        hr0 = self._cached('hr0',lambda: Domain.to_real(domain,array=hk0),r,hk0)
+        convoluted_potential_r = self._cached(
+            'convoluted_potential_r',
+            lambda: self._convolute(domain,self._masked_potential(r),omega_k_i,omega_k_j),
+            r,self.potential,self.sigma,omega_k_i,omega_k_j
+        )
+        convoluted_cr0 = self._cached(
+            'convoluted_cr0',
+            lambda: self._convolute(domain,cr0,omega_k_i,omega_k_j),
+            r,cr0,omega_k_i,omega_k_j
+        )
+        return hr0,convoluted_potential_r,convoluted_cr0
+
     def calculate(self,domain,gamma,omega_k_i,omega_k_j,cr0,hk0,hk):
         r'''Calculate direct correlation function
 
@@ -98,22 +116,7 @@ class ReferenceLariaWuChandler(MolecularClosure):
         
         assert len(gamma) == len(self.potential),'Domain mismatch!'
 
-        hr = Domain.to_real(domain,array=hk)
-        hr0 = Domain.to_real(domain,array=hk0)
-
-        # We need to set the potential for r<=sigma equal to 0 for the fft to work correctly
-        # IMPORTANT: Use np.copy() to avoid modifying self.potential in place
-        potential_calculation = np.copy(self.potential)
-        mask = r<=self.sigma
-        potential_calculation[mask]=0.0
-
-        potential_k = Domain.to_fourier(domain,array=potential_calculation)
-        convoluted_potential_k = omega_k_i*potential_k*omega_k_j
-        convoluted_potential_r = Domain.to_real(domain,array=convoluted_potential_k)
-
-        cr0_k = Domain.to_fourier(domain,array=cr0)        
-        convoluted_cr0_k = omega_k_i*cr0_k*omega_k_j
-        convoluted_cr0 = Domain.to_real(domain,array=convoluted_cr0_k)
+        hr0,convoluted_potential_r,convoluted_cr0 = self._reference(domain,omega_k_i,omega_k_j,cr0,hk0)
 
         if self.apply_hard_core:
             self.value = -1 - gamma
@@ -127,6 +130,18 @@ class ReferenceLariaWuChandler(MolecularClosure):
         
         return self.value
 
+    def calculate_derivative(self,domain,gamma,omega_k_i,omega_k_j,cr0,hk0,hk):
+        r'''Derivative of the direct correlation function with respect to :math:`\gamma`
+
+        The arguments are identical to those of :func:`calculate`.
+        '''
+        r=domain.r
+        hr0,convoluted_potential_r,convoluted_cr0 = self._reference(domain,omega_k_i,omega_k_j,cr0,hk0)
+        value = (hr0+1.0)*np.exp(convoluted_cr0-convoluted_potential_r+gamma-hr0)-1.0
+        if self.apply_hard_core:
+            value[r <= self.sigma] = -1.0
+        return value
+
 class RLWC(ReferenceLariaWuChandler):
     '''Alias of ReferenceLariaWuChandler'''
     pass
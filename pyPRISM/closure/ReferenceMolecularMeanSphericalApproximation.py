@@ -86,6 +86,14 @@ class ReferenceMolecularMeanSphericalApproximation(MolecularClosure):
                     interactions are not being used.''')
 
         
+    # c is affine in gamma, also inside the hard core
+    affine = True
+
+    @property
+    def depends_on_gamma(self):
+        '''Without the hard core condition, this closure does not depend on gamma'''
+        return self.apply_hard_core
+
     def __repr__(self):
         return '<MolecularClosure:ReferenceMolecularMeanSphericalApproximation>'
     
@@ -108,19 +116,18 @@ class ReferenceMolecularMeanSphericalApproximation(MolecularClosure):
         
         assert len(gamma) == len(self.potential),'Domain mismatch!'
     
-        # We need to set the potential for r<=sigma equal to 0 for the fft to work correctly
-        # IMPORTANT: Use np.copy() to avoid modifying self.potential in place
-        potential_calculation = np.copy(self.potential)
-        mask = r<=self.sigma
-        potential_calculation[mask]=0.0
-
-        cr0_k = Domain.to_fourier(domain,array=cr0)
-        convoluted_cr0_k = omega_k_i*cr0_k*omega_k_j
-        convoluted_cr0=Domain.to_real(domain,array=convoluted_cr0_k)
-
-        potential_k = Domain.to_fourier(domain,array=potential_calculation)
-        convoluted_potential_k = omega_k_i*potential_k*omega_k_j
-        convoluted_potential = Domain.to_real(domain,array=convoluted_potential_k)
+        # None of these depend on gamma and they are only recalculated when
+        # the potential, omega or reference correlation functions change
+        convoluted_cr0 = self._cached(
+            'convoluted_cr0',
+            lambda: self._convolute(domain,cr0,omega_k_i,omega_k_j),
+            r,cr0,omega_k_i,omega_k_j
+        )
+        convoluted_potential = self._cached(
+            'convoluted_potential',
+            lambda: self._convolute(domain,self._masked_potential(r),omega_k_i,omega_k_j),
+            r,self.potential,self.sigma,omega_k_i,omega_k_j
+        )
 
         if self.apply_hard_core:
             self.value = -1 - gamma
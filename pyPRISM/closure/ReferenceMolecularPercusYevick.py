@@ -100,20 +100,22 @@ class ReferenceMolecularPercusYevick(MolecularClosure):
 
         hr = Domain.to_real(domain,array=hk)
 
-        # We need to set the potential for r<=sigma equal to 0 for the fft to work correctly
-        # IMPORTANT: Use np.copy() to avoid modifying self.potential in place
-        potential_calculation = np.copy(self.potential)
-        mask = r<=self.sigma
-        potential_calculation[mask]=0.0
-
-        exp_potential_r = (np.exp(+potential_calculation) - 1.0) * ( hr + 1.0)
-        exp_potential_k = Domain.to_fourier(domain,array=exp_potential_r)
-        exp_potential_k = omega_k_i*exp_potential_k*omega_k_j
-        exp_potential_r = Domain.to_real(domain,array=exp_potential_k)
-
-        cr0_k = Domain.to_fourier(domain,array=cr0)        
-        convoluted_cr0_k = omega_k_i*cr0_k*omega_k_j
-        convoluted_cr0 = Domain.to_real(domain,array=convoluted_cr0_k)
+        # The Mayer function of the potential and the convoluted reference
+        # direct correlation function do not depend on gamma and are only
+        # recalculated when their inputs change
+        mayer = self._cached(
+            'mayer',
+            lambda: np.exp(+self._masked_potential(r)) - 1.0,
+            r,self.potential,self.sigma
+        )
+        exp_potential_r = mayer * ( hr + 1.0)
+        exp_potential_r = self._convolute(domain,exp_potential_r,omega_k_i,omega_k_j)
+
+        convoluted_cr0 = self._cached(
+            'convoluted_cr0',
+            lambda: self._convolute(domain,cr0,omega_k_i,omega_k_j),
+            r,cr0,omega_k_i,omega_k_j
+        )
 
         if self.apply_hard_core:
             self.value = -1 - gamma
@@ -0,0 +1,164 @@
+#!python
+import numpy as np
+
+class AndersonMixing:
+    r'''Anderson (DIIS) mixing of a stack of independent fixed-point problems
+
+    **Description**
+
+        Holds the iterate, residual, mixing history and mixing fraction of
+        each of B problems along a leading axis of (B,size) arrays. The
+        caller evaluates the residuals (e.g. with
+        :func:`pyPRISM.core.PRISM.PRISM.cost`) of the inputs suggested by
+        :func:`propose` and passes them to :func:`update`. Both methods work
+        on any subset of the members so that converged members can be
+        frozen.
+
+        Each new input is extrapolated from the linear combination of the
+        previous iterates of the member which minimizes its residual in a
+        least-squares sense. Steps which more than double the residual (or
+        produce non-finite values) are rejected, the history of the member is
+        restarted, and its mixing fraction is halved. The residual must
+        double in both its largest absolute value and its 2-norm, so that a
+        spike at a single point (e.g. at a core boundary) does not reject
+        an otherwise good step. If a step is rejected at the smallest mixing
+        fraction (1% of the initial one) with no history to restart, the
+        member has failed. After each accepted step, the mixing fraction
+        slowly recovers towards its initial value.
+
+        This is used by :func:`pyPRISM.core.PRISM.PRISM.solve_anderson` (with
+        a single member) and :func:`pyPRISM.core.BatchPRISM.BatchPRISM.solve`.
+
+    Attributes
+    ----------
+    x,f: np.ndarray, size (B,size)
+        Last accepted input and residual of each member
+
+    error: np.ndarray, size (B)
+        Largest absolute residual of each member
+
+    norm: np.ndarray, size (B)
+        Weighted 2-norm of the residual of each member
+    '''
+    def __init__(self,x,f,depth=5,step=0.5,weight=None):
+        r'''Constructor
+
+        Arguments
+        ---------
+        x,f: np.ndarray, size (B,size)
+            Initial input and residual of each member
+
+        depth: int
+            Maximum number of previous iterates used in the extrapolation. A
+            depth of zero reduces this method to damped Picard iteration.
+
+        step: float
+            Initial (and maximum) mixing fraction
+
+        weight: np.ndarray, size (size), *optional*
+            Weight of each element in the least-squares problem and the
+            2-norm of the residual, e.g. 2 for the off-diagonal pairs of a
+            packed layout so that it is mixed exactly as the full layout.
+            Defaults to equal weights.
+        '''
+        self.x = np.array(x,dtype=float)
+        self.f = np.array(f,dtype=float)
+        self.error = np.max(np.abs(self.f),axis=-1)
+        self.depth = depth
+        self.step = step
+        self.beta = np.full(len(self.x),step)
+        self.beta_min = 1.0E-2*step
+        self.scale = None if weight is None else np.sqrt(weight)
+        self.norm = self._norm(self.f)
+
+        # history of each member stored in a ring of depth slots
+        self.dX = np.zeros(self.x.shape[:1]+(depth,)+self.x.shape[1:])
+        self.dF = np.zeros_like(self.dX)
+        self.history = np.zeros(len(self.x),dtype=int)
+
+    def __repr__(self):
+        return '<AndersonMixing members:{} depth:{}>'.format(len(self.x),self.depth)
+
+    def propose(self,index):
+        '''Next input of the members in index'''
+        x_new = self.x[index] + self.beta[index,np.newaxis]*self.f[index]
+        if self.depth>0:
+            x_new -= self._extrapolate(self.dX[index],self.dF[index],self.f[index],self.beta[index],self.history[index],self.scale)
+        return x_new
+
+    def update(self,index,x_new,f_new):
+        '''Accept or reject the proposed inputs of the members in index
+
+        Arguments
+        ---------
+        index: np.ndarray
+            Members which were evaluated
+
+        x_new,f_new: np.ndarray, size (len(index),size)
+            Proposed inputs and their residuals
+
+        Returns
+        -------
+        accept: np.ndarray of bool
+            Whether the step of each member in index was accepted
+
+        failed: np.ndarray of bool
+            Whether each member in index failed, i.e. its step was rejected
+            at the smallest mixing fraction without any history to restart
+        '''
+        index = np.asarray(index)
+        error_new = np.max(np.abs(f_new),axis=-1)
+        norm_new = self._norm(f_new)
+
+        # Reject steps which more than double the residual (or produce
+        # non-finite values): restart the history and retry from the
+        # current iterate with a smaller step. Members which cannot be
+        # retried have failed.
+        reject = ~((error_new<=2.0*self.error[index]) | (norm_new<=2.0*self.norm[index]))
+        retry = reject & ((self.history[index]>0) | (self.beta[index]>self.beta_min))
+        failed = reject & ~retry
+        accept = ~(retry | failed)
+
+        retried = index[retry]
+        self.beta[retried] = np.maximum(0.5*self.beta[retried],self.beta_min)
+        self.history[retried] = 0
+
+        accepted = index[accept]
+        self.beta[accepted] = np.minimum(1.1*self.beta[accepted],self.step)
+        if self.depth>0:
+            slot = self.history[accepted] % self.depth
+            self.dX[accepted,slot] = x_new[accept] - self.x[accepted]
+            self.dF[accepted,slot] = f_new[accept] - self.f[accepted]
+            self.history[accepted] += 1
+        self.x[accepted] = x_new[accept]
+        self.f[accepted] = f_new[accept]
+        self.error[accepted] = error_new[accept]
+        self.norm[accepted] = norm_new[accept]
+
+        return accept,failed
+
+    def _norm(self,f):
+        '''Weighted 2-norm of each row of f'''
+        if self.scale is not None:
+            f = f*self.scale
+        return np.linalg.norm(f,axis=-1)
+
+    @staticmethod
+    def _extrapolate(dX,dF,f,beta,history,scale=None):
+        '''Anderson correction of each member from its own history
+
+        The least-squares problem of each member is solved with a batched
+        pseudo-inverse so that all members can be solved in one call. Unused
+        history slots are zeroed and so do not contribute. The residuals are
+        multiplied by scale (the square root of the weights), if given.
+        '''
+        depth = dX.shape[1]
+        used = np.arange(depth)<np.minimum(history,depth)[:,np.newaxis]
+        DF = dF*used[:,:,np.newaxis]
+        A,b = DF,f
+        if scale is not None:
+            A,b = DF*scale,f*scale
+        rcond = np.finfo(float).eps*max(dF.shape[1:])
+        coeffs = np.matmul(np.linalg.pinv(A.transpose(0,2,1),rcond=rcond),b[:,:,np.newaxis])
+        coeffs = coeffs.transpose(0,2,1)
+        return np.matmul(coeffs,dX)[:,0] + beta[:,np.newaxis]*np.matmul(coeffs,DF)[:,0]
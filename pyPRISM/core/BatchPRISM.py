@@ -0,0 +1,309 @@
+#!python
+from pyPRISM.core.Space import Space
+from pyPRISM.core.MatrixArray import MatrixArray
+from pyPRISM.core.PRISM import PRISM
+from pyPRISM.core.AndersonMixing import AndersonMixing
+
+from scipy.optimize import OptimizeResult
+from scipy.fft import dst
+
+import numpy as np
+
+class BatchPRISM:
+    r'''Many same-shape PRISM problems evaluated and solved as one stacked problem
+
+    **Description**
+
+        Sweeps often require solving many small Systems (e.g. hundreds of
+        binary blends at different temperatures). Solved one at a time, such
+        calculations are dominated by the Python and LAPACK overhead of
+        operating on tiny per-wavenumber matrices rather than by arithmetic.
+        This class stacks B Systems which share the Domain length and rank
+        into (B,length,rank,rank) arrays so that the closures, transforms,
+        and PRISM equation inversions of all members are carried out with a
+        few large NumPy calls in :func:`cost`.
+
+        The members are solved together by :func:`solve` using the Anderson
+        mixing scheme of :func:`pyPRISM.core.PRISM.PRISM.solve_anderson`
+        (see :class:`pyPRISM.core.AndersonMixing.AndersonMixing`).
+        The mixing history, step size and convergence of each member are
+        tracked separately. Converged (or failed) members are frozen and
+        dropped from subsequent evaluations of :func:`cost`.
+
+        The Systems may differ in all parameters (e.g. temperature,
+        densities, diameters, potentials, omega, and grid spacing) but must
+        use the same closure class for each pair and only atomic closures
+        which define a kernel (see :class:`pyPRISM.closure.AtomicClosure`).
+
+    Attributes
+    ----------
+    members: list of pyPRISM.core.PRISM
+        PRISM object of each System. After :func:`solve`, each holds its own
+        solution and minimize_result.
+
+    cost_calls: int
+        Number of calls to :func:`cost`
+
+    Example
+    -------
+    .. code-block:: python
+
+        import pyPRISM
+        from pyPRISM.core.BatchPRISM import BatchPRISM
+        import numpy as np
+
+        systems = []
+        for kT in np.linspace(1.0,3.0,200):
+            sys = pyPRISM.System(['A','B'],kT=kT)
+            # ** finish populating system object **
+            systems.append(sys)
+
+        batch = BatchPRISM(systems)
+        for PRISM in batch.solve(tol=1e-6):
+            print(PRISM.minimize_result.success)
+
+    '''
+    def __init__(self,systems):
+        r'''Constructor
+
+        Arguments
+        ---------
+        systems: iterable of pyPRISM.core.System
+            Fully specified Systems which share the Domain length and rank
+
+        Raises
+        ------
+        *ValueError*:
+            If the Systems do not share the Domain length, rank and closure
+            classes or use closures which cannot be evaluated in a batch
+        '''
+        self.members = []
+        for sys in systems:
+            sys.check()
+            self.members.append(PRISM(sys))
+
+        if not self.members:
+            raise ValueError('At least one System must be supplied')
+
+        first = self.members[0]
+        self.rank = first.sys.rank
+        self.length = first.sys.domain.length
+        self.size = self.length*self.rank*self.rank
+
+        signature = self._signature(first)
+        for member in self.members:
+            if (member.sys.rank!=self.rank) or (member.sys.domain.length!=self.length):
+                raise ValueError('All Systems must have the same rank and Domain length')
+            if member._pairwise_closures:
+                raise ValueError('Only atomic closures which define a kernel can be solved in a batch')
+            if self._signature(member)!=signature:
+                raise ValueError('All Systems must use the same closure for each pair')
+
+        # Per-member data are stacked along a new leading axis. Grids and
+        # transform coefficients are stacked so that members may use
+        # different grid spacings.
+        self.omega = np.stack([member.omega.data for member in self.members])
+        self.pair_density = np.stack([member.sys.density.pair.data for member in self.members])
+        self.r = np.stack([member.sys.domain.r for member in self.members])[:,np.newaxis]
+        self.k = np.stack([member.sys.domain.k for member in self.members])[:,np.newaxis]
+        self.DST_II_coeffs = np.stack([member.sys.domain.DST_II_coeffs for member in self.members])[:,np.newaxis]
+        self.DST_III_coeffs = np.stack([member.sys.domain.DST_III_coeffs for member in self.members])[:,np.newaxis]
+        # the stacked transforms use the threading setting of the first Domain
+        self.workers = first.sys.domain.workers
+
+        self.closure_groups = []
+        for index,(cls,ii,jj,potential,core) in enumerate(first._closure_groups):
+            potential = np.stack([member._closure_groups[index][3] for member in self.members])
+            core = np.stack([_core_mask(member._closure_groups[index]) for member in self.members])
+            self.closure_groups.append((cls,ii,jj,potential,core if core.any() else None))
+
+        self.cost_calls = 0
+
+    def __repr__(self):
+        return '<BatchPRISM members:{} length:{} rank:{}>'.format(len(self.members),self.length,self.rank)
+
+    def __len__(self):
+        return len(self.members)
+
+    @staticmethod
+    def _signature(member):
+        '''Closure class and pairs of each closure group of a PRISM object'''
+        return [(cls,tuple(ii),tuple(jj)) for cls,ii,jj,potential,core in member._closure_groups]
+
+    def _to_fourier(self,block,active):
+        '''Transform a (members,npairs,length) block to Fourier space in-place'''
+        block *= self.DST_II_coeffs[active]
+        block[...] = dst(block,type=2,axis=-1,overwrite_x=True,workers=self.workers)
+        block /= self.k[active]
+
+    def _to_real(self,block,active):
+        '''Transform a (members,npairs,length) block to Real space in-place'''
+        block *= self.DST_III_coeffs[active]
+        block[...] = dst(block,type=3,axis=-1,overwrite_x=True,workers=self.workers)
+        block /= self.r[active]
+
+    def cost(self,x,active=None):
+        r'''Stacked cost function of the members
+
+        This evaluates :func:`pyPRISM.core.PRISM.PRISM.cost` for several
+        members at once.
+
+        Parameters
+        ----------
+        x: np.ndarray, size (nactive,rank*rank*length)
+            Input :math:`\gamma_{in}` of each evaluated member
+
+        active: np.ndarray of int, *optional*
+            Indices of the members to evaluate. Defaults to all members.
+
+        Returns
+        -------
+        y: np.ndarray, size (nactive,rank*rank*length)
+            Residual :math:`\gamma_{out}-\gamma_{in}` of each evaluated member
+        '''
+        if active is None:
+            active = np.arange(len(self.members))
+        self.cost_calls += 1
+
+        rank = self.rank
+        count = len(active)
+        rows,cols = np.triu_indices(rank)
+        gamma = np.reshape(x,(count,self.length,rank,rank))
+
+        directCorr = np.empty_like(gamma)
+        for cls,ii,jj,potential,core in self.closure_groups:
+            value = gamma[:,:,ii,jj]
+            value = cls.kernel(value,potential[active])
+            if core is not None:
+                np.copyto(value,-1.0-gamma[:,:,ii,jj],where=core[active])
+            directCorr[:,:,ii,jj] = value
+            directCorr[:,:,jj,ii] = value
+
+        block = np.ascontiguousarray(directCorr[:,:,rows,cols].transpose(0,2,1))
+        self._to_fourier(block,active)
+        directCorr[:,:,rows,cols] = block.transpose(0,2,1)
+        directCorr[:,:,cols,rows] = block.transpose(0,2,1)
+
+        # All members are inverted together as one MatrixArray of length
+        # count*length
+        total = count*self.length
+        C = MatrixArray(length=total,rank=rank,data=directCorr.reshape((total,rank,rank)),space=Space.Fourier)
+        omega = MatrixArray(length=total,rank=rank,data=self.omega[active].reshape((total,rank,rank)),space=Space.Fourier)
+        OC = omega.dot(C)
+        IOC = MatrixArray(length=total,rank=rank,data=-OC.data,space=Space.Fourier)
+        IOC.data[:,np.arange(rank),np.arange(rank)] += 1.0
+        totalCorr = IOC.solve(OC.dot(omega))
+
+        GammaOut = totalCorr.data.reshape((count,self.length,rank,rank))
+        GammaOut /= self.pair_density[active]
+        GammaOut -= directCorr
+
+        block = np.ascontiguousarray(GammaOut[:,:,rows,cols].transpose(0,2,1))
+        self._to_real(block,active)
+        GammaOut[:,:,rows,cols] = block.transpose(0,2,1)
+        GammaOut[:,:,cols,rows] = block.transpose(0,2,1)
+
+        return (GammaOut - gamma).reshape((count,-1))
+
+    def solve(self,guess=None,depth=None,step=None,tol=None,maxiter=None):
+        r'''Attempt to numerically solve the PRISM equations of all members
+
+        Parameters
+        ----------
+        guess: np.ndarray, size (rank*rank*length) or (members,rank*rank*length)
+            Initial guess of :math:`\gamma` shared by all members or for each
+            member. If not specified, an initial guess of all zeros is used.
+
+        depth: int
+            Maximum number of previous iterates used in the extrapolation.
+            Default is 5.
+
+        step: np.float
+            Initial (and maximum) mixing fraction. Default is 0.5.
+
+        tol: np.float
+            Convergence is declared for a member when its largest absolute
+            residual falls below this value. Default is 1.0E-6.
+
+        maxiter: int
+            Maximum number of iterations. Default is 1000.
+
+        Returns
+        -------
+        members: list of pyPRISM.core.PRISM
+            Solved PRISM object of each member. The result of each member is
+            stored as PRISM.minimize_result.
+
+        See :func:`pyPRISM.core.PRISM.PRISM.solve_anderson` for details of
+        the mixing scheme.
+        '''
+        if depth is None:
+            depth = 5
+
+        if step is None:
+            step = 0.5
+
+        if tol is None:
+            tol = 1.0E-6
+
+        if maxiter is None:
+            maxiter = 1000
+
+        count = len(self.members)
+        x = np.zeros((count,self.size))
+        if guess is not None:
+            x[:] = np.reshape(guess,(-1,self.size))
+
+        f = self.cost(x)
+        mixing = AndersonMixing(x,f,depth,step)
+
+        nit = np.zeros(count,dtype=int)
+        nfev = np.ones(count,dtype=int)
+        success = mixing.error<tol
+        diverged = np.zeros(count,dtype=bool)
+        stalled = np.zeros(count,dtype=bool)
+        active = np.flatnonzero(~success)
+        for iteration in range(maxiter):
+            if len(active)==0:
+                break
+
+            x_new = mixing.propose(active)
+            f_new = self.cost(x_new,active)
+            nit[active] += 1
+            nfev[active] += 1
+
+            accept,failed = mixing.update(active,x_new,f_new)
+            finite = np.all(np.isfinite(f_new),axis=-1)
+            diverged[active[failed & ~finite]] = True
+            stalled[active[failed & finite]] = True
+            index = active[accept]
+            success[index] = mixing.error[index]<tol
+
+            active = np.flatnonzero(~(success | diverged | stalled))
+
+        x = mixing.x
+        for i,member in enumerate(self.members):
+            if success[i]:
+                message = 'A solution was found at the specified tolerance.'
+            elif diverged[i]:
+                message = 'Non-finite residual encountered.'
+            elif stalled[i]:
+                message = 'The residual increased at the smallest mixing fraction.'
+            else:
+                message = 'The maximum number of iterations was exceeded.'
+
+            # store the solution in the member as if it had been solved alone
+            member._reset_telemetry()
+            zeros = np.zeros(self.size)
+            fun = np.copy(member.cost(x[i],zeros,zeros))
+            member.minimize_result = OptimizeResult(x=x[i],fun=fun,success=bool(success[i]),status=int(not success[i]),message=message,nit=int(nit[i]),nfev=int(nfev[i]))
+            member._check_solution()
+
+        return self.members
+
+def _core_mask(group):
+    '''Hard-core mask of a closure group, or all False if it has no core'''
+    cls,ii,jj,potential,core = group
+    if core is None:
+        return np.zeros(potential.shape,dtype=bool)
+    return core
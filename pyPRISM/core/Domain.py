@@ -1,7 +1,7 @@
 #!python
 from pyPRISM.core.Space import Space
 import numpy as np
-from scipy.fftpack import dst
+from scipy.fft import dst
 
 class Domain(object):
     r'''Define domain and transform between Real and Fourier space
@@ -44,7 +44,7 @@ class Domain(object):
         The above equations describe a Real to Real, type-I discrete sine
         transform (DST). To tranform to and from Fourier space we will use the
         type-II and type-III DST's respectively. With Scipy's interface to
-        fftpack, the following functional coeffcients are
+        pocketfft (scipy.fft), the following functional coeffcients are
 
         .. math::
 
@@ -60,9 +60,15 @@ class Domain(object):
         Domain describes the discretization of Real and Fourier space
         and also sets up the functions and coefficients for transforming
         data between them.
+
+        When transforming a full :class:`pyPRISM.core.MatrixArray`, all
+        unique pair-functions are gathered into one contiguous block and
+        transformed with a single multi-dimensional DST call. The
+        :attr:`workers` attribute is passed through to scipy.fft and sets
+        the number of threads used for these batched transforms.
     
     '''
-    def __init__(self,length,dr=None,dk=None):
+    def __init__(self,length,dr=None,dk=None,workers=None):
         r'''Constructor
 
         Arguments
@@ -74,8 +80,14 @@ class Domain(object):
             Grid spacing in Real space or Fourier space. Only one can be
             specified as it fixes the other.
 
+        workers: int, *optional*
+            Number of threads used by scipy.fft for the batched MatrixArray
+            transforms. Negative values wrap around os.cpu_count() (see
+            scipy.fft.dst). Defaults to a single thread.
+
         '''
         self._length = length
+        self.workers = workers
         
         if (dr is None) and (dk is None):
             raise ValueError('Real or Fourier grid spacing must be specified')
@@ -132,6 +144,26 @@ class Domain(object):
     def __repr__(self):
         return '<Domain length:{} dr/rmax:{:4.3f}/{:3.1f} dk/kmax:{:4.3f}/{:3.1f}>'.format(self.length,self.dr,self.r[-1],self.dk,self.k[-1])
     
+    def __getstate__(self):
+        '''Only the grid definition is pickled; the grids are rebuilt on load'''
+        return {'_length':self._length,'_dr':self._dr,'_dk':self._dk,'workers':self.workers}
+
+    def _fingerprint_state(self):
+        '''The threading setting does not change the grid'''
+        state = self.__getstate__()
+        state.pop('workers')
+        return state
+
+    def __setstate__(self,state):
+        self.__dict__.update(state)
+        self.build_grid()
+    
+    def __copy__(self):
+        '''Shallow copy which shares the (read-only) grids with this Domain'''
+        domain = Domain.__new__(Domain)
+        domain.__dict__.update(self.__dict__)
+        return domain
+    
     def to_fourier(self,array):
         r''' Discrete Sine Transform of a numpy array 
         
@@ -176,6 +208,18 @@ class Domain(object):
         '''
         return dst(self.DST_III_coeffs*array,type=3)/self.r
     
+    def _gather_pairs(self,marray):
+        '''Copy the upper triangle of a MatrixArray into a (npairs,length) block'''
+        rows,cols = np.triu_indices(marray.rank)
+        block = np.ascontiguousarray(marray.data[:,rows,cols].T)
+        return (rows,cols),block
+
+    def _scatter_pairs(self,marray,indices,block):
+        '''Write a (npairs,length) block back into a MatrixArray symmetrically'''
+        rows,cols = indices
+        marray.data[:,rows,cols] = block.T
+        marray.data[:,cols,rows] = block.T
+
     def MatrixArray_to_fourier(self,marray):
         ''' Transform all pair-functions of a MatrixArray to Fourier space in-place
 
@@ -192,8 +236,11 @@ class Domain(object):
         if marray.space == Space.Fourier:
             raise ValueError('MatrixArray is marked as already in Fourier space')
             
-        for (i,j),(t1,t2),pair in marray.iterpairs():
-            marray[t1,t2] = self.to_fourier(pair)
+        indices,block = self._gather_pairs(marray)
+        block *= self.DST_II_coeffs
+        block = dst(block,type=2,axis=-1,overwrite_x=True,workers=self.workers)
+        block /= self.k
+        self._scatter_pairs(marray,indices,block)
         
         marray.space = Space.Fourier
             
@@ -213,8 +260,10 @@ class Domain(object):
         if marray.space == Space.Real:
             raise ValueError('MatrixArray is marked as already in Real space')
             
-        for (i,j),(t1,t2),pair in marray.iterpairs():
-            marray[t1,t2] = self.to_real(pair)
+        indices,block = self._gather_pairs(marray)
+        block *= self.DST_III_coeffs
+        block = dst(block,type=3,axis=-1,overwrite_x=True,workers=self.workers)
+        block /= self.r
+        self._scatter_pairs(marray,indices,block)
             
         marray.space = Space.Real
-            
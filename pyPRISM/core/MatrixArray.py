@@ -5,6 +5,10 @@ from itertools import product
 import numpy as np
 import warnings
 
+# MatrixArray.solve uses LAPACK rather than the closed-form adjugate for
+# matrices whose determinant is below this fraction of (largest element)**rank
+_DET_RTOL = 1e-8
+
 class MatrixArray(object):
     '''A container for creating and interacting with arrays of matrices
     
@@ -98,6 +102,46 @@ class MatrixArray(object):
         '''Return an independent copy of this MatrixArray'''
         return MatrixArray(length=self.length,rank=self.rank,data=np.copy(self.data),space=self.space,types=self.types)
 
+    @property
+    def npairs(self):
+        '''Number of unique (upper triangle) pair-functions'''
+        return self.rank*(self.rank+1)//2
+
+    def pack(self):
+        '''Return the unique pair-functions in packed (upper triangle) form
+
+        As the matrices in a MatrixArray are symmetric, only the
+        rank*(rank+1)/2 pair-functions of the upper triangle are independent.
+        The packed array stores these pair-functions in the order yielded by
+        :func:`iterpairs`.
+
+        Returns
+        -------
+        packed: np.ndarray, size (length,npairs)
+            Independent copy of the upper triangle pair-functions
+        '''
+        rows,cols = np.triu_indices(self.rank)
+        return self.data[:,rows,cols]
+
+    def unpack(self,packed):
+        '''Set all pair-functions from a packed (upper triangle) array
+
+        Arguments
+        ---------
+        packed: np.ndarray, size (length,npairs) or (length*npairs)
+            Upper triangle pair-functions as returned by :func:`pack`. Both
+            triangles of each matrix are set from this data.
+
+        Returns
+        -------
+        self: MatrixArray
+        '''
+        rows,cols = np.triu_indices(self.rank)
+        packed = np.reshape(packed,(self.length,self.npairs))
+        self.data[:,rows,cols] = packed
+        self.data[:,cols,rows] = packed
+        return self
+
     def itercurve(self):
         warnings.warn(
                 "itercurve() is deprecated and will be removed in a future release. Use iterpairs() instead",
@@ -299,7 +343,7 @@ class MatrixArray(object):
         else:
             return MatrixArray(rank=self.rank,length=self.length,data=data,space=self.space,types=self.types)
         
-    def dot(self,other,inplace=False):
+    def dot(self,other,inplace=False,out=None):
         ''' Matrix multiplication for each matrix in two MatrixArrays
         
         Parameters
@@ -311,17 +355,75 @@ class MatrixArray(object):
         inplace: bool
             If False, a new MatrixArray is returned, otherwise just
             update the internal data.
+
+        out: MatrixArray, *optional*
+            Pre-allocated MatrixArray of the same length and rank to write the
+            result into. This MatrixArray must not share memory with self or
+            other. If supplied, out is returned and inplace is ignored.
         
         '''
         if isinstance(other,MatrixArray):
             assert (self.space == other.space) or (Space.NonSpatial in (self.space,other.space)),MatrixArray.SpaceError
-        if inplace:
-            self.data = np.einsum('lij,ljk->lik', self.data, other.data)
+        if out is not None:
+            np.matmul(self.data, other.data, out=out.data)
+            out.space = self.space
+            return out
+        elif inplace:
+            self.data = np.matmul(self.data, other.data)
             return self
         else:
-            data = np.einsum('lij,ljk->lik', self.data, other.data)
+            data = np.matmul(self.data, other.data)
             return MatrixArray(length=self.length,rank=self.rank,data=data,space=self.space,types=self.types)
         
+    def solve(self,other,out=None):
+        '''Solve the linear system self.X = other for each matrix in the array
+
+        This is equivalent to self.invert().dot(other), but avoids forming
+        the inverse. For rank 1, 2 and 3, the solution is calculated from
+        closed-form (adjugate) expressions which are vectorized over the
+        array. This avoids the per-matrix overhead of LAPACK, which dominates
+        for such small matrices. Nearly singular matrices, whose determinant
+        is small relative to their largest element, and all matrices of
+        larger rank are solved with np.linalg.solve.
+        
+        Parameters
+        ----------
+        other: MatrixArray
+            Right-hand side. Must be of the same length and rank.
+
+        out: MatrixArray, *optional*
+            Pre-allocated MatrixArray to write the result into. If not
+            supplied, a new MatrixArray is returned.
+
+        Raises
+        ------
+        *numpy.linalg.LinAlgError*:
+            If any of the matrices in self is singular
+        
+        '''
+        assert (self.space == other.space) or (Space.NonSpatial in (self.space,other.space)),MatrixArray.SpaceError
+        if out is None:
+            out = MatrixArray(length=self.length,rank=self.rank,space=self.space,types=self.types)
+
+        if self.rank<=3:
+            adj,det = _adjugate(self.data)
+
+            # The closed form loses accuracy for nearly singular matrices,
+            # which are passed to LAPACK instead (which also detects truly
+            # singular matrices)
+            scale = np.max(np.abs(self.data),axis=(1,2))**self.rank
+            fallback = np.abs(det)<=_DET_RTOL*scale
+
+            np.matmul(adj, other.data, out=out.data)
+            np.divide(out.data,det[:,np.newaxis,np.newaxis],out=out.data,where=~fallback[:,np.newaxis,np.newaxis])
+            if np.any(fallback):
+                out.data[fallback] = np.linalg.solve(self.data[fallback],other.data[fallback])
+        else:
+            out.data[...] = np.linalg.solve(self.data,other.data)
+
+        out.space = self.space
+        return out
+        
     def __matmul__(self,other):
         assert (self.space == other.space) or (Space.NonSpatial in (self.space,other.space)),MatrixArray.SpaceError
         return self.dot(other,inplace=False)
@@ -331,3 +433,59 @@ class MatrixArray(object):
         return self.dot(other,inplace=True)
         
         
+
+
+def _adjugate(data):
+    '''Closed-form adjugate and determinant of each 1x1, 2x2 or 3x3 matrix
+
+    All products are written into the output buffers rather than into
+    temporary arrays.
+
+    Parameters
+    ----------
+    data: np.ndarray, size (length,rank,rank)
+        Array of matrices with rank <= 3
+
+    Returns
+    -------
+    adj: np.ndarray, size (length,rank,rank)
+        Adjugate of each matrix such that inverse = adj/det
+
+    det: np.ndarray, size (length)
+        Determinant of each matrix
+    '''
+    rank = data.shape[1]
+    adj = np.empty_like(data)
+    det = np.empty(data.shape[0],dtype=data.dtype)
+    if rank==1:
+        adj[:,0,0] = 1.0
+        det[:] = data[:,0,0]
+    elif rank==2:
+        a,b = data[:,0,0],data[:,0,1]
+        c,d = data[:,1,0],data[:,1,1]
+        adj[:,0,0] = d
+        np.negative(b,out=adj[:,0,1])
+        np.negative(c,out=adj[:,1,0])
+        adj[:,1,1] = a
+        np.multiply(a,d,out=det)
+        work = np.multiply(b,c)
+        det -= work
+    elif rank==3:
+        work = np.empty_like(det)
+        m = [[data[:,i,j] for j in range(3)] for i in range(3)]
+        for i in range(3):
+            i1,i2 = (i+1)%3,(i+2)%3
+            for j in range(3):
+                j1,j2 = (j+1)%3,(j+2)%3
+                # cyclic index ordering absorbs the cofactor sign
+                cofactor = adj[:,j,i]
+                np.multiply(m[i1][j1],m[i2][j2],out=cofactor)
+                np.multiply(m[i1][j2],m[i2][j1],out=work)
+                cofactor -= work
+        np.multiply(m[0][0],adj[:,0,0],out=det)
+        for j in (1,2):
+            np.multiply(m[0][j],adj[:,j,0],out=work)
+            det += work
+    else:
+        raise ValueError('Closed-form adjugate is only implemented for rank <= 3')
+    return adj,det
@@ -1,17 +1,41 @@
 #!python
 
 from pyPRISM.core.Space import Space
+from pyPRISM.core.Domain import Domain
 from pyPRISM.core.MatrixArray import MatrixArray
 from pyPRISM.core.IdentityMatrixArray import IdentityMatrixArray
+from pyPRISM.core.Preconditioner import Preconditioner
+from pyPRISM.core.AndersonMixing import AndersonMixing
 from pyPRISM.closure.AtomicClosure import AtomicClosure
 from pyPRISM.closure.MolecularClosure import MolecularClosure
+from pyPRISM.closure.PercusYevick import PercusYevick
+from pyPRISM.potential.HardSphere import HardSphere
+from pyPRISM.calculate.hard_sphere_guess import hard_sphere_guess
+from pyPRISM.omega.OmegaCache import cache as omega_cache
 
-from scipy.optimize import root
+from scipy.optimize import root, OptimizeResult
+from scipy.sparse.linalg import LinearOperator, gmres
 
 import numpy as np
 
-from copy import deepcopy
 import warnings
+import time
+
+class _SolverAbort(Exception):
+    '''Raised within a solver callback to stop the solution process'''
+    pass
+
+def _kernel_based(cls):
+    '''Is an atomic closure class fully described by its kernel?
+
+    This is the case if the class defines a kernel and does not override
+    calculate (which evaluates the kernel) below the class defining it.
+    '''
+    if cls.kernel is None:
+        return False
+    kernel = next(base for base in cls.__mro__ if 'kernel' in vars(base))
+    calculate = next(base for base in cls.__mro__ if 'calculate' in vars(base))
+    return issubclass(kernel,calculate)
 
 class PRISM:
     r'''Primary container for a storing a PRISM calculation
@@ -68,6 +92,13 @@ class PRISM:
     OC,IOC,I,etc: pyPRISM.MatrixArray
         Various MatrixArrays used as intermediates in the PRISM functional.
         These arrays are pre-allocated and stored for efficiency. 
+
+        .. note::
+
+            The cost function writes into these arrays (and totalCorr,
+            directCorr, GammaOut, etc.) in place. References to them are
+            therefore updated by subsequent calls to :func:`cost`. Use
+            :func:`pyPRISM.core.MatrixArray.get_copy` to keep a snapshot.
     
     x1,x2,y: float np.ndarray
         Current inputs and outputs of the cost function
@@ -89,7 +120,7 @@ class PRISM:
         
     '''
     def __init__(self,sys):
-        self.sys = deepcopy(sys)
+        self.sys = sys.snapshot()
 
         # Need to set the potential for each closure object
         for (i,j),(t1,t2),U in self.sys.potential.iterpairs():
@@ -107,9 +138,11 @@ class PRISM:
 
         # The omega objects must be converted to a MatrixArray of the actual correlation
         # function values rather than a table of OmegaObjects.
-        applyFunc = lambda x: x.calculate(sys.domain.k)
-        self.omega  = self.sys.omega.apply(applyFunc,inplace=False).exportToMatrixArray(space=Space.Fourier)
+        # Each omega is only evaluated once and expensive omega are shared
+        # between PRISM objects via the process-wide omega cache.
+        applyFunc = lambda x: omega_cache.calculate(x,self.sys.domain.k)
         self.omegaConvolution  = self.sys.omega.apply(applyFunc,inplace=False).exportToMatrixArray(space=Space.Fourier)
+        self.omega  = self.omegaConvolution.get_copy()
         self.omega *= sys.density.site #omega should always be scaled by site density 
 	
         # Spaces are set based on when they are used in self.cost(...). In some cases,
@@ -122,8 +155,71 @@ class PRISM:
         self.referenceTotalCorr  = MatrixArray(length=sys.domain.length,rank=sys.rank,space=Space.Fourier,types=sys.types)
         self.GammaIn    = MatrixArray(length=sys.domain.length,rank=sys.rank,space=Space.Real,types=sys.types)
         self.GammaOut   = MatrixArray(length=sys.domain.length,rank=sys.rank,space=Space.Real,types=sys.types)
-        self.OC         = MatrixArray(length=sys.domain.length,rank=sys.rank,space=Space.Fourier,types=sys.types)
-        self.I          = IdentityMatrixArray(length=sys.domain.length,rank=sys.rank,space=Space.Fourier,types=sys.types)
+
+        self._allocate_workspace()
+        self._group_closures()
+        self._reset_telemetry()
+        self._linearization = None
+        self._guard = None
+
+    def _group_closures(self):
+        '''Group the atomic closures by class for vectorized evaluation in :func:`cost`
+
+        All pairs with the same kernel-based closure class are evaluated in
+        one call on a (length,npairs) block. Their potentials and hard-core
+        masks are gathered into such blocks here, once, rather than on every
+        call of :func:`cost`. All other closures, including subclasses which
+        override calculate but not the kernel, are evaluated pair-by-pair.
+        '''
+        r = self.sys.domain.r
+        groups = {}
+        self._pairwise_closures = []
+        for (i,j),(t1,t2),closure in self.sys.closure.iterpairs():
+            if isinstance(closure,AtomicClosure) and _kernel_based(type(closure)):
+                assert closure.potential is not None,'Potential for this closure is not set!'
+                assert len(r) == len(closure.potential),'Domain mismatch!'
+                if closure.apply_hard_core:
+                    assert closure.sigma is not None, 'If apply_hard_core=True, sigma parameter must be set!'
+                groups.setdefault(type(closure),[]).append(((i,j),closure))
+            else:
+                self._pairwise_closures.append(((i,j),(t1,t2),closure))
+
+        self._closure_groups = []
+        self._grouped_closures = []
+        for cls,members in groups.items():
+            ii = np.array([i for (i,j),closure in members])
+            jj = np.array([j for (i,j),closure in members])
+            potential = np.stack([closure.potential for (i,j),closure in members],axis=-1)
+            core = np.stack([(r<=closure.sigma) if closure.apply_hard_core else np.zeros(r.shape,dtype=bool) for (i,j),closure in members],axis=-1)
+            # The kernel is evaluated everywhere and then overwritten in the
+            # core, so the (possibly divergent) potential is zeroed there
+            potential[core] = 0.0
+            if not core.any():
+                core = None
+            self._closure_groups.append((cls,ii,jj,potential,core))
+            self._grouped_closures.append([closure for (i,j),closure in members])
+
+    def _allocate_workspace(self):
+        '''Allocate the scratch MatrixArrays which are only used within :func:`cost`'''
+        length,rank,types = self.sys.domain.length,self.sys.rank,self.sys.types
+        self.OC         = MatrixArray(length=length,rank=rank,space=Space.Fourier,types=types)
+        self.IOC        = MatrixArray(length=length,rank=rank,space=Space.Fourier,types=types)
+        self.OCO        = MatrixArray(length=length,rank=rank,space=Space.Fourier,types=types)
+        self.I          = IdentityMatrixArray(length=length,rank=rank,space=Space.Fourier,types=types)
+
+    def __getstate__(self):
+        '''The scratch arrays are not pickled to keep pickles compact'''
+        state = self.__dict__.copy()
+        for key in ['OC','IOC','OCO','I','_closure_groups','_grouped_closures','_pairwise_closures','_linearization','_guard']:
+            state.pop(key,None)
+        return state
+
+    def __setstate__(self,state):
+        self.__dict__.update(state)
+        self._allocate_workspace()
+        self._group_closures()
+        self._linearization = None
+        self._guard = None
 
     def __repr__(self):
         return '<PRISM length:{} rank:{}>'.format(self.sys.domain.length,self.sys.rank)
@@ -146,20 +242,37 @@ class PRISM:
         self.x1 = x1 #store input
         self.x2 = x2
         self.x3 = x3
+        self.cost_calls += 1
+        self._linearization = None
+        start = time.perf_counter()
+
+        rank = self.sys.rank
 
-        # The np.copy is important otherwise x saves state between calls to
-        # this function.
-        self.GammaIn.data = np.copy(x1.reshape((-1,self.sys.rank,self.sys.rank)))
+        # The inputs are copied into the pre-allocated workspace. This is
+        # important, otherwise x saves state between calls to this function.
+        np.copyto(self.GammaIn.data,x1.reshape((-1,rank,rank)))
 
-        self.referenceDirectCorr.data = np.copy(x2.reshape((-1,self.sys.rank,self.sys.rank)))
+        np.copyto(self.referenceDirectCorr.data,x2.reshape((-1,rank,rank)))
 
-        self.referenceTotalCorr.data = np.copy(x3.reshape((-1,self.sys.rank,self.sys.rank)))
+        np.copyto(self.referenceTotalCorr.data,x3.reshape((-1,rank,rank)))
 
         # directCorr is calculated directly in Real space but immediately 
         # inverted to Fourier space. We must reset this from the last call.
         self.directCorr.space = Space.Real
         self.directCorrForCost.space = Space.Real
-        for (i,j),(t1,t2),closure in self.sys.closure.iterpairs():
+        for (cls,ii,jj,potential,core),closures in zip(self._closure_groups,self._grouped_closures):
+            gamma = self.GammaIn.data[:,ii,jj]
+            value = cls.kernel(gamma,potential)
+            if core is not None:
+                np.copyto(value,-1.0-gamma,where=core)
+            for MA in (self.directCorrForCost,self.directCorr):
+                MA.data[:,ii,jj] = value
+                MA.data[:,jj,ii] = value
+            # as if closure.calculate had been called for each pair
+            for n,closure in enumerate(closures):
+                closure.value = value[:,n]
+
+        for (i,j),(t1,t2),closure in self._pairwise_closures:
             if isinstance(closure,AtomicClosure):
                 self.directCorrForCost[t1,t2] = closure.calculate(self.sys.domain.r,self.GammaIn[t1,t2])
                 self.directCorr[t1,t2] = self.directCorrForCost[t1,t2]
@@ -172,27 +285,321 @@ class PRISM:
             else:
                 raise ValueError('Closure type not recognized')
         
+        start = self._lap('closure',start)
+
         self.sys.domain.MatrixArray_to_fourier(self.directCorr)
         self.sys.domain.MatrixArray_to_fourier(self.directCorrForCost)
+
+        start = self._lap('transform',start)
 	
-        self.OC = self.omega.dot(self.directCorr) #CHANGE
-        self.IOC = self.I - self.OC
-        self.IOC.invert(inplace=True)
+        # All intermediates below are written into the workspace arrays
+        # allocated in the constructor
+        self.omega.dot(self.directCorr,out=self.OC)
+        np.subtract(self.I.data,self.OC.data,out=self.IOC.data)
         
-        self.totalCorr  = self.IOC.dot(self.OC).dot(self.omega)
+        # totalCorr = (I - OC)^-1 OC omega via a batched linear solve
+        self.OC.dot(self.omega,out=self.OCO)
+        self.IOC.solve(self.OCO,out=self.totalCorr)
 
         self.totalCorr /= self.sys.density.pair
         
-        self.GammaOut  = self.totalCorr - self.directCorrForCost
+        np.subtract(self.totalCorr.data,self.directCorrForCost.data,out=self.GammaOut.data)
+        self.GammaOut.space = Space.Fourier
+
+        start = self._lap('inversion',start)
 
         self.sys.domain.MatrixArray_to_real(self.GammaOut)
 
+        start = self._lap('transform',start)
+
+        # The output must be a new array as the scipy solvers keep
+        # references to the residuals of previous iterations
         self.y = self.GammaOut.data - self.GammaIn.data
 
+        # hook used by pyPRISM.sweep.strategy to enforce budgets
+        if self._guard is not None:
+            self._guard()
+
         return self.y.reshape((-1,))
 
-    def solve_picard(self,guess=None,step=None,tol=None,cr0=None,hk0=None,hk_initial=None): 
-        '''Attempt to numerically solve the PRISM equations using Picard iteration
+    def cost_packed(self,x1,x2,x3):
+        r'''Cost function operating only on the independent pair-functions
+
+        As all MatrixArrays in the PRISM equations are symmetric, only the
+        rank*(rank+1)/2 upper triangle pair-functions are independent. This
+        wrapper of :func:`cost` accepts and returns these pair-functions in
+        the packed layout of :func:`pyPRISM.core.MatrixArray.MatrixArray.pack`
+        so that the numerical solvers only need to optimize about half as
+        many unknowns.
+
+        Parameters
+        ----------
+        x1: np.ndarray, size (rank*(rank+1)/2*length)
+            Packed :math:`\gamma_{in}` 
+
+        x2,x3: np.ndarray, size (rank*rank*length)
+            Reference direct and total correlation functions (unpacked)
+
+        Returns
+        -------
+        y: np.ndarray, size (rank*(rank+1)/2*length)
+            Packed cost function residual
+        '''
+        return self._pack(self.cost(self._unpack(x1),x2,x3))
+
+    def _linearize(self):
+        '''Closure derivatives and (I - OC) at the most recent input of :func:`cost`
+
+        These are evaluated once per call of :func:`cost` and reused by all
+        subsequent calls of :func:`jvp`.
+        '''
+        if self._linearization is not None:
+            return self._linearization
+
+        assert self.cost_calls>0,'cost must be evaluated before the Jacobian can be applied'
+
+        groups = []
+        for cls,ii,jj,potential,core in self._closure_groups:
+            if cls.derivative is None:
+                raise NotImplementedError('{} does not define a derivative'.format(cls.__name__))
+            derivative = cls.derivative(self.GammaIn.data[:,ii,jj],potential)
+            if core is not None:
+                derivative[core] = -1.0
+            groups.append(derivative)
+
+        pairwise = []
+        for (i,j),(t1,t2),closure in self._pairwise_closures:
+            if isinstance(closure,AtomicClosure):
+                derivative = closure.calculate_derivative(self.sys.domain.r,self.GammaIn[t1,t2])
+            else:
+                derivative = closure.calculate_derivative(self.sys.domain,self.GammaIn[t1,t2],self.omegaConvolution[t1,t1],self.omegaConvolution[t2,t2],self.referenceDirectCorr[t1,t2],self.referenceTotalCorr[t1,t2],self.totalCorr[t1,t2])
+            pairwise.append(derivative)
+
+        IOC = self.IOC.get_copy()
+        IOCO = IOC.solve(self.omega)
+
+        self._linearization = (groups,pairwise,IOC,IOCO)
+        return self._linearization
+
+    def jvp(self,v):
+        r'''Product of the Jacobian of :func:`cost` with a vector
+
+        The Jacobian is evaluated at the most recent input of :func:`cost`.
+        It is calculated exactly (rather than by finite differences) from
+        the derivatives of the closures and the linearized PRISM equation
+
+        .. math::
+
+            \rho\,\delta\hat{H} = (I-\hat{\Omega}\hat{C})^{-1}\hat{\Omega}\,\delta\hat{C}\,(I-\hat{\Omega}\hat{C})^{-1}\hat{\Omega}
+
+        This costs roughly as much as a call to :func:`cost`.
+        Any dependence of molecular closures on the total correlation
+        function of the previous iteration is treated as fixed.
+
+        Parameters
+        ----------
+        v: np.ndarray, size (rank*rank*length)
+            Direction in :math:`\gamma_{in}` 
+
+        Returns
+        -------
+        Jv: np.ndarray, size (rank*rank*length)
+            Directional derivative of the cost function residual
+        '''
+        groups,pairwise,IOC,IOCO = self._linearize()
+        start = time.perf_counter()
+
+        length,rank,types = self.sys.domain.length,self.sys.rank,self.sys.types
+        dgamma = np.reshape(v,(-1,rank,rank))
+        dC = MatrixArray(length=length,rank=rank,space=Space.Real,types=types)
+        dCForCost = MatrixArray(length=length,rank=rank,space=Space.Real,types=types)
+
+        for (cls,ii,jj,potential,core),derivative in zip(self._closure_groups,groups):
+            value = derivative*dgamma[:,ii,jj]
+            for MA in (dCForCost,dC):
+                MA.data[:,ii,jj] = value
+                MA.data[:,jj,ii] = value
+
+        for ((i,j),(t1,t2),closure),derivative in zip(self._pairwise_closures,pairwise):
+            value = derivative*dgamma[:,i,j]
+            dCForCost[t1,t2] = value
+            if isinstance(closure,MolecularClosure):
+                value = self.sys.domain.to_fourier(value)
+                value = value/(self.omegaConvolution[t1,t1]*self.omegaConvolution[t2,t2])
+                value = self.sys.domain.to_real(value)
+            dC[t1,t2] = value
+
+        start = self._lap('closure',start)
+
+        self.sys.domain.MatrixArray_to_fourier(dC)
+        self.sys.domain.MatrixArray_to_fourier(dCForCost)
+
+        start = self._lap('transform',start)
+
+        dH = IOC.solve(self.omega.dot(dC).dot(IOCO))
+        dH /= self.sys.density.pair
+        dH.data -= dCForCost.data
+
+        start = self._lap('inversion',start)
+
+        self.sys.domain.MatrixArray_to_real(dH)
+
+        start = self._lap('transform',start)
+
+        return (dH.data - dgamma).reshape((-1,))
+
+    def jvp_packed(self,v):
+        '''Product of the Jacobian of :func:`cost_packed` with a packed vector (see :func:`jvp`)'''
+        return self._pack(self.jvp(self._unpack(v)))
+
+    def _pack(self,x):
+        '''Reduce a flattened, full MatrixArray to its flattened upper triangle'''
+        data = np.reshape(x,(self.sys.domain.length,self.sys.rank,self.sys.rank))
+        return MatrixArray(length=self.sys.domain.length,rank=self.sys.rank,data=data).pack().reshape((-1,))
+
+    def _unpack(self,x):
+        '''Expand a flattened upper triangle to a flattened, full MatrixArray'''
+        marray = MatrixArray(length=self.sys.domain.length,rank=self.sys.rank)
+        return marray.unpack(x).data.reshape((-1,))
+
+    def _lap(self,phase,start):
+        '''Add the time since start to the cumulative timing of a phase of :func:`cost`'''
+        now = time.perf_counter()
+        self.timings[phase] += now - start
+        return now
+
+    def _reset_telemetry(self):
+        '''Reset the cost() call counter and phase timings'''
+        self.cost_calls = 0
+        self.timings = {'closure':0.0,'transform':0.0,'inversion':0.0}
+
+    def _report(self,callback,iteration,residual):
+        '''Pass the current solver state to a user callback
+
+        Returns
+        -------
+        abort: bool
+            True if the callback requested that the solver stop
+        '''
+        rank = self.sys.rank
+        residual = np.reshape(residual,(-1,rank,rank))
+        pair_residual = {}
+        for (i,j),(t1,t2) in self.sys.iterpairs():
+            pair_residual[t1,t2] = np.max(np.abs(residual[:,i,j]))
+        info = {
+            'iteration':iteration,
+            'cost_calls':self.cost_calls,
+            'residual':np.max(np.abs(residual)),
+            'residual_norm':np.linalg.norm(residual),
+            'pair_residual':pair_residual,
+            'timings':dict(self.timings),
+        }
+        return bool(callback(info))
+
+    def _prepare_solve(self,guess,cr0,hk0,hk_initial):
+        '''Fill in default solver inputs and reset the total correlation function
+
+        Returns
+        -------
+        guess,cr0,hk0: np.ndarray, size (rank*rank*length)
+            Initial guess and reference correlation functions with any
+            unspecified values replaced by arrays of zeros. For atomic
+            hard-sphere systems with Percus-Yevick closures, an unspecified
+            guess is replaced by the analytical solution instead.
+        '''
+        size = self.sys.rank*self.sys.rank*self.sys.domain.length
+
+        if guess is None:
+            guess = self._hard_sphere_guess()
+
+        if guess is None:
+            guess = np.zeros(size)
+
+        if cr0 is None:
+            cr0 = np.zeros(size)
+
+        if hk0 is None:
+            hk0 = np.zeros(size)
+
+        if hk_initial is None:
+            hk_initial = hk0
+
+        self.totalCorr.data = np.copy(hk_initial.reshape((-1,self.sys.rank,self.sys.rank)))
+
+        self._reset_telemetry()
+
+        return guess,cr0,hk0
+
+    def _hard_sphere_guess(self):
+        '''Analytical initial guess for atomic hard-sphere systems with Percus-Yevick closures
+
+        Returns
+        -------
+        guess: np.ndarray or None
+            Guess from :func:`pyPRISM.calculate.hard_sphere_guess` or None if
+            the PY hard-sphere solution does not apply to this system
+        '''
+        for (i,j),(t1,t2),closure in self.sys.closure.iterpairs():
+            U = self.sys.potential[t1,t2]
+            if not (isinstance(closure,PercusYevick) and isinstance(U,HardSphere)):
+                return None
+            # the analytical solution is only known for additive diameters
+            if not np.isclose(U.sigma,self.sys.diameter[t1,t2]):
+                return None
+
+        try:
+            return hard_sphere_guess(self.sys)
+        except ValueError:
+            return None
+
+    def _check_solution(self,tol=1e-5):
+        '''Transform the total correlation function to Real space and warn about unphysical values'''
+        if self.totalCorr.space == Space.Fourier:
+            self.sys.domain.MatrixArray_to_real(self.totalCorr)
+
+        warnstr = 'Pair correlations are negative (value = {:3.2e}) for {}-{} pair!'
+        for i,(t1,t2),H in self.totalCorr.iterpairs():
+            if np.any(H<-(1.0+tol)):
+                val = np.min(H)
+                warnings.warn(warnstr.format(val,t1,t2))
+
+    def _solve_direct(self,cr0,hk0,tol):
+        r'''Calculate the solution directly if no closure depends on :math:`\gamma`
+
+        In this case the direct correlation functions, and therefore
+        :math:`\gamma_{out}`, do not depend on :math:`\gamma_{in}`. The
+        solution :math:`\gamma = \gamma_{out}` is found with a single call of
+        :func:`cost` and a second call verifies it and leaves this object in
+        the solved state.
+
+        Returns
+        -------
+        result: scipy.optimize.OptimizeResult or None
+            Result object (also stored as self.minimize_result) or None if
+            any closure depends on :math:`\gamma`
+        '''
+        for (i,j),(t1,t2),closure in self.sys.closure.iterpairs():
+            if closure.depends_on_gamma:
+                return None
+
+        x = np.zeros(self.sys.rank*self.sys.rank*self.sys.domain.length)
+        x = x + self.cost(x,cr0,hk0)
+        f = np.copy(self.cost(x,cr0,hk0))
+        success = np.max(np.abs(f))<tol
+
+        if success:
+            message = 'The closures do not depend on gamma so the solution was calculated directly.'
+        else:
+            message = 'The closures do not depend on gamma but the directly calculated solution exceeds the specified tolerance.'
+
+        self.minimize_result = OptimizeResult(x=x,fun=f,success=success,status=int(not success),message=message,nit=0,nfev=2)
+
+        self._check_solution(tol)
+
+        return self.minimize_result
+
+    def solve_picard(self,guess=None,step=None,tol=None,cr0=None,hk0=None,hk_initial=None,disp=False,callback=None): 
+        r'''Attempt to numerically solve the PRISM equations using Picard iteration
         
         Using the supplied inputs (in the constructor), we attempt to numerically
         solve the PRISM equations using the scheme laid out in :func:`cost`. If the 
@@ -204,6 +611,9 @@ class PRISM:
         physical. At this point, this consists of checking to make sure that
         the pair correlation functions are not negative. If this isn't true
         a warning is issued to the user. 
+
+        Unlike the other solve methods, this method always iterates, even if
+        no closure depends on :math:`\gamma`.
         
         Parameters
         ----------
@@ -211,7 +621,9 @@ class PRISM:
             The initial guess of :math:`\gamma` to the numerical solution process.
             The numpy array should be of size rank x rank x length corresponding to 
             the a full flattened MatrixArray. If not specified, an initial guess
-            of all zeros is used. 
+            of all zeros is used. For atomic hard-sphere
+            systems with Percus-Yevick closures, the analytical solution
+            (:func:`pyPRISM.calculate.hard_sphere_guess`) is used instead.
             
         step: np.float
             New solutions are mixed with old solutions. This is the fraction of the new solution to use where 0 is none and 1 is all of the new solution.
@@ -224,28 +636,26 @@ class PRISM:
         
         hk0: np.ndarray, size (rank*rank*length)
             The reference total correlation functions
+
+        disp: bool
+            If True, print the iteration counter and error at every
+            iteration. Default is False; use callback to monitor the
+            solution process.
+
+        callback: callable, *optional*
+            Called as callback(info) after every iteration. See :func:`solve`
+            for the contents of info. If the callback returns *True*, the
+            solution process is stopped.
         
         '''
         
-        if guess is None:
-            guess = np.zeros(self.sys.rank*self.sys.rank*self.sys.domain.length)
-
         if step is None:
             step = 0.1
 
         if tol is None:
             tol = 1.0E-6
 
-        if cr0 is None:
-            cr0 = np.zeros(self.sys.rank*self.sys.rank*self.sys.domain.length)
-
-        if hk0 is None:
-            hk0 = np.zeros(self.sys.rank*self.sys.rank*self.sys.domain.length)
-
-        if hk_initial is None:
-            hk_initial = hk0
-
-        self.totalCorr.data = np.copy(hk_initial.reshape((-1,self.sys.rank,self.sys.rank)))
+        guess,cr0,hk0 = self._prepare_solve(guess,cr0,hk0,hk_initial)
 
         input_solution = guess
         error = 1.0
@@ -255,24 +665,486 @@ class PRISM:
             self.minimize_result = self.cost(input_solution,cr0,hk0)#cost should return a new output solutions, which will be mixed with the input solution until convergence
             test_solution = np.copy((step*self.minimize_result) + (input_solution))
             error = np.amax(np.sum(np.abs(input_solution-test_solution),axis=0))
-            print("counter:",counter,error)
+            if disp:
+                print("counter:",counter,error)
             counter = counter + 1
             input_solution = np.copy(test_solution)
+            if (callback is not None) and self._report(callback,counter,self.minimize_result):
+                break
         
-        if self.totalCorr.space == Space.Fourier:
-            self.sys.domain.MatrixArray_to_real(self.totalCorr)
+        self._check_solution()
+        
+        return self.minimize_result
 
-        tol = 1e-5
-        warnstr = 'Pair correlations are negative (value = {:3.2e}) for {}-{} pair!'
-        for i,(t1,t2),H in self.totalCorr.iterpairs():
-            if np.any(H<-(1.0+tol)):
-                val = np.min(H)
-                warnings.warn(warnstr.format(val,t1,t2))
+    def solve_anderson(self,guess=None,depth=None,step=None,tol=None,maxiter=None,cr0=None,hk0=None,hk_initial=None,packed=False,callback=None):
+        r'''Attempt to numerically solve the PRISM equations using Anderson (DIIS) mixing
+
+        Anderson mixing accelerates the Picard scheme of :func:`solve_picard`
+        by keeping a bounded history of the most recent inputs
+        (:math:`\gamma_{in}`) and residuals (:math:`\gamma_{out}-\gamma_{in}`)
+        of :func:`cost`. Each new input is extrapolated from the linear
+        combination of previous iterates that minimizes the residual in a
+        least-squares sense. This typically requires far fewer calls to
+        :func:`cost` than plain linear mixing.
+
+        As for :func:`solve`, Systems whose closures do not depend on
+        :math:`\gamma` are solved directly.
+
+        The mixing fraction is adapted as the solution proceeds. Steps which
+        more than double the residual (both its largest absolute value and
+        its 2-norm) are rejected, the history is restarted, and the mixing
+        fraction is halved. After each accepted step, the
+        mixing fraction slowly recovers towards its initial value. If a step
+        is rejected at the smallest mixing fraction (1% of step) without any
+        history, the solution process stops unsuccessfully.
+
+        Parameters
+        ----------
+        guess: np.ndarray, size (rank*rank*length)
+            The initial guess of :math:`\gamma` to the numerical solution process.
+            The numpy array should be of size rank x rank x length corresponding to 
+            the a full flattened MatrixArray. If not specified, an initial guess
+            of all zeros is used. For atomic hard-sphere
+            systems with Percus-Yevick closures, the analytical solution
+            (:func:`pyPRISM.calculate.hard_sphere_guess`) is used instead.
+
+        depth: int
+            Maximum number of previous iterates used in the extrapolation. A
+            depth of zero reduces this method to damped Picard iteration.
+            Default is 5.
+
+        step: np.float
+            Initial (and maximum) fraction of the new solution to mix with the
+            old solution where 0 is none and 1 is all of the new solution.
+            Default is 0.5.
+
+        tol: np.float
+            Convergence is declared when the largest absolute residual falls
+            below this value. Default is 1.0E-6.
+
+        maxiter: int
+            Maximum number of iterations (i.e. calls to :func:`cost`
+            including rejected steps). Default is 1000.
+
+        cr0: np.ndarray, size (rank*rank*length)
+            The reference direct correlation functions
         
+        hk0: np.ndarray, size (rank*rank*length)
+            The reference total correlation functions
+
+        packed: bool
+            If True, only the independent (upper triangle) pair-functions are
+            iterated using :func:`cost_packed`. This halves the memory used
+            for the iteration history. The returned solution is always
+            unpacked to size rank x rank x length.
+
+        callback: callable, *optional*
+            Called as callback(info) after every iteration. See :func:`solve`
+            for the contents of info. If the callback returns *True*, the
+            solution process is stopped.
+
+        Returns
+        -------
+        result: scipy.optimize.OptimizeResult
+            Result object with the same layout as that returned by
+            :func:`solve`. This is also stored as self.minimize_result.
+        '''
+        if depth is None:
+            depth = 5
+
+        if step is None:
+            step = 0.5
+
+        if tol is None:
+            tol = 1.0E-6
+
+        if maxiter is None:
+            maxiter = 1000
+
+        guess,cr0,hk0 = self._prepare_solve(guess,cr0,hk0,hk_initial)
+
+        # closures which do not depend on gamma need no iteration
+        direct = self._solve_direct(cr0,hk0,tol)
+        if direct is not None:
+            return direct
+
+        # the off-diagonal pairs appear twice in the full layout, so they
+        # are weighted twice in the packed layout to mix both identically
+        weight = None
+        if packed:
+            cost = self.cost_packed
+            guess = self._pack(guess)
+            weight = 2.0 - self._pack(np.tile(np.eye(self.sys.rank),(self.sys.domain.length,1,1)))
+        else:
+            cost = self.cost
+
+        x = np.array(guess,dtype=float)
+        f = np.copy(cost(x,cr0,hk0))
+        mixing = AndersonMixing(x[np.newaxis],f[np.newaxis],depth,step,weight)
+        member = np.zeros(1,dtype=int)
+
+        nit = 0
+        nfev = 1
+        diverged = False
+        stalled = False
+        aborted = False
+        success = mixing.error[0]<tol
+        while (not success) and (nit<maxiter):
+            x_new = mixing.propose(member)
+            f_new = np.copy(cost(x_new[0],cr0,hk0))
+            nit += 1
+            nfev += 1
+
+            accept,failed = mixing.update(member,x_new,f_new[np.newaxis])
+            if failed[0]:
+                diverged = not np.all(np.isfinite(f_new))
+                stalled = not diverged
+                break
+            elif not accept[0]:
+                continue
+
+            success = mixing.error[0]<tol
+
+            if (callback is not None) and (not success):
+                if self._report(callback,nit,self._unpack(mixing.f[0]) if packed else mixing.f[0]):
+                    aborted = True
+                    break
+
+        x,f = mixing.x[0],mixing.f[0]
+
+        if success:
+            message = 'A solution was found at the specified tolerance.'
+        elif diverged:
+            message = 'Non-finite residual encountered.'
+        elif stalled:
+            message = 'The residual increased at the smallest mixing fraction.'
+        elif aborted:
+            message = 'Solution aborted by callback.'
+        else:
+            message = 'The maximum number of iterations was exceeded.'
+
+        if packed:
+            x = self._unpack(x)
+            f = self._unpack(f)
+
+        # make sure the stored state of the object corresponds to the returned solution
+        if not np.array_equal(x,self.x1):
+            f = np.copy(self.cost(x,cr0,hk0))
+            nfev += 1
+
+        self.minimize_result = OptimizeResult(x=x,fun=f,success=success,status=int(not success),message=message,nit=nit,nfev=nfev)
+
+        self._check_solution()
+
         return self.minimize_result
 
-    def solve(self,guess=None,method='krylov',options=None,tol=None,cr0=None,hk0=None,hk_initial=None):
-        '''Attempt to numerically solve the PRISM equations
+    def solve_newton(self,guess=None,tol=None,maxiter=None,inner_maxiter=None,cr0=None,hk0=None,hk_initial=None,packed=False,callback=None,precondition=False,refresh=5):
+        r'''Attempt to numerically solve the PRISM equations using an exact Newton-Krylov method
+
+        Each Newton step is found by solving :math:`J\,\delta x = -F` with
+        GMRES, where the action of the Jacobian :math:`J` is computed exactly
+        by :func:`jvp` rather than approximated by finite differences of
+        :func:`cost`. The step is then shortened by backtracking until the
+        residual norm decreases sufficiently. The GMRES tolerance is
+        tightened as the residual decreases.
+
+        As for :func:`solve`, Systems whose closures do not depend on
+        :math:`\gamma` are solved directly.
+
+        All closures must define their derivative with respect to
+        :math:`\gamma` (see :class:`pyPRISM.closure.AtomicClosure`).
+
+        Parameters
+        ----------
+        guess: np.ndarray, size (rank*rank*length)
+            The initial guess of :math:`\gamma` to the numerical solution process.
+            If not specified, an initial guess of all zeros is used. For atomic hard-sphere
+            systems with Percus-Yevick closures, the analytical solution
+            (:func:`pyPRISM.calculate.hard_sphere_guess`) is used instead.
+
+        tol: np.float
+            Convergence is declared when the largest absolute residual falls
+            below this value. Default is 1.0E-6.
+
+        maxiter: int
+            Maximum number of Newton iterations. Default is 50.
+
+        inner_maxiter: int
+            Maximum number of GMRES iterations (i.e. calls to :func:`jvp`)
+            per Newton iteration. Default is 30.
+
+        cr0: np.ndarray, size (rank*rank*length)
+            The reference direct correlation functions
+        
+        hk0: np.ndarray, size (rank*rank*length)
+            The reference total correlation functions
+
+        packed: bool
+            If True, only the independent (upper triangle) pair-functions are
+            solved for using :func:`cost_packed` and :func:`jvp_packed`. The
+            returned solution is always unpacked to size rank x rank x length.
+
+        callback: callable, *optional*
+            Called as callback(info) after every Newton iteration. See
+            :func:`solve` for the contents of info. If the callback returns
+            *True*, the solution process is stopped.
+
+        precondition: bool
+            If True, GMRES is preconditioned with a
+            :class:`pyPRISM.core.Preconditioner.Preconditioner`
+
+        refresh: int
+            Number of Newton iterations between rebuilds of the
+            preconditioner
+
+        Returns
+        -------
+        result: scipy.optimize.OptimizeResult
+            Result object with the same layout as that returned by
+            :func:`solve`, plus the number of Jacobian-vector products (njev).
+            This is also stored as self.minimize_result.
+        '''
+        if tol is None:
+            tol = 1.0E-6
+
+        if maxiter is None:
+            maxiter = 50
+
+        if inner_maxiter is None:
+            inner_maxiter = 30
+
+        guess,cr0,hk0 = self._prepare_solve(guess,cr0,hk0,hk_initial)
+
+        # closures which do not depend on gamma need no iteration
+        direct = self._solve_direct(cr0,hk0,tol)
+        if direct is not None:
+            return direct
+
+        if packed:
+            cost,jvp = self.cost_packed,self.jvp_packed
+            guess = self._pack(guess)
+        else:
+            cost,jvp = self.cost,self.jvp
+
+        njev = [0]
+        def matvec(v):
+            njev[0] += 1
+            return jvp(np.ravel(v))
+
+        x = np.array(guess,dtype=float)
+        f = np.copy(cost(x,cr0,hk0))
+        error = np.max(np.abs(f))
+        norm = np.linalg.norm(f)
+        J = LinearOperator((x.size,x.size),matvec=matvec,dtype=float)
+
+        M = None
+        if precondition:
+            M = Preconditioner(self,refresh=refresh,packed=packed)
+
+        nit = 0
+        nfev = 1
+        message = None
+        success = error<tol
+        while (not success) and (nit<maxiter):
+            # the Jacobian is applied at the most recent input of cost, i.e. x
+            eta = min(0.1,error)
+            dx,info = gmres(J,-f,rtol=eta,atol=0.0,restart=inner_maxiter,maxiter=1,M=M)
+            nit += 1
+
+            # backtrack until the residual norm decreases sufficiently
+            lam = 1.0
+            for backtrack in range(12):
+                x_new = x + lam*dx
+                f_new = np.copy(cost(x_new,cr0,hk0))
+                nfev += 1
+                norm_new = np.linalg.norm(f_new)
+                if np.isfinite(norm_new) and (norm_new<=(1.0-1.0E-4*lam)*norm):
+                    break
+                lam *= 0.5
+            else:
+                message = 'The line search failed to reduce the residual.'
+                break
+
+            x,f,norm = x_new,f_new,norm_new
+            error = np.max(np.abs(f))
+            success = error<tol
+
+            if (M is not None) and (not success):
+                M.update(x,f)
+
+            if (callback is not None) and (not success):
+                if self._report(callback,nit,self._unpack(f) if packed else f):
+                    message = 'Solution aborted by callback.'
+                    break
+
+        if success:
+            message = 'A solution was found at the specified tolerance.'
+        elif message is None:
+            message = 'The maximum number of iterations was exceeded.'
+
+        if packed:
+            x = self._unpack(x)
+            f = self._unpack(f)
+
+        # make sure the stored state of the object corresponds to the returned solution
+        if not np.array_equal(x,self.x1):
+            f = np.copy(self.cost(x,cr0,hk0))
+            nfev += 1
+
+        self.minimize_result = OptimizeResult(x=x,fun=f,success=success,status=int(not success),message=message,nit=nit,nfev=nfev,njev=njev[0])
+
+        self._check_solution()
+
+        return self.minimize_result
+
+    def _coarse_grids(self,levels,coarsen):
+        '''Domains of the coarser levels of :func:`solve_multigrid`, coarsest first'''
+        domain = self.sys.domain
+        rmax = domain.dr*domain.length
+        grids = []
+        for level in range(levels-1,0,-1):
+            length = domain.length//(2**level)
+            if length<2:
+                raise ValueError('Domain of length {} is too short for {} multigrid levels'.format(domain.length,levels))
+            if coarsen=='dr':
+                dr = rmax/length
+            elif coarsen=='rmax':
+                dr = domain.dr
+            else:
+                raise ValueError('Unknown coarsening {}. Options are \'dr\' and \'rmax\''.format(coarsen))
+            grids.append(Domain(length=length,dr=dr,workers=domain.workers))
+        return grids
+
+    def _interpolate(self,x,old,new,right=None):
+        '''Linearly interpolate flattened MatrixArray data between grids'''
+        rank = self.sys.rank
+        x = np.reshape(x,(len(old),rank*rank))
+        y = np.empty((len(new),rank*rank))
+        for i in range(rank*rank):
+            y[:,i] = np.interp(new,old,x[:,i],right=right)
+        return y.reshape((-1,))
+
+    def solve_multigrid(self,guess=None,levels=3,coarsen='dr',solver='solve',cr0=None,hk0=None,hk_initial=None,**kwargs):
+        r'''Attempt to numerically solve the PRISM equations on a sequence of successively finer grids
+
+        The PRISM equations are first solved on a coarse version of the
+        Domain. The solution :math:`\gamma(r)` is then linearly interpolated
+        onto the next finer grid and used as the initial guess there, until
+        the full Domain of this object is reached. As most of the nonlinear
+        iterations are carried out on the cheap, coarse grids, this can
+        greatly reduce the time needed to solve on large Domains from a poor
+        initial guess.
+
+        Each coarser level halves the number of gridpoints. The grid can be
+        coarsened in two ways:
+
+        - 'dr': the grid spacing is doubled while the real-space extent
+          (:math:`r_{max}`) is fixed
+        - 'rmax': the grid spacing is fixed while the real-space extent is
+          halved. On refinement, :math:`\gamma(r)` is extended with zeros
+          beyond the coarser :math:`r_{max}`.
+
+        The coarsest grid must still resolve the problem: with 'dr' its
+        spacing should remain well below the smallest site diameter, and with
+        'rmax' its extent should remain well beyond the range of the
+        correlation functions. Otherwise the coarse solutions are poor initial
+        guesses and the coarse levels can take longer to converge than the
+        full problem.
+
+        The omega of the System must be able to be evaluated on any
+        wavenumber grid (i.e. not :class:`pyPRISM.omega.FromArray`). The
+        reference correlation functions cr0, hk0 and hk_initial are
+        interpolated onto each coarse grid.
+
+        Parameters
+        ----------
+        guess: np.ndarray, size (rank*rank*length)
+            Initial guess of :math:`\gamma` on the grid of this object. This
+            is interpolated onto the coarsest grid. If not specified, an
+            initial guess of all zeros is used.
+
+        levels: int
+            Total number of grids including the grid of this object
+
+        coarsen: str
+            How to coarsen the grid: 'dr' (default) or 'rmax'
+
+        solver: str
+            Name of the method used to solve each level, e.g. 'solve'
+            (default), 'solve_anderson' or 'solve_newton'. As
+            :func:`solve_picard` does not return a result object, it cannot
+            be used.
+
+        cr0: np.ndarray, size (rank*rank*length)
+            The reference direct correlation functions
+        
+        hk0: np.ndarray, size (rank*rank*length)
+            The reference total correlation functions
+
+        kwargs:
+            All other keyword arguments are passed to the solver at every
+            level
+
+        Returns
+        -------
+        result: scipy.optimize.OptimizeResult
+            Result of the solve on the grid of this object, also stored as
+            self.minimize_result. The results of the coarser levels are
+            stored, coarsest first, as result.levels.
+
+        Example
+        -------
+        .. code-block:: python
+
+            import pyPRISM
+
+            sys = pyPRISM.System(['A','B'],kT=1.0)
+            sys.domain = pyPRISM.Domain(dr=0.01,length=2**16)
+            # ** finish populating system object **
+            PRISM = sys.createPRISM()
+
+            # solve on grids of 2**12, 2**13, ... 2**16 points
+            PRISM.solve_multigrid(levels=5,coarsen='dr',solver='solve_newton')
+        '''
+        if solver=='solve_picard':
+            raise ValueError('solve_picard does not return a result object and cannot be used with solve_multigrid')
+
+        domain = self.sys.domain
+
+        if guess is None:
+            guess = np.zeros(self.sys.rank*self.sys.rank*domain.length)
+
+        x,r = guess,domain.r
+        results = []
+        for grid in self._coarse_grids(levels,coarsen):
+            x,r = self._interpolate(x,r,grid.r,right=0.0),grid.r
+
+            reference = {}
+            for name,value,points in [('cr0',cr0,'r'),('hk0',hk0,'k'),('hk_initial',hk_initial,'k')]:
+                if value is not None:
+                    reference[name] = self._interpolate(value,getattr(domain,points),getattr(grid,points))
+
+            sys = self.sys.snapshot()
+            sys.domain = grid
+            coarse = PRISM(sys)
+            results.append(getattr(coarse,solver)(guess=x,**reference,**kwargs))
+
+            # even an unconverged level usually improves on the guess unless
+            # the solution diverged. The solver's iterate is used rather than
+            # coarse.x1, which may be a perturbed point of a finite-difference
+            # Jacobian product.
+            if np.all(np.isfinite(results[-1].x)):
+                x = np.copy(results[-1].x)
+
+        if results:
+            x = self._interpolate(x,r,domain.r,right=0.0)
+
+        result = getattr(self,solver)(guess=x,cr0=cr0,hk0=hk0,hk_initial=hk_initial,**kwargs)
+        result.levels = results
+        return result
+
+    def solve(self,guess=None,method='krylov',options=None,tol=None,cr0=None,hk0=None,hk_initial=None,packed=False,callback=None,precondition=False,refresh=5,strategy=None,max_time=None,max_cost_calls=None,homotopy=None,steps=10):
+        r'''Attempt to numerically solve the PRISM equations
         
         Using the supplied inputs (in the constructor), we attempt to numerically
         solve the PRISM equations using the scheme laid out in :func:`cost`. If the 
@@ -284,6 +1156,16 @@ class PRISM:
         physical. At this point, this consists of checking to make sure that
         the pair correlation functions are not negative. If this isn't true
         a warning is issued to the user. 
+
+        If no closure depends on :math:`\gamma` (e.g. the
+        MeanSphericalApproximation without the hard core condition), the
+        PRISM equations are linear and the solution is calculated directly
+        with two calls of :func:`cost`, regardless of the chosen method.
+        If all closures are affine in :math:`\gamma` (e.g. the
+        MeanSphericalApproximation with the hard core condition), the
+        'krylov' method is replaced by :func:`solve_newton`, which uses the
+        exact Jacobian and converges in a few steps. Only the maxiter entry
+        of options is used in this case.
         
         Parameters
         ----------
@@ -291,7 +1173,9 @@ class PRISM:
             The initial guess of :math:`\gamma` to the numerical solution process.
             The numpy array should be of size rank x rank x length corresponding to 
             the a full flattened MatrixArray. If not specified, an initial guess
-            of all zeros is used. 
+            of all zeros is used. For atomic hard-sphere
+            systems with Percus-Yevick closures, the analytical solution
+            (:func:`pyPRISM.calculate.hard_sphere_guess`) is used instead.
             
         method: string
             Set the type of optimization scheme to use. The scipy documentation
@@ -304,34 +1188,164 @@ class PRISM:
             Dictionary of options specific to the chosen solver method. The
             scipy documentation for `scipy.optimize.root
             <https://docs.scipy.org/doc/scipy/reference/generated/scipy.optimize.root.html>`__
-            details the possible values for this parameter. 
+            details the possible values for this parameter. Progress is not
+            printed unless {'disp':True} is passed; use callback to monitor
+            the solution process.
 
         cr0: np.ndarray, size (rank*rank*length)
             The reference direct correlation functions
         
         hk0: np.ndarray, size (rank*rank*length)
             The reference total correlation functions
+
+        packed: bool
+            If True, only the rank*(rank+1)/2 independent (upper triangle)
+            pair-functions are handed to the solver using
+            :func:`cost_packed`, rather than the full, redundant rank*rank set.
+            This halves the number of unknowns and the size of the Krylov
+            subspace. Note that the residual norm used by the solver then
+            counts each off-diagonal pair once rather than twice. The returned
+            solution is always unpacked to size rank x rank x length.
+
+        callback: callable, *optional*
+            Called as callback(info) after every solver iteration (or, for the
+            'hybr' and 'lm' methods, after every call to :func:`cost`). info
+            is a dictionary with the following keys:
+
+            - iteration: iteration index
+            - cost_calls: cumulative number of calls to :func:`cost`
+            - residual: maximum absolute residual over all pairs
+            - residual_norm: L2-norm of the full residual
+            - pair_residual: dictionary mapping each (type1,type2) pair to
+              its maximum absolute residual
+            - timings: dictionary of the cumulative wall time (in seconds)
+              spent in the closures ('closure'), the forward and inverse
+              transforms ('transform'), and the solution of the PRISM
+              equation at each wavenumber ('inversion')
+
+            If the callback returns *True*, the solution process is stopped
+            and minimize_result.success is set to *False*. The cost() call
+            count and timings are also available as self.cost_calls and
+            self.timings after the solve.
+
+        precondition: bool
+            If True, the inner GMRES iterations of the 'krylov' method are
+            preconditioned with a
+            :class:`pyPRISM.core.Preconditioner.Preconditioner`, i.e. an
+            approximate inverse of the Jacobian of :func:`cost` about a
+            recent iterate. This works best from a good initial guess. This
+            is passed to scipy as
+            options['jac_options']['inner_M']. Only supported for the
+            'krylov' method.
+
+        refresh: int
+            Number of outer iterations between rebuilds of the
+            preconditioner. Rebuilding requires no extra calls to
+            :func:`cost`.
+
+        strategy: str or list, *optional*
+            If specified, the solution is attempted with an ordered chain of
+            solvers until one succeeds. Each stage of the chain is either a
+            name or a (name,kwargs) tuple, where name is 'anderson'
+            (:func:`solve_anderson`), 'newton' (:func:`solve_newton`),
+            'picard' (damped Picard iteration, i.e. :func:`solve_anderson`
+            with depth=0 and a default step of 0.1) or a scipy root method
+            such as 'krylov' (this function), and kwargs are passed to that
+            solver. The kwargs may also contain a max_time and
+            max_cost_calls budget for that stage alone. 'auto' selects
+            pyPRISM.sweep.strategy.default_strategy, i.e. krylov (limited to 2000 calls of
+            :func:`cost`), then Anderson mixing, then damped Picard
+            iteration, and finally a density homotopy (see below).
+
+            Each attempt is aborted as soon as a residual is not finite
+            (e.g. due to overflow in a closure). Later attempts start from
+            the best finite iterate of the previous attempts. The returned
+            result has two additional attributes: attempts, a list with a
+            dictionary (strategy, options, success, message, cost_calls,
+            time, residual) for each attempt, and strategy, the chain
+            reordered to start with the successful stage. Passing the latter
+            as the strategy of similar Systems avoids repeating failed
+            attempts (see :func:`pyPRISM.sweep.continuation`).
+
+        max_time: float, *optional*
+            Wall-time budget in seconds for all attempts of a strategy. The
+            current attempt is aborted and no further attempts are made once
+            it is exceeded. Implies strategy=[method] if no strategy is
+            given.
+
+        max_cost_calls: int, *optional*
+            Budget of calls to :func:`cost` for all attempts of a strategy.
+            Implies strategy=[method] if no strategy is given.
+
+        homotopy: str, *optional*
+            If 'density', the site densities are ramped from a dilute state
+            to their target values. If 'kT', the potentials are ramped from
+            weak to full strength by lowering the temperature from a high
+            value to the target kT. Each point on the path is solved with
+            the given method, starting from the solution at the previous
+            point. Each point may use up to 2000 calls of :func:`cost`.
+            After a failure, the step along the path is halved (up to
+            6 times) and after a success it is increased by half. The
+            densities (or kT), omega and closure potentials of this object
+            are updated in place, and are always restored to their target
+            values afterwards. Only the solution at the target state is
+            checked for unphysical correlation functions. The result has an additional attribute path,
+            a list with a dictionary (fraction, success, cost_calls) for each
+            point. This is also available as the 'homotopy' stage of a
+            strategy, which accepts the keyword arguments parameter
+            ('density' or 'kT'), steps, solver (a stage as above, default
+            'anderson'), max_subdivisions and max_point_calls (the budget of
+            :func:`cost` calls for each point, default 2000).
+
+        steps: int
+            Initial number of equal steps of a homotopy, i.e. the path
+            starts at 1/steps of the target densities or potential strength
         
         '''
-        if guess is None:
-            guess = np.zeros(self.sys.rank*self.sys.rank*self.sys.domain.length)
+        if homotopy is not None:
+            if strategy is not None:
+                raise ValueError('Pass either a homotopy or a strategy. A strategy may contain a homotopy stage.')
+            stage = {'options':options}
+            if precondition:
+                stage.update(precondition=precondition,refresh=refresh)
+            strategy = [('homotopy',{'parameter':homotopy,'steps':steps,'solver':(method,stage)})]
 
-        if cr0 is None:
-            cr0 = np.zeros(self.sys.rank*self.sys.rank*self.sys.domain.length)
+        if (strategy is None) and ((max_time is not None) or (max_cost_calls is not None)):
+            stage = {'options':options}
+            if precondition:
+                stage.update(precondition=precondition,refresh=refresh)
+            strategy = [(method,stage)]
 
-        if hk0 is None:
-            hk0 = np.zeros(self.sys.rank*self.sys.rank*self.sys.domain.length)
+        if strategy is not None:
+            # imported here as pyPRISM.sweep imports this module indirectly
+            from pyPRISM.sweep.strategy import solve_strategy
+            return solve_strategy(self,strategy,guess,tol,cr0,hk0,hk_initial,packed,callback,max_time,max_cost_calls)
 
-        if hk_initial is None:
-            hk_initial = hk0
+        # closures which are affine in gamma are solved in a few exact
+        # Newton steps
+        if (method=='krylov') and all(closure.affine for (i,j),(t1,t2),closure in self.sys.closure.iterpairs()):
+            maxiter = None if options is None else options.get('maxiter',None)
+            return self.solve_newton(guess=guess,tol=1e-5 if tol is None else tol,maxiter=maxiter,cr0=cr0,hk0=hk0,hk_initial=hk_initial,packed=packed,callback=callback,precondition=precondition,refresh=refresh)
 
-        self.totalCorr.data = np.copy(hk_initial.reshape((-1,self.sys.rank,self.sys.rank)))
+        guess,cr0,hk0 = self._prepare_solve(guess,cr0,hk0,hk_initial)
             
         if options is None:
-            options = {'disp':True}
+            options = {}
 
         if tol is None:
             tol = 1e-5
+
+        # closures which do not depend on gamma need no iteration
+        direct = self._solve_direct(cr0,hk0,tol)
+        if direct is not None:
+            return direct
+
+        if precondition:
+            if method!='krylov':
+                raise ValueError('Preconditioning is only supported for the krylov method, not {}'.format(method))
+            options = dict(options)
+            options['jac_options'] = dict(options.get('jac_options',{}))
+            options['jac_options']['inner_M'] = Preconditioner(self,refresh=refresh,packed=packed)
         
         warnstr = 'For Reference Molecular Percus Yevick closure (RMPY) use caution if using solve. solve_picard may provide better convergence.'
         for (i,j),(t1,t2),closure in self.sys.closure.iterpairs():
@@ -339,16 +1353,50 @@ class PRISM:
                 if closure.name == "RMPY":
                     warnings.warn(warnstr)
 
-        self.minimize_result = root(self.cost,guess,args=(cr0,hk0),method=method,options=options)
-        
-        if self.totalCorr.space == Space.Fourier:
-            self.sys.domain.MatrixArray_to_real(self.totalCorr)
+        if packed:
+            cost = self.cost_packed
+            guess = self._pack(guess)
+        else:
+            cost = self.cost
 
-        #tol = 1e-5
-        warnstr = 'Pair correlations are negative (value = {:3.2e}) for {}-{} pair!'
-        for i,(t1,t2),H in self.totalCorr.iterpairs():
-            if np.any(H<-(1.0+tol)):
-                val = np.min(H)
-                warnings.warn(warnstr.format(val,t1,t2))
+        root_callback = None
+        if callback is not None:
+            iteration = [0]
+            def report(x,f):
+                iteration[0] += 1
+                if self._report(callback,iteration[0],self._unpack(f) if packed else f):
+                    raise _SolverAbort()
+
+            if method in ('hybr','lm'):
+                # these methods do not support callbacks so we report after
+                # every evaluation of the cost function instead
+                unwrapped = cost
+                def cost(x,*args):
+                    f = unwrapped(x,*args)
+                    report(x,f)
+                    return f
+            else:
+                root_callback = report
+
+        try:
+            self.minimize_result = root(cost,guess,args=(cr0,hk0),method=method,options=options,callback=root_callback)
+        except _SolverAbort:
+            self.minimize_result = OptimizeResult(
+                x=np.copy(self.x1),
+                fun=np.copy(self.y.reshape((-1,))),
+                success=False,
+                status=1,
+                message='Solution aborted by callback.',
+                nit=iteration[0],
+                nfev=self.cost_calls,
+            )
+        else:
+            if packed:
+                self.minimize_result.x = self._unpack(self.minimize_result.x)
+                self.minimize_result.fun = self._unpack(self.minimize_result.fun)
+                if not np.array_equal(self.minimize_result.x,self.x1):
+                    self.cost(self.minimize_result.x,cr0,hk0)
+        
+        self._check_solution(tol)
         
         return self.minimize_result
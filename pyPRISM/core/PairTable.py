@@ -201,6 +201,26 @@ class PairTable(Table):
             MA[t1,t2] = val
         return MA
     
+    def snapshot(self):
+        '''Return a copy of this table holding shallow copies of all values
+
+        Attribute changes to the values of the copy (or of this table) do not
+        affect the other table, while large data held by the values (e.g.
+        arrays) are shared rather than duplicated. Symmetric pairs which refer
+        to the same value continue to do so in the copy.
+        '''
+        table = copy.copy(self)
+        memo = {}
+        table.values = {}
+        for t1 in self.types:
+            table.values[t1] = {}
+            for t2 in self.types:
+                value = self.values[t1][t2]
+                if id(value) not in memo:
+                    memo[id(value)] = copy.copy(value)
+                table.values[t1][t2] = memo[id(value)]
+        return table
+
     def apply(self,func,inplace=True):
         '''Apply a function to all elements in the table in place
         
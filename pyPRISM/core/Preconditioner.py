@@ -0,0 +1,275 @@
+#!python
+from pyPRISM.core.Space import Space
+from pyPRISM.core.MatrixArray import MatrixArray
+from pyPRISM.closure.MolecularClosure import MolecularClosure
+from scipy.sparse.linalg import LinearOperator
+import numpy as np
+import warnings
+
+class Preconditioner(LinearOperator):
+    r'''Approximate inverse of the Jacobian of the PRISM cost function
+
+    **Mathematical Definition**
+
+    .. math::
+
+        J = A\,D - I
+
+    .. math::
+
+        \hat{A}(k)\,\delta\hat{C} = (I-\hat{\Omega}\hat{C})^{-1}\hat{\Omega}\,\delta\hat{C}\,(I-\hat{\Omega}\hat{C})^{-1}\hat{\Omega}\,/\rho - \delta\hat{C}
+
+    .. math::
+
+        D_{\alpha,\beta}(r) \approx
+        \begin{cases}
+            \partial c_{\alpha,\beta}(r)/\partial\gamma_{\alpha,\beta}(r) & r \leq \sigma_{\alpha,\beta} \\
+            s_{\alpha,\beta} & r > \sigma_{\alpha,\beta}
+        \end{cases}
+
+    **Variable Definitions**
+
+        - :math:`(I-\hat{\Omega}\hat{C})^{-1}`
+            Per-wavenumber matrices of the PRISM equation at the
+            linearization point
+
+        - :math:`D_{\alpha,\beta}(r)`
+            Derivative of the closure of pair :math:`\alpha,\beta` with
+            respect to :math:`\gamma`
+
+        - :math:`s_{\alpha,\beta}`
+            Average of this derivative outside the core, i.e. over
+            :math:`r>\sigma_{\alpha,\beta}`
+
+    **Description**
+
+        The Jacobian of :func:`pyPRISM.core.PRISM.PRISM.cost` couples all
+        pairs at each wavenumber through the PRISM equation (:math:`A`),
+        but couples different wavenumbers only through the real-space
+        closure derivatives (:math:`D`). Outside the core, the derivatives
+        are replaced by their average so that this part of the Jacobian,
+        :math:`G = A\,s - I`, is block diagonal in Fourier space with one
+        npairs x npairs block per wavenumber. Inside the core (e.g.
+        :math:`\partial c/\partial\gamma=-1` for hard-core closures), the
+        derivatives are kept exactly and the coupling of the core points is
+        eliminated with a dense Schur complement of size
+        :math:`\sum_{\alpha,\beta} n_{core}` built from :math:`G^{-1}`.
+
+        The result is the exact inverse of the Jacobian whenever the
+        closure derivatives are constant outside the core, e.g. for hard
+        spheres with the Percus-Yevick closure. Applying it costs three
+        forward and two inverse transforms.
+
+        The blocks are built from the most recent input of
+        :func:`pyPRISM.core.PRISM.PRISM.cost` on first use and rebuilt every
+        *refresh* calls of :func:`update`. scipy's Krylov solver calls update
+        after each nonlinear iteration when this object is passed as
+        jac_options['inner_M']. Building the Schur complement requires two
+        transforms per core point, so fine grids with large site diameters
+        (many core points) make rebuilds expensive. Only the cores of
+        closures which apply the hard core condition are treated exactly.
+        If the cores contain more than *max_core* points in total, the
+        derivatives are averaged over all points instead, i.e. the cores
+        are not treated separately.
+
+        Close to the solution, this greatly reduces the number of Krylov
+        iterations. Far from it (e.g. from a zero guess at high density),
+        the more accurate Newton steps may overshoot, so preconditioning is
+        best combined with a good initial guess.
+
+        This is typically used via the precondition option of
+        :func:`pyPRISM.core.PRISM.PRISM.solve` or
+        :func:`pyPRISM.core.PRISM.PRISM.solve_newton`.
+
+    Example
+    -------
+    .. code-block:: python
+
+        import pyPRISM
+
+        sys = pyPRISM.System(['A','B'],kT=1.0)
+        # ** finish populating system object **
+        PRISM = sys.createPRISM()
+
+        # rebuild the preconditioner every 3 iterations
+        PRISM.solve(precondition=True,refresh=3)
+
+    '''
+    def __init__(self,PRISM,refresh=5,packed=False,max_core=4096):
+        r'''Constructor
+
+        Arguments
+        ---------
+        PRISM: pyPRISM.core.PRISM
+            PRISM object whose cost function is being solved
+
+        refresh: int
+            Number of calls to :func:`update` between rebuilds of the
+            per-wavenumber blocks. If 0 or None, the blocks are only built
+            once.
+
+        packed: bool
+            If True, operate on the packed layout of
+            :func:`pyPRISM.core.PRISM.PRISM.cost_packed`
+
+        max_core: int
+            Maximum total number of core points which are treated exactly.
+            The dense Schur complement has max_core**2 elements.
+        '''
+        self.PRISM = PRISM
+        self.refresh = refresh
+        self.packed = packed
+        self.max_core = max_core
+        self.updates = 0
+        self.builds = 0
+        self.inverse = None
+
+        length,rank = PRISM.sys.domain.length,PRISM.sys.rank
+        if packed:
+            size = length*rank*(rank+1)//2
+        else:
+            size = length*rank*rank
+        super().__init__(dtype=float,shape=(size,size))
+
+    def __repr__(self):
+        return '<Preconditioner refresh:{}>'.format(self.refresh)
+
+    def update(self,x=None,f=None):
+        '''Count a nonlinear iteration and rebuild the blocks if due'''
+        self.updates += 1
+        if self.refresh and (self.updates % self.refresh == 0):
+            self.build()
+
+    def build(self):
+        '''Build and invert the per-wavenumber blocks at the most recent input of cost'''
+        PRISM = self.PRISM
+        groups,pairwise,IOC,IOCO = PRISM._linearize()
+
+        domain = PRISM.sys.domain
+        length,rank,types = domain.length,PRISM.sys.rank,PRISM.sys.types
+        upper = np.triu_indices(rank)
+        npairs = len(upper[0])
+        pair = np.zeros((rank,rank),dtype=int)
+        pair[upper] = pair[upper[1],upper[0]] = np.arange(npairs)
+
+        derivative = np.zeros((length,npairs))
+        molecular = np.zeros((rank,rank),dtype=bool)
+        for (cls,ii,jj,potential,core),value in zip(PRISM._closure_groups,groups):
+            derivative[:,pair[ii,jj]] = value
+        for ((i,j),(t1,t2),closure),value in zip(PRISM._pairwise_closures,pairwise):
+            derivative[:,pair[i,j]] = value
+            molecular[i,j] = molecular[j,i] = isinstance(closure,MolecularClosure)
+
+        cores = []
+        for b,(i,j) in enumerate(zip(*upper)):
+            closure = PRISM.sys.closure[types[i],types[j]]
+            if getattr(closure,'apply_hard_core',False):
+                cores.append(np.flatnonzero(domain.r <= closure.sigma))
+            else:
+                cores.append(np.zeros(0,dtype=int))
+
+        ncore = sum(len(core) for core in cores)
+        if ncore>self.max_core:
+            warnings.warn('The cores contain {} points, more than max_core={}. The Preconditioner does not treat the cores exactly.'.format(ncore,self.max_core))
+            cores = [np.zeros(0,dtype=int) for core in cores]
+
+        slope = np.zeros(npairs)
+        for b,core in enumerate(cores):
+            outside = np.ones(length,dtype=bool)
+            outside[core] = False
+            if outside.any():
+                slope[b] = derivative[outside,b].mean()
+
+        # column b of each block is the linearized response to a unit
+        # perturbation of the direct correlation function of pair b
+        A = np.empty((length,npairs,npairs))
+        for b,(i,j) in enumerate(zip(*upper)):
+            unit = np.zeros((rank,rank))
+            unit[i,j] = unit[j,i] = 1.0
+            dC = MatrixArray(length=length,rank=rank,space=Space.Fourier,types=types)
+            dC.data[:] = unit
+            if molecular[i,j]:
+                omega = PRISM.omegaConvolution.data
+                dC.data /= (omega[:,i,i]*omega[:,j,j])[:,np.newaxis,np.newaxis]
+            dH = IOC.solve(PRISM.omega.dot(dC).dot(IOCO))
+            dH /= PRISM.sys.density.pair
+            response = dH.data - unit
+            A[:,:,b] = response[:,upper[0],upper[1]]
+
+        self.inverse = np.linalg.inv(A*slope - np.eye(npairs))
+        self.response = np.einsum('kab,kbc->kac',self.inverse,A)
+        self.derivative = derivative
+        self.cores = cores
+
+        # Schur complement of the core points: the core part of the
+        # solution of G x = (A D_core - I) e_m for each core point m
+        offsets = np.cumsum([0] + [len(core) for core in cores])
+        schur = np.zeros((offsets[-1],offsets[-1]))
+        for b,core in enumerate(cores):
+            if not len(core):
+                continue
+            unit = np.zeros((len(core),length))
+            unit[np.arange(len(core)),core] = 1.0
+            unit = domain.to_fourier(unit)
+            for a in range(npairs):
+                kernel = derivative[core,b,np.newaxis]*self.response[:,a,b] - self.inverse[:,a,b]
+                block = domain.to_real(kernel*unit)
+                schur[offsets[a]:offsets[a+1],offsets[b]:offsets[b+1]] = block[:,cores[a]].T
+        self.offsets = offsets
+        self.schur = np.linalg.inv(schur) if offsets[-1] else None
+
+        self.builds += 1
+
+    def _transform(self,packed,op):
+        '''Apply a per-wavenumber operator to packed Real-space pair-functions'''
+        PRISM = self.PRISM
+        length,rank = PRISM.sys.domain.length,PRISM.sys.rank
+        upper = np.triu_indices(rank)
+
+        sym = MatrixArray(length=length,rank=rank,space=Space.Real)
+        sym.data[:,upper[0],upper[1]] = packed
+        sym.data[:,upper[1],upper[0]] = packed
+        PRISM.sys.domain.MatrixArray_to_fourier(sym)
+        packed = np.einsum('kab,kb->ka',op,sym.data[:,upper[0],upper[1]])
+        sym.data[:,upper[0],upper[1]] = packed
+        sym.data[:,upper[1],upper[0]] = packed
+        PRISM.sys.domain.MatrixArray_to_real(sym)
+        return sym.data[:,upper[0],upper[1]]
+
+    def _matvec(self,v):
+        if self.inverse is None:
+            self.build()
+
+        PRISM = self.PRISM
+        length,rank = PRISM.sys.domain.length,PRISM.sys.rank
+        upper = np.triu_indices(rank)
+
+        if self.packed:
+            v = PRISM._unpack(np.ravel(v))
+        v = np.reshape(v,(length,rank,rank))
+
+        # The closures only see the upper triangle of gamma, so the lower
+        # triangle of the Jacobian is exactly the mirrored upper triangle
+        # minus the identity
+        w = v[:,upper[0],upper[1]]
+        lower = np.empty_like(v)
+        lower[:,upper[0],upper[1]] = w
+        lower[:,upper[1],upper[0]] = w
+        lower -= v
+
+        u = self._transform(w,self.inverse)
+        if self.schur is not None:
+            core = np.concatenate([u[core,a] for a,core in enumerate(self.cores)])
+            core = self.schur.dot(core)
+            y = np.zeros_like(u)
+            for a,index in enumerate(self.cores):
+                y[index,a] = core[self.offsets[a]:self.offsets[a+1]]
+            u += y - self._transform(self.derivative*y,self.response) + self._transform(y,self.inverse)
+
+        x = np.empty_like(v)
+        x[:,upper[0],upper[1]] = u
+        x[:,upper[1],upper[0]] = u
+        x += lower
+        if self.packed:
+            return PRISM._pack(x.reshape((-1,)))
+        return x.reshape((-1,))
@@ -1,6 +1,7 @@
 #!python 
 import warnings
 import numpy as np
+import copy
 from itertools import product
 from pyPRISM.core.PRISM import PRISM
 from pyPRISM.core.MatrixArray import MatrixArray
@@ -149,6 +150,32 @@ class System:
                 warn_text += 'Rounding will occur in closures, potentials, and omega!'
                 warnings.warn(warn_text)
 
+    def snapshot(self):
+        '''Return an independent copy of this System for use in a calculation
+
+        This is a lightweight alternative to copy.deepcopy. Every potential,
+        closure, and omega object is copied shallowly so that changes made to
+        their attributes (either by the user or by a PRISM object) are not
+        shared between this System and the snapshot. Large read-only data
+        held by these objects, such as tabulated omega arrays, are shared
+        rather than duplicated. The small density and diameter tables are
+        copied fully.
+
+        Returns
+        -------
+        sys: pyPRISM.core.System
+            Snapshot of this System
+        '''
+        sys = copy.copy(self)
+        sys.types = list(self.types)
+        sys.density = copy.deepcopy(self.density)
+        sys.diameter = copy.deepcopy(self.diameter)
+        sys.domain = copy.copy(self.domain)
+        sys.potential = self.potential.snapshot()
+        sys.closure = self.closure.snapshot()
+        sys.omega = self.omega.snapshot()
+        return sys
+
     def createPRISM(self):
         '''Construct a PRISM object
 
@@ -215,7 +242,112 @@ class System:
         
         return p
 
-    def solve(self,*args,**kwargs):
+    def solve_anderson(self,*args,cache=None,**kwargs):
+        '''Construct a PRISM object and attempt a numerical solution using Anderson mixing
+
+        .. note::
+
+            See :func:`~pyPRISM.core.PRISM.PRISM.solve_anderson` for arguments to this function
+
+        .. note::
+
+            This method calls :func:`~pyPRISM.core.System.System.check` before creating the PRISM object.
+
+        Parameters
+        ----------
+        cache: pyPRISM.util.SolutionCache, *optional*
+            If specified, the solution is loaded from this cache if
+            available. Otherwise the cache is used to find an initial guess
+            and the converged solution is stored in it.
+        
+        Returns
+        -------
+        PRISM: pyPRISM.core.PRISM
+            **Solved** PRISM object
+            
+        '''
+        self.check() #sanity check
+
+        if cache is not None:
+            return cache.solve(self,*args,solver='solve_anderson',**kwargs)
+
+        p = PRISM(self)
+
+        p.solve_anderson(*args,**kwargs)
+        
+        return p
+
+    def solve_newton(self,*args,cache=None,**kwargs):
+        '''Construct a PRISM object and attempt a numerical solution using the exact Newton-Krylov method
+
+        .. note::
+
+            See :func:`~pyPRISM.core.PRISM.PRISM.solve_newton` for arguments to this function
+
+        .. note::
+
+            This method calls :func:`~pyPRISM.core.System.System.check` before creating the PRISM object.
+
+        Parameters
+        ----------
+        cache: pyPRISM.util.SolutionCache, *optional*
+            If specified, the solution is loaded from this cache if
+            available. Otherwise the cache is used to find an initial guess
+            and the converged solution is stored in it.
+        
+        Returns
+        -------
+        PRISM: pyPRISM.core.PRISM
+            **Solved** PRISM object
+            
+        '''
+        self.check() #sanity check
+
+        if cache is not None:
+            return cache.solve(self,*args,solver='solve_newton',**kwargs)
+
+        p = PRISM(self)
+
+        p.solve_newton(*args,**kwargs)
+        
+        return p
+
+    def solve_multigrid(self,*args,cache=None,**kwargs):
+        '''Construct a PRISM object and attempt a numerical solution starting from coarser grids
+
+        .. note::
+
+            See :func:`~pyPRISM.core.PRISM.PRISM.solve_multigrid` for arguments to this function
+
+        .. note::
+
+            This method calls :func:`~pyPRISM.core.System.System.check` before creating the PRISM object.
+
+        Parameters
+        ----------
+        cache: pyPRISM.util.SolutionCache, *optional*
+            If specified, the solution is loaded from this cache if
+            available. Otherwise the cache is used to find an initial guess
+            and the converged solution is stored in it.
+        
+        Returns
+        -------
+        PRISM: pyPRISM.core.PRISM
+            **Solved** PRISM object
+            
+        '''
+        self.check() #sanity check
+
+        if cache is not None:
+            return cache.solve(self,*args,solver='solve_multigrid',**kwargs)
+
+        p = PRISM(self)
+
+        p.solve_multigrid(*args,**kwargs)
+        
+        return p
+
+    def solve(self,*args,cache=None,**kwargs):
         '''Construct a PRISM object and attempt a numerical solution
 
         .. note::
@@ -225,6 +357,13 @@ class System:
         .. note::
 
             This method calls :func:`~pyPRISM.core.System.System.check` before creating the PRISM object.
+
+        Parameters
+        ----------
+        cache: pyPRISM.util.SolutionCache, *optional*
+            If specified, the solution is loaded from this cache if
+            available. Otherwise the cache is used to find an initial guess
+            and the converged solution is stored in it.
         
         Returns
         -------
@@ -234,6 +373,9 @@ class System:
         '''
         self.check() #sanity check
 
+        if cache is not None:
+            return cache.solve(self,*args,solver='solve',**kwargs)
+
         p = PRISM(self)
 
         p.solve(*args,**kwargs)
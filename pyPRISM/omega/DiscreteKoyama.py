@@ -1,7 +1,7 @@
 #!python
 from pyPRISM.omega.Omega import Omega
+from pyPRISM.omega.chunked import weighted_sum
 import numpy as np
-from math import exp,sin,cos,sqrt
 from scipy.optimize import root
 
 class DiscreteKoyama(Omega):
@@ -138,20 +138,20 @@ class DiscreteKoyama(Omega):
             if result.success != True:
                 raise ValueError('DiscreteKoyama initialization failure. Could not solve for bending energy.')
 
-            self.epsilon = result.x
+            self.epsilon = float(result.x[0])
             self.cos2 = self.cos_sq_avg(self.epsilon)
     def cos_avg(self,epsilon):
         '''First moment of bond angle distribution'''
         e = epsilon
         cos0 = self.cos0
-        return 1/e  - ( exp(e) + cos0*exp(-e*cos0) )/( exp(e) - exp(-e*cos0) )
+        return 1/e  - ( np.exp(e) + cos0*np.exp(-e*cos0) )/( np.exp(e) - np.exp(-e*cos0) )
     
     def cos_sq_avg(self,epsilon):
         '''Second moment of bond angle distribution'''
         e = epsilon
         cos0 = self.cos0
         cos1 = self.cos_avg(epsilon)
-        return (2/e)*cos1 + ( exp(e) - cos0*cos0*exp(-e*cos0) )/( exp(e) - exp(-e*cos0) )
+        return (2/e)*cos1 + ( np.exp(e) - cos0*cos0*np.exp(-e*cos0) )/( np.exp(e) - np.exp(-e*cos0) )
     
     def kernel_base(self,n):
         ''' Calculates the second and fourth moments of the site separate distance distributions
@@ -162,8 +162,8 @@ class DiscreteKoyama(Omega):
 
         Arguments
         ---------
-        n: int
-            Integer separation distance along chain.
+        n: int or np.ndarray
+            Integer separation distance(s) along chain.
 
         '''
         l = self.l
@@ -188,6 +188,17 @@ class DiscreteKoyama(Omega):
         return r2,r4
         
 
+    def _kernel_parameters(self,n):
+        '''Gaussian width :math:`A^2` and shift :math:`B` at separation(s) n'''
+        r2,r4 = self.kernel_base(n)
+        Csq = 0.5 * (5 - 3*r4/(r2*r2))
+        if np.any(~(Csq>=0)):
+            raise ValueError('Bad chain parameters. (Try reducing epsilon)')
+        C = np.sqrt(Csq)
+        B = np.sqrt(C*r2)
+        Asq = r2*(1-C)/6 #taking the square root results in many domain errors
+        return Asq,B
+
     def koyama_kernel_fourier(self,k,n):
         '''Kernel for calculating omega in Fourier-Space
 
@@ -200,17 +211,14 @@ class DiscreteKoyama(Omega):
         k: np.ndarray, float
             array of wavenumber values to calculate :math:`\omega` at
 
-        n: int
-            Integer separation distance along chain.
+        n: int or np.ndarray
+            Integer separation distance(s) along chain. If an array is
+            supplied, the result has shape (len(n),len(k)).
         '''
-        r2,r4 = self.kernel_base(n)
-        try:
-            C = sqrt(0.5 * (5 - 3*r4/(r2*r2)))
-            B = sqrt(C*r2)
-            Asq = r2*(1-C)/6 #taking the square root results in many domain errors
-        except ValueError as e:
-            raise ValueError('Bad chain parameters. (Try reducing epsilon)')
-            
+        Asq,B = self._kernel_parameters(n)
+        if np.ndim(n)>0:
+            Asq = Asq[:,np.newaxis]
+            B = B[:,np.newaxis]
         return np.sin(B*k)/(B*k) * np.exp(-Asq*k*k)
 
     def koyama_kernel_real(self,r,n):
@@ -225,17 +233,14 @@ class DiscreteKoyama(Omega):
         r: np.ndarray, float
             array of real-space positions to calculate :math:`\omega` at
 
-        n: int
-            Integer separation distance along chain.
+        n: int or np.ndarray
+            Integer separation distance(s) along chain. If an array is
+            supplied, the result has shape (len(n),len(r)).
         '''
-        r2,r4 = self.kernel_base(n)
-        
-        try:
-            C = sqrt(0.5 * (5 - 3*r4/(r2*r2)))
-            B = sqrt(C*r2)
-            Asq = r2*(1-C)/6 #taking the square root results in many domain errors
-        except ValueError as e:
-            raise ValueError('Bad chain parameters. (Try reducing epsilon)')
+        Asq,B = self._kernel_parameters(n)
+        if np.ndim(n)>0:
+            Asq = Asq[:,np.newaxis]
+            B = B[:,np.newaxis]
 
         omega_ag = (1.0/(8*np.pi**(3.0/2.0)*np.sqrt(Asq)*B*r))*(np.exp(-(r-B)**2.0/(4.0*Asq))-np.exp(-(r+B)**2.0/(4.0*Asq)))
         
@@ -255,11 +260,10 @@ class DiscreteKoyama(Omega):
         '''
         
         factor1 = np.pi*self.sigma**(3.0)*(1-3.0*r/(2.0*self.sigma)+r**(3.0)/(2.0*self.sigma**3.0))/6.0
-        factor2 = np.zeros_like(r) 
-        for i in range(1,self.length-1):
-            for j in range(i+2,self.length+1):
-                n = abs(i - j)
-                factor2 += self.koyama_kernel_real(r=r,n=n)
+        # Every pair of sites i<j-1 contributes a kernel which only depends
+        # on n=j-i, and there are length-n such pairs
+        n = np.arange(2,self.length)
+        factor2 = weighted_sum(self.koyama_kernel_real,r,n,weight=(self.length-n).astype(float))
         factor3 = 4.0*np.pi*r**2.0
 
         return factor1*factor2*factor3
@@ -278,7 +282,7 @@ class DiscreteKoyama(Omega):
         '''
         
         r = np.linspace(0.0001,self.sigma,npts)
-        integral = np.trapz(self.density_correction_kernel(r),r)
+        integral = np.trapezoid(self.density_correction_kernel(r),r)
         delta_N = integral/(self.length*np.pi*self.sigma**3.0/6.0)
 
         return delta_N
@@ -295,15 +299,11 @@ class DiscreteKoyama(Omega):
             array of wavenumber values to calculate :math:`\omega` at
         
         '''
-        self.value = np.zeros_like(k)
-        
-        for i in range(1,self.length-1):
-            for j in range(i+1,self.length):
-                n = abs(i - j)
-                self.value += self.koyama_kernel_fourier(k=k,n=n)
+        # The kernel only depends on the separation n=j-i of the sites, so
+        # each separation is evaluated once and weighted by its multiplicity
+        n = np.arange(1,self.length-1)
+        self.value = weighted_sum(self.koyama_kernel_fourier,k,n,weight=(self.length-1-n).astype(float))
         self.value *= 2/self.length
         self.value += 1.0
         
         return self.value
-
-
@@ -42,6 +42,8 @@ class FromArray(Omega):
 
     
     '''
+    memoize = False
+
     def __init__(self,omega,k=None):
         r'''Constructor
         
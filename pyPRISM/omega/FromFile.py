@@ -1,6 +1,16 @@
 #!python
 from pyPRISM.omega.Omega import Omega
+from collections import OrderedDict
+import threading
+import hashlib
 import numpy as np
+import os
+
+# binary files larger than this (in bytes) are memory-mapped rather than read
+MMAP_THRESHOLD = 16e6
+
+# maximum number of parsed files kept in memory
+CACHE_ENTRIES = 256
 
 class FromFile(Omega):
     '''Read *intra*-molecular correlations from file
@@ -12,6 +22,17 @@ class FromFile(Omega):
     as well. If the k-values are provided, an extra check to make
     sure that the file data matches the same k-space grid of the
     domain. 
+
+    Binary numpy files are also supported. A .npy file must contain
+    a one or two column array laid out as above, while a .npz file
+    must contain an array named *omega* and, optionally, an array
+    named *k*. Large .npy files are memory-mapped.
+
+    Each file is only parsed once per session; subsequent calls
+    (e.g. from other PRISM objects or Systems) reuse the parsed
+    data unless the file is modified. The returned array is shared
+    between all users of the file and is therefore read-only; copy it
+    before modifying it in place.
     
     Attributes
     ----------
@@ -43,6 +64,8 @@ class FromFile(Omega):
 
     
     '''
+    memoize = False
+
     def __init__(self,fileName):
         r'''Constructor
         
@@ -54,6 +77,19 @@ class FromFile(Omega):
             
         '''
         self.fileName = fileName
+        self._checked = None
+
+    def __getstate__(self):
+        # only the file name defines this object; parsed data is not pickled
+        return {'fileName':self.fileName}
+
+    def _fingerprint_state(self):
+        # the contents of the file define the intra-molecular structure
+        return {'fileName':self.fileName,'contents':_digest(self.fileName)}
+
+    def __setstate__(self,state):
+        self.__dict__.update(state)
+        self._checked = None
         
     def __repr__(self):
         return '<Omega: FromFile>'
@@ -67,15 +103,64 @@ class FromFile(Omega):
             array of wavenumber values to calculate :math:`\omega` at
         
         '''
-        fileData = np.loadtxt(self.fileName)
+        fileK,fileData = _read(self.fileName)
         
+        # the same grid (e.g. a shared Domain) is only checked once per
+        # parse of the file, so a modified file is checked again
+        checked = self._checked
+        if (checked is None) or (checked[0] is not fileData) or (checked[1] is not k):
+            if fileK is not None:
+                assert fileK.shape[0] == k.shape[0],'Domain size of file differs from supplied domain!'
+                assert np.allclose(fileK,k),'Domain of file differs from supplied domain!'
+            self._checked = (fileData,k)
+
+        self.value = fileData
+        return self.value
+
+_parsed = OrderedDict()
+_lock = threading.Lock()
+
+def _read(fileName):
+    '''Return the (k,omega) arrays stored in a file, parsing it only once'''
+    stat = os.stat(fileName)
+    key = (os.path.abspath(fileName),stat.st_mtime_ns,stat.st_size)
+    with _lock:
+        if key in _parsed:
+            _parsed.move_to_end(key)
+            return _parsed[key]
+
+    extension = os.path.splitext(fileName)[1].lower()
+    if extension=='.npz':
+        with np.load(fileName) as archive:
+            fileData = archive['omega']
+            fileK = archive['k'] if 'k' in archive else None
+    else:
+        if extension=='.npy':
+            mmap_mode = 'r' if stat.st_size>MMAP_THRESHOLD else None
+            fileData = np.load(fileName,mmap_mode=mmap_mode)
+        else:
+            fileData = np.loadtxt(fileName)
+
         if len(fileData.shape)>=2:
-            assert fileData.shape[0] == k.shape[0],'Domain size of file differs from supplied domain!'
-            assert np.allclose(fileData[:,0],k),'Domain of file differs from supplied domain!'
-            self.value = fileData[:,1]
+            fileK = fileData[:,0]
+            fileData = fileData[:,1]
         else:
-            self.value = fileData
-        
-        return self.value
-        
-        
+            fileK = None
+
+    for array in (fileK,fileData):
+        if array is not None:
+            array.flags.writeable = False
+
+    with _lock:
+        _parsed[key] = (fileK,fileData)
+        while len(_parsed)>CACHE_ENTRIES:
+            _parsed.popitem(last=False)
+    return fileK,fileData
+
+def _digest(fileName):
+    '''Return the SHA-256 digest of the contents of a file'''
+    digest = hashlib.sha256()
+    with open(fileName,'rb') as f:
+        for block in iter(lambda: f.read(1<<20),b''):
+            digest.update(block)
+    return digest.hexdigest()
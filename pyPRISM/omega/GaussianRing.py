@@ -1,5 +1,6 @@
 #!python
 from pyPRISM.omega.Omega import Omega
+from pyPRISM.omega.chunked import weighted_sum
 import numpy as np
 
 class GaussianRing(Omega):
@@ -95,13 +96,19 @@ class GaussianRing(Omega):
             array of wavenumber values to calculate :math:`\omega` at
         
         '''
-        self.value = np.zeros_like(k)
+        k = np.asarray(k,dtype=float)
         ss = self.sigma * self.sigma
-        kk = k*k
-        for i in range(self.length):
-            # for j in range(self.length):
-            j = 0
-            self.value += np.exp(-ss*kk*abs(i-j)*(self.length-abs(i-j))/(6.0*self.length))
+        length = int(self.length)
+
+        # Separations n and N-n around the ring are equivalent, so only
+        # n<=N/2 is evaluated and all others are counted twice
+        n = np.arange(0,length//2+1)
+        weight = np.full(n.size,2.0)
+        weight[0] = 1.0
+        if length%2==0:
+            weight[-1] = 1.0
+        scale = n*(length-n)/(6.0*length)
+
+        kernel = lambda k,scale: np.exp(-ss*np.multiply.outer(scale,k*k))
+        self.value = weighted_sum(kernel,k,scale,weight)
         return self.value
-        
-        
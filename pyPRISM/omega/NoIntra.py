@@ -35,6 +35,8 @@ class NoIntra(Omega):
         plt.show()
     
     '''
+    memoize = False
+
     def __repr__(self):
         return '<Omega: NoIntra>'
     
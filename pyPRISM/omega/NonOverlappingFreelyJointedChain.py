@@ -1,28 +1,15 @@
 #!python
 from pyPRISM.omega.Omega import Omega
 from pyPRISM.omega.FreelyJointedChain import FreelyJointedChain
+from pyPRISM.omega.chunked import weighted_sum,powers
 import numpy as np
 import scipy.integrate 
-
-import warnings
-
-NFJC_WARNING = '''
-The numerical integrations required for the NFJC omega
-calculation are slow and scale poorly with chain length 
-so this omega may take minutes or longer to calculate 
-even for modest chain lengths e.g. N=200.'''
+import functools
 
 class NonOverlappingFreelyJointedChain(Omega):
     r'''Freely jointed chain with excluded volume intra-molecular correlation function
 
 
-    .. warning:: 
-        The numerical integrations required for the NFJC omega
-        calculation are slow and scale poorly with chain length 
-        so this omega may take minutes or longer to calculate 
-        even for modest chain lengths e.g. N=200.
-
-    
     **Mathematical Definition**
 
     .. math::
@@ -64,6 +51,11 @@ class NonOverlappingFreelyJointedChain(Omega):
         volume of monomer segments (i.e. bonds are not free to rotate over all
         angles). This model assumes a constant bond length :math:`l`. 
 
+        The :math:`\tau` integrals are evaluated with a fixed Simpson rule,
+        so the sum over :math:`\tau` can be carried out on the integrands
+        before integrating. The cost of a calculation therefore grows
+        linearly with both the chain length and the number of wavenumbers.
+
 
     References
     ----------
@@ -115,8 +107,6 @@ class NonOverlappingFreelyJointedChain(Omega):
         self.l = l
         self.FJC = FreelyJointedChain(length=length,l=l)
         self.value = None
-
-        warnings.warn(NFJC_WARNING)
         
     def __repr__(self):
         return '<Omega: NonOverlappingFreelyJointedChain>'
@@ -130,29 +120,23 @@ class NonOverlappingFreelyJointedChain(Omega):
             array of wavenumber values to calculate :math:`\omega` at
         
         '''
-        integrate = np.trapz
-        integrate = scipy.integrate.simps
-        self.value = np.zeros_like(k)
-
-        B = []
-        dx = 0.1
-        x = np.arange(dx,100,dx)
-        K,X = np.meshgrid(k,x,indexing='ij')
-        # Precaculate factors for efficiency 
-        ZBase = (1/(np.pi*K))*X*(np.sin(K-X)/(K-X) - np.sin(K+X)/(K+X))
-        sinxx = np.sin(x)/x
-        sinXX = np.sin(X)/X
+        k = np.asarray(k,dtype=float)
+        x,weights = _quadrature()
+        taus = np.arange(2,self.length)
+        multiplicity = self.length - taus
+        B = _b_factors(len(taus))
+
+        # sum_tau (N-tau) B_tau (sin(k)/k)^tau - (N-tau) (sin(k)/k)^tau
         sinkk = np.sin(k)/k
-        J0Base = (np.sin(x)/x - np.cos(x))
-        for tau in range(2,self.length):
-            J0val = 2/np.pi * integrate((sinxx)**(tau)*J0Base,x=x)
-            B = (1 - J0val)**(-1.0)
-            Z = ZBase * (sinXX)**(tau) 
-            Jvals = integrate(Z,x=x,axis=1)
-            omega_t = B * ((sinkk)**(tau) - Jvals)
-            self.value +=  (self.length - tau) * (omega_t - (sinkk)**(tau))
-
-        self.value  *= 2.0/self.length 
+        ideal = _power_series(multiplicity*(B - 1.0),sinkk,start=2)
+
+        # sum_tau (N-tau) B_tau J_tau(k), where the tau integrand is summed
+        # before integrating over x
+        sinxx = np.sin(x)/x
+        integrand = weights*_power_series(multiplicity*B,sinxx,start=2)
+        Jvals = weighted_sum(_z_base,k,x,integrand)
+
+        self.value  = 2.0/self.length * (ideal - Jvals)
         self.value  += self.FJC.calculate(k)
 
 
@@ -163,3 +147,42 @@ class NFJC(NonOverlappingFreelyJointedChain):
     pass
         
         
+
+@functools.lru_cache(maxsize=None)
+def _quadrature():
+    '''Grid and Simpson weights used for all tau integrals'''
+    dx = 0.1
+    x = np.arange(dx,100,dx)
+    # Simpson's rule is linear in the integrand so the weights can be
+    # obtained by integrating the unit vectors
+    weights = scipy.integrate.simpson(np.eye(x.size),x=x,axis=-1)
+    return x,weights
+
+def _z_base(k,x):
+    '''(x,k) block of the kernel of the tau integrals'''
+    X = x[:,np.newaxis]
+    return (1/(np.pi*k))*X*(np.sinc((k-X)/np.pi) - np.sinc((k+X)/np.pi))
+
+def _power_series(coeffs,base,start):
+    '''Evaluate sum_i coeffs[i]*base**(start+i)'''
+    total = np.zeros_like(base)
+    for first,block in powers(base,start,start+len(coeffs)):
+        total += coeffs[first-start:first-start+block.shape[0]].dot(block)
+    return total
+
+@functools.lru_cache(maxsize=32)
+def _b_factors(ntau):
+    '''B factors of Reference [1] for tau=2,...,ntau+1
+
+    These only depend on tau, so they are shared by all chains of the same
+    length. The returned array is read-only.
+    '''
+    x,weights = _quadrature()
+    sinxx = np.sin(x)/x
+    J0Base = weights*(sinxx - np.cos(x))
+    J0val = np.empty(ntau)
+    for first,block in powers(sinxx,2,ntau+2):
+        J0val[first-2:first-2+block.shape[0]] = 2/np.pi * block.dot(J0Base)
+    B = (1 - J0val)**(-1.0)
+    B.flags.writeable = False
+    return B
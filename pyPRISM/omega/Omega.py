@@ -8,5 +8,14 @@ class Omega(object):
         Currently, this class doesn't do anything besides group all of the
         *intra*-molecular correlation functions under a single inheritance
         heirarchy. This will change as needs arise.
+
+    Attributes
+    ----------
+    memoize: bool
+        If *True* (default), evaluations of this omega are stored in the
+        process-wide :class:`~pyPRISM.omega.OmegaCache.OmegaCache` and reused
+        by all PRISM objects. Subclasses which are cheap to evaluate or which
+        return stored data should set this to *False*.
     '''
+    memoize = True
         
@@ -0,0 +1,147 @@
+#!python
+from pyPRISM.omega.Omega import Omega
+from pyPRISM.util.fingerprint import fingerprint
+from collections import OrderedDict
+import threading
+import numpy as np
+
+class OmegaCache(object):
+    r'''Least-recently-used memo of :math:`\hat{\omega}(k)` evaluations
+
+    **Description**
+
+        Some *intra*-molecular correlation functions (e.g.
+        :class:`~pyPRISM.omega.DiscreteKoyama` or
+        :class:`~pyPRISM.omega.NonOverlappingFreelyJointedChain`) are
+        expensive to evaluate but only depend on their own parameters and the
+        wavenumber grid. When many PRISM objects are created with the same
+        omega, e.g. in a density or temperature sweep, this class ensures
+        each omega is only evaluated once.
+
+        Evaluations are keyed by the class and parameters of the omega object
+        (see :func:`pyPRISM.util.fingerprint`) and the values of the
+        wavenumber grid. Omega classes which are cheap to evaluate or which
+        simply return stored data set the class attribute memoize=False and
+        are never cached.
+
+        All PRISM objects share the process-wide instance
+        pyPRISM.omega.cache. Stored arrays are marked read-only.
+
+    Example
+    -------
+    .. code-block:: python
+
+        import pyPRISM
+
+        # limit the memory used by the process-wide cache
+        pyPRISM.omega.cache.max_size = 100e6
+
+        # or disable it entirely
+        pyPRISM.omega.cache.enabled = False
+
+    '''
+    def __init__(self,max_entries=64,max_size=512e6,enabled=True):
+        r'''Constructor
+
+        Arguments
+        ---------
+        max_entries: int
+            Maximum number of stored evaluations
+
+        max_size: float
+            Maximum total size of stored evaluations in bytes
+
+        enabled: bool
+            If *False*, all evaluations are passed directly to the omega
+            objects
+        '''
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<OmegaCache entries:{} size:{:d}>'.format(len(self),self.size)
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def size(self):
+        '''Total size of all stored evaluations in bytes'''
+        return sum(value.nbytes for value in self._values.values())
+
+    def key(self,omega,k):
+        '''Cache key of an omega object evaluated on a wavenumber grid'''
+        return fingerprint((_parameters(omega),np.asarray(k,dtype=float)))
+
+    def calculate(self,omega,k):
+        r'''Evaluate omega.calculate(k) using the cache
+
+        Arguments
+        ---------
+        omega: pyPRISM.omega.Omega
+            Omega object to evaluate
+
+        k: np.ndarray
+            Wavenumber grid
+
+        Returns
+        -------
+        value: np.ndarray
+            :math:`\hat{\omega}(k)`. If the value was cached, this array is
+            read-only. omega.value is set to the returned array.
+        '''
+        if (not self.enabled) or (not getattr(omega,'memoize',False)):
+            return omega.calculate(k)
+
+        key = self.key(omega,k)
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                self.hits += 1
+                value = self._values[key]
+            else:
+                value = None
+
+        if value is None:
+            value = np.array(omega.calculate(k),dtype=float)
+            value.flags.writeable = False
+
+            with self._lock:
+                self.misses += 1
+                self._values[key] = value
+                self._evict()
+
+        # omega.value is set as if omega.calculate had been called
+        omega.value = value
+        return value
+
+    def clear(self):
+        '''Remove all stored evaluations'''
+        with self._lock:
+            self._values.clear()
+
+    def _evict(self):
+        '''Remove the least recently used evaluations until within limits'''
+        size = self.size
+        while self._values and ((len(self._values)>self.max_entries) or (size>self.max_size)):
+            key,value = self._values.popitem(last=False)
+            size -= value.nbytes
+
+def _parameters(omega):
+    '''Class and parameters of an omega object excluding any calculated values'''
+    state = {}
+    for name,value in vars(omega).items():
+        if name=='value':
+            continue
+        if isinstance(value,Omega):
+            value = _parameters(value)
+        state[name] = value
+    cls = type(omega)
+    return cls.__module__+'.'+cls.__qualname__,state
+
+cache = OmegaCache()
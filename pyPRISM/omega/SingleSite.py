@@ -31,6 +31,8 @@ class SingleSite(Omega):
         plt.show()
     
     '''
+    memoize = False
+
     def __repr__(self):
         return '<Omega: SingleSite>'
     
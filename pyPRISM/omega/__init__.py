@@ -1,5 +1,5 @@
 #!python
-'''
+r'''
 In PRISM, the molecular structure of molecules is encoded into
 *intra*-molecular correlation functions called :math:`\hat{\omega}(k)`. All
 connectivity and *intra*-molecular excluded volume is contained in these
@@ -23,6 +23,11 @@ from simulation.
 Finally, the :class:`~pyPRISM.omega.FromArray` and
 :class:`~pyPRISM.omega.FromFile` classes exist for loading
 :math:`\hat{\omega}(k)` calculated in memory or from another program.
+
+Evaluations of :math:`\hat{\omega}(k)` made by PRISM objects are memoized in
+the process-wide :class:`~pyPRISM.omega.OmegaCache` instance
+``pyPRISM.omega.cache`` so that expensive omega are only evaluated once per
+wavenumber grid.
 '''
 from pyPRISM.omega.Omega import Omega
 
@@ -44,3 +49,5 @@ from pyPRISM.omega.FreelyJointedChain import FJC
 from pyPRISM.omega.NonOverlappingFreelyJointedChain import NonOverlappingFreelyJointedChain
 from pyPRISM.omega.NonOverlappingFreelyJointedChain import NFJC
 
+from pyPRISM.omega.OmegaCache import OmegaCache
+from pyPRISM.omega.OmegaCache import cache
@@ -0,0 +1,70 @@
+#!python
+'''Bounded-memory evaluation of sums over chain separations
+
+Several *intra*-molecular correlation functions are sums of a kernel over
+all separations of the sites of a chain. Evaluating all separations at
+once as a single (separation,k) array is fast, but the memory use grows
+with the chain length. These helpers evaluate such sums in blocks of at
+most CHUNK_ELEMENTS elements.
+'''
+import numpy as np
+
+# maximum number of elements in a block
+CHUNK_ELEMENTS = 2**20
+
+def chunk_size(width):
+    '''Number of rows of the given width which fit in a single block'''
+    return max(1,int(CHUNK_ELEMENTS//max(1,width)))
+
+def weighted_sum(kernel,x,n,weight,chunk=None):
+    '''Evaluate sum_i weight[i]*kernel(x,n[i]) in blocks
+
+    Arguments
+    ---------
+    kernel: callable
+        Called as kernel(x,n[block]) and returns a (len(n[block]),len(x))
+        array
+
+    x: np.ndarray
+        Points (e.g. wavenumbers) at which the sum is evaluated
+
+    n: np.ndarray
+        Values (e.g. separations) which are summed over
+
+    weight: np.ndarray
+        Weight of each value of n
+
+    chunk: int, *optional*
+        Number of values of n in each block. Defaults to the number which
+        keeps each block within CHUNK_ELEMENTS.
+    '''
+    x = np.asarray(x,dtype=float)
+    if chunk is None:
+        chunk = chunk_size(x.size)
+    total = np.zeros_like(x)
+    for start in range(0,len(n),chunk):
+        block = slice(start,start+chunk)
+        total += weight[block].dot(kernel(x,n[block]))
+    return total
+
+def powers(base,start,stop,chunk=None):
+    '''Yield (first,block) where block[i] = base**(first+i) for start<=first+i<stop
+
+    The powers are accumulated as running products rather than evaluated
+    separately.
+
+    Arguments
+    ---------
+    chunk: int, *optional*
+        Number of powers in each block. Defaults to the number which keeps
+        each block within CHUNK_ELEMENTS.
+    '''
+    if chunk is None:
+        chunk = chunk_size(base.size)
+    power = base**start
+    for first in range(start,stop,chunk):
+        block = np.empty((min(chunk,stop-first),base.size))
+        for i in range(block.shape[0]):
+            block[i] = power
+            power = power*base
+        yield first,block
@@ -1,6 +1,11 @@
 #!python
 from pyPRISM.potential.Potential import Potential
 import numpy as np
+import functools
+
+def _exponential(r,sigma,epsilon,alpha):
+    '''Exponential functional form without the hard core'''
+    return - epsilon * np.exp(-(r-sigma)/(alpha))
 
 class Exponential(Potential):
     r'''Exponential attractive interactions
@@ -95,7 +100,7 @@ class Exponential(Potential):
         self.sigma = sigma
         self.alpha = alpha
         self.high_value = high_value
-        self.funk  = lambda r,sigma: - epsilon * np.exp(-(r-sigma)/(alpha))
+        self.funk  = functools.partial(_exponential,epsilon=epsilon,alpha=alpha)
     def __repr__(self):
         return '<Potential: Exponential>'
     
@@ -1,6 +1,12 @@
 #!python
 from pyPRISM.potential.Potential import Potential
 import numpy as np
+import functools
+
+def _lennard_jones(r,sigma,epsilon):
+    '''Lennard-Jones functional form without the hard core'''
+    return epsilon * ((sigma/r)**(12.0) - 2.0*(sigma/r)**(6.0))
+
 class HardCoreLennardJones(Potential):
     r'''12-6 Lennard-Jones potential with Hard Core
 
@@ -93,7 +99,7 @@ class HardCoreLennardJones(Potential):
         self.epsilon = epsilon 
         self.sigma = sigma
         self.high_value = high_value
-        self.funk  = lambda r,sigma: epsilon * ((sigma/r)**(12.0) - 2.0*(sigma/r)**(6.0))
+        self.funk  = functools.partial(_lennard_jones,epsilon=epsilon)
         
     def __repr__(self):
         return '<Potential: HardCoreLennardJones>'
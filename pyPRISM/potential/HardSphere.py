@@ -1,6 +1,12 @@
 #!python
 from pyPRISM.potential.Potential import Potential
 import numpy as np
+import functools
+
+def _hard_sphere(r,sigma,high_value):
+    '''Hard sphere functional form'''
+    return np.where(r>sigma,0.0,high_value)
+
 class HardSphere(Potential):
     r'''Simple hard sphere potential
     
@@ -70,7 +76,7 @@ class HardSphere(Potential):
         '''
         self.sigma = sigma
         self.high_value = high_value
-        self.funk  = lambda r,sigma: np.where(r>sigma,0.0,high_value)
+        self.funk  = functools.partial(_hard_sphere,high_value=high_value)
     def __repr__(self):
         return '<Potential: HardSphere>'
     
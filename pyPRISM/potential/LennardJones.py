@@ -1,6 +1,11 @@
 #!python
 from pyPRISM.potential.Potential import Potential
 import numpy as np
+import functools
+
+def _lennard_jones(r,sigma,epsilon):
+    '''Unmodified Lennard-Jones functional form'''
+    return 4 * epsilon * ((sigma/r)**(12.0) - (sigma/r)**(6.0))
 
 class LennardJones(Potential):
     r'''12-6 Lennard-Jones potential
@@ -89,7 +94,7 @@ class LennardJones(Potential):
         self.sigma = sigma
         self.rcut  = rcut
         self.shift = shift
-        self.funk  = lambda r,s: 4 * epsilon * ((s/r)**(12.0) - (s/r)**(6.0))
+        self.funk  = functools.partial(_lennard_jones,epsilon=epsilon)
         
     def __repr__(self):
         return '<Potential: LennardJones>'
@@ -0,0 +1,15 @@
+#!python
+r'''
+Many PRISM studies require solving a series of closely related systems, e.g.
+scanning temperature or density to construct a phase diagram or locate a
+spinodal. The functions in this module automate these sweeps and reuse
+information between neighboring solutions to reduce the total solution time.
+The strategy module drives the fallback chains and homotopies of
+:func:`pyPRISM.core.PRISM.PRISM.solve`.
+
+'''
+
+from pyPRISM.sweep.continuation import continuation
+from pyPRISM.sweep.solve_many import solve_many
+from pyPRISM.sweep.solve_batch import solve_batch
+from pyPRISM.sweep.strategy import solve_strategy
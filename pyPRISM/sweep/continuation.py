@@ -0,0 +1,174 @@
+#!python
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+def continuation(system,parameter,values,guess=None,solver='solve',max_subdivisions=6,extrapolate=True,**kwargs):
+    r'''Solve a System along a path in parameter space using warm starts
+
+    Parameters
+    ----------
+    system: pyPRISM.core.System
+        A fully specified System. This object is not modified; the sweep is
+        carried out on a copy.
+
+    parameter: str or callable
+        The parameter to vary. If a string, the attribute of the System with
+        this name is set to each value (e.g. 'kT'). If a callable, it is
+        called as parameter(system,value) and should update the System in
+        place (see the example below).
+
+    values: iterable of float
+        Parameter values to solve at, in the order they should be visited.
+        Neighboring values should be close enough that the solution at one is
+        a reasonable starting point for the next.
+
+    guess: np.ndarray, size (rank*rank*length), *optional*
+        Initial guess for the first value in the sweep. If not specified, an
+        initial guess of all zeros is used.
+
+    solver: str, *optional*
+        Name of the :class:`pyPRISM.core.PRISM` method used to solve each
+        point, either 'solve' (default) or 'solve_anderson'.
+
+    max_subdivisions: int, *optional*
+        If the solution at a value fails, the step from the previously
+        converged value is halved and the intermediate value is solved
+        first. This sets the maximum number of times a step will be halved
+        before giving up on a value.
+
+    extrapolate: bool, *optional*
+        If *True*, the initial guess for each value is predicted by secant
+        (linear) extrapolation from the two previous converged solutions.
+        Otherwise the previous converged solution is used directly.
+
+    kwargs: 
+        All other keyword arguments are passed to the solver method. If a
+        solver strategy is given (see :func:`pyPRISM.core.PRISM.PRISM.solve`),
+        each point is started with the stage which succeeded at the previous
+        converged point.
+
+    Yields
+    ------
+    value: float
+        Requested parameter value 
+
+    PRISM: pyPRISM.core.PRISM
+        PRISM object solved at this value. If the solution failed even after
+        subdividing the step, PRISM.minimize_result.success will be *False*
+        and the sweep continues from the last converged solution.
+
+
+    **Description**
+
+        This is a generator which solves the PRISM equations at each of the
+        requested parameter values in turn and yields each PRISM object as
+        soon as it is available. Each solution is started from the previous
+        converged solution :math:`\gamma` (PRISM.x1) or, once two solutions
+        are available, from the secant prediction
+
+        .. math::
+
+            \gamma(\lambda) \approx \gamma_1 + \frac{\lambda - \lambda_1}{\lambda_1 - \lambda_0} (\gamma_1 - \gamma_0)
+
+        When a solution fails, intermediate values are automatically inserted
+        by bisecting the step. These intermediate solutions are used to
+        continue the sweep but are not yielded.
+
+        Warm starting is most beneficial at high density or strong
+        interactions where solutions from a zero initial guess are slow or
+        fail entirely.
+
+
+    Example
+    -------
+    .. code-block:: python
+
+        import pyPRISM
+        import numpy as np
+
+        sys = pyPRISM.System(['A'],kT=1.0)
+        sys.domain = pyPRISM.Domain(dr=0.01,length=4096)
+        sys.density['A'] = 0.8
+        sys.diameter['A'] = 1.0
+        sys.closure['A','A'] = pyPRISM.closure.PercusYevick()
+        sys.potential['A','A'] = pyPRISM.potential.LennardJones(epsilon=1.0)
+        sys.omega['A','A'] = pyPRISM.omega.SingleSite()
+
+        # sweep temperature
+        for kT,PRISM in pyPRISM.sweep.continuation(sys,'kT',np.linspace(3.0,1.0,21)):
+            print(kT,PRISM.minimize_result.success)
+
+        # sweep density using a callable
+        def set_density(sys,value):
+            sys.density['A'] = value
+
+        for rho,PRISM in pyPRISM.sweep.continuation(sys,set_density,np.arange(0.1,0.9,0.05)):
+            print(rho,PRISM.minimize_result.success)
+    '''
+    if callable(parameter):
+        setter = parameter
+    else:
+        setter = lambda sys,value: setattr(sys,parameter,value)
+
+    sys = system.snapshot()
+    sys.check()
+
+    converged = [] # (value,solution) of the last two converged points
+
+    for target in values:
+        pending = [target]
+        subdivisions = 0
+        while pending:
+            value = pending[-1]
+            PRISM = _solve_point(sys,setter,value,_predict(converged,value,guess,extrapolate),solver,kwargs)
+
+            if _converged(PRISM):
+                converged = (converged + [(value,np.copy(PRISM.x1))])[-2:]
+                pending.pop()
+
+                # start neighboring points with the solver stage which
+                # succeeded here (see the strategy argument of PRISM.solve)
+                if kwargs.get('strategy') is not None:
+                    kwargs['strategy'] = PRISM.minimize_result.strategy
+            elif converged and (subdivisions<max_subdivisions):
+                # insert the midpoint between the last converged point and
+                # the failed value and solve it first
+                pending.append(0.5*(converged[-1][0] + value))
+                subdivisions += 1
+                continue
+            else:
+                if value!=target:
+                    # report the requested value rather than the failed
+                    # intermediate value
+                    guess_target = _predict(converged,target,guess,extrapolate)
+                    PRISM = _solve_point(sys,setter,target,guess_target,solver,kwargs)
+                break
+
+        yield target,PRISM
+
+def _solve_point(sys,setter,value,guess,solver,kwargs):
+    '''Update the System and solve it from the supplied guess'''
+    setter(sys,value)
+    PRISM = sys.createPRISM()
+    try:
+        getattr(PRISM,solver)(guess=guess,**kwargs)
+    except np.linalg.LinAlgError as error:
+        PRISM.minimize_result = OptimizeResult(x=PRISM.x1,success=False,status=1,message=str(error))
+    return PRISM
+
+def _converged(PRISM):
+    '''Did the last solution succeed with a finite result?'''
+    result = PRISM.minimize_result
+    return bool(result.success) and np.all(np.isfinite(result.x))
+
+def _predict(converged,value,guess,extrapolate):
+    '''Predict the solution at value from previously converged solutions'''
+    if not converged:
+        return guess
+    elif (len(converged)==1) or (not extrapolate):
+        return np.copy(converged[-1][1])
+    else:
+        (v0,x0),(v1,x1) = converged
+        if v1==v0:
+            return np.copy(x1)
+        return x1 + (value - v1)/(v1 - v0)*(x1 - x0)
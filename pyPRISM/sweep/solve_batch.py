@@ -0,0 +1,63 @@
+#!python
+from pyPRISM.core.BatchPRISM import BatchPRISM
+
+def solve_batch(systems,guess=None,**kwargs):
+    r'''Solve many same-shape Systems together as one stacked problem
+
+    Parameters
+    ----------
+    systems: iterable of pyPRISM.core.System
+        Fully specified Systems which share the Domain length and rank and
+        use the same (kernel-based atomic) closure for each pair
+
+    guess: np.ndarray, size (rank*rank*length) or (len(systems),rank*rank*length), *optional*
+        Initial guess shared by all Systems or for each System. If not
+        specified, an initial guess of all zeros is used.
+
+    kwargs:
+        All other keyword arguments are passed to
+        :func:`pyPRISM.core.BatchPRISM.BatchPRISM.solve`
+
+    Returns
+    -------
+    results: list of pyPRISM.core.PRISM
+        PRISM object of each System in the order supplied. Check
+        PRISM.minimize_result.success before using the results.
+
+
+    **Description**
+
+        This is a convenience wrapper around
+        :class:`pyPRISM.core.BatchPRISM.BatchPRISM`. Rather than solving each
+        System in turn, all Systems are stacked and iterated together so
+        that each evaluation of the PRISM equations handles all unconverged
+        Systems in a few large NumPy calls. This is most effective for many
+        small Systems, where solving one at a time is dominated by per-call
+        overhead. For few, large Systems see :func:`pyPRISM.sweep.solve_many`.
+
+
+    Example
+    -------
+    .. code-block:: python
+
+        import pyPRISM
+        import numpy as np
+
+        systems = []
+        for kT in np.linspace(1.0,3.0,200):
+            sys = pyPRISM.System(['A','B'],kT=kT)
+            sys.domain = pyPRISM.Domain(dr=0.05,length=512)
+            sys.density['A'] = 0.3
+            sys.density['B'] = 0.4
+            sys.diameter[sys.types] = 1.0
+            sys.closure[sys.types,sys.types] = pyPRISM.closure.PercusYevick()
+            sys.potential[sys.types,sys.types] = pyPRISM.potential.HardSphere()
+            sys.potential['A','B'] = pyPRISM.potential.Exponential(epsilon=0.5,alpha=0.5)
+            sys.omega['A','A'] = pyPRISM.omega.Gaussian(sigma=1.0,length=10)
+            sys.omega['A','B'] = pyPRISM.omega.NoIntra()
+            sys.omega['B','B'] = pyPRISM.omega.Gaussian(sigma=1.0,length=20)
+            systems.append(sys)
+
+        results = pyPRISM.sweep.solve_batch(systems,tol=1e-6)
+    '''
+    return BatchPRISM(systems).solve(guess=guess,**kwargs)
@@ -0,0 +1,121 @@
+#!python
+from concurrent.futures import ProcessPoolExecutor,as_completed
+import signal
+import warnings
+
+def solve_many(systems,workers=None,timeout=None,solver='solve',**kwargs):
+    r'''Solve many independent Systems in parallel using a process pool
+
+    Parameters
+    ----------
+    systems: iterable of pyPRISM.core.System
+        Fully specified Systems to be solved
+
+    workers: int, *optional*
+        Number of worker processes. Defaults to the number of processors on
+        the machine.
+
+    timeout: float, *optional*
+        Maximum time in seconds allowed for each individual solution. If a
+        solution exceeds this time, a TimeoutError is returned in place of
+        the PRISM object. Timeouts are only supported on platforms
+        providing SIGALRM (i.e. not Windows).
+
+    solver: str, *optional*
+        Name of the :class:`pyPRISM.core.PRISM` method used to solve each
+        System e.g. 'solve' (default), 'solve_anderson', or 'solve_picard'.
+
+    kwargs:
+        All other keyword arguments are passed to the solver method.
+
+    Yields
+    ------
+    index: int
+        Position of the System in the supplied iterable
+
+    result: pyPRISM.core.PRISM or Exception
+        Solved PRISM object or, if the solution raised an exception or
+        timed out, the exception object.
+
+
+    **Description**
+
+        Each System is sent to a worker process where the PRISM object is
+        constructed and solved. Results are yielded in the order in which
+        they complete rather than the order in which they were submitted;
+        use the returned index to match them to the input Systems. Only the
+        System is pickled on the way to the worker and the scratch arrays of
+        the solved PRISM object are dropped on the way back.
+
+        Solutions which have not started when the caller stops iterating
+        (e.g. breaks out of the loop) are cancelled.
+
+        Failures in one System do not stop the remaining solutions. Instead,
+        the exception is yielded in place of the PRISM object. Check the
+        result type and PRISM.minimize_result.success before using the
+        results.
+
+        .. warning::
+
+            As with all uses of the multiprocessing module, scripts using
+            this function should protect their entry point with ``if
+            __name__ == '__main__':``.
+
+
+    Example
+    -------
+    .. code-block:: python
+
+        import pyPRISM
+        import numpy as np
+
+        systems = []
+        for kT in np.linspace(1.0,3.0,64):
+            sys = pyPRISM.System(['A'],kT=kT)
+            sys.domain = pyPRISM.Domain(dr=0.01,length=4096)
+            sys.density['A'] = 0.8
+            sys.diameter['A'] = 1.0
+            sys.closure['A','A'] = pyPRISM.closure.PercusYevick()
+            sys.potential['A','A'] = pyPRISM.potential.LennardJones(epsilon=1.0)
+            sys.omega['A','A'] = pyPRISM.omega.SingleSite()
+            systems.append(sys)
+
+        results = [None]*len(systems)
+        for i,PRISM in pyPRISM.solve_many(systems,workers=8,timeout=600,options={'disp':False}):
+            results[i] = PRISM
+    '''
+    if (timeout is not None) and (not hasattr(signal,'SIGALRM')):
+        warnings.warn('Per-task timeouts require SIGALRM and are not supported on this platform.')
+        timeout = None
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = []
+        for index,system in enumerate(systems):
+            system.check() # fail early on incomplete Systems
+            futures.append(executor.submit(_solve,index,system,solver,timeout,kwargs))
+
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # if the caller stops iterating early, drop the queued solutions
+        # rather than waiting for all of them to finish
+        executor.shutdown(cancel_futures=True)
+
+def _raise_timeout(signum,frame):
+    raise TimeoutError('PRISM solution exceeded the allowed time')
+
+def _solve(index,system,solver,timeout,kwargs):
+    '''Solve a single System in a worker process'''
+    if timeout is not None:
+        signal.signal(signal.SIGALRM,_raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL,timeout)
+    try:
+        PRISM = system.createPRISM()
+        getattr(PRISM,solver)(**kwargs)
+    except Exception as error:
+        return index,error
+    finally:
+        if timeout is not None:
+            signal.setitimer(signal.ITIMER_REAL,0)
+    return index,PRISM
@@ -0,0 +1,324 @@
+#!python
+import numpy as np
+from scipy.optimize import OptimizeResult
+import warnings
+import time
+
+# Fallback chain of solve(strategy='auto'). The krylov stage gets a budget of
+# its own as its line search can stall for a long time.
+default_strategy = [('krylov',{'max_cost_calls':2000}),('anderson',{}),('picard',{'step':0.1,'maxiter':2000}),('homotopy',{'parameter':'density','steps':10})]
+
+_root_methods = ('hybr','lm','broyden1','broyden2','linearmixing','diagbroyden','excitingmixing','krylov','df-sane')
+
+class _AttemptAbort(Exception):
+    '''Raised within :func:`pyPRISM.core.PRISM.PRISM.cost` to stop one attempt of a solver strategy'''
+    pass
+
+class _BudgetAbort(_AttemptAbort):
+    '''Raised within :func:`pyPRISM.core.PRISM.PRISM.cost` when the budget of a solver strategy is exhausted'''
+    pass
+
+def solve_strategy(PRISM,strategy,guess=None,tol=None,cr0=None,hk0=None,hk_initial=None,packed=False,callback=None,max_time=None,max_cost_calls=None):
+    r'''Try the stages of a solver strategy in turn until one succeeds
+
+    Each stage calls one of the public solve methods of the PRISM object.
+    This function is usually called through the strategy, max_time,
+    max_cost_calls and homotopy arguments of
+    :func:`pyPRISM.core.PRISM.PRISM.solve`, which describes the stages and
+    the attributes of the returned result in detail.
+
+    Parameters
+    ----------
+    PRISM: pyPRISM.core.PRISM
+        PRISM object to solve
+
+    strategy: str or list
+        'auto' (i.e. :data:`default_strategy`) or a list of stages. Each
+        stage is either a name or a (name,kwargs) tuple.
+
+    guess,tol,cr0,hk0,hk_initial,packed,callback:
+        Passed to each stage, unless overridden by the kwargs of the stage
+
+    max_time: float, *optional*
+        Wall-time budget in seconds for all attempts
+
+    max_cost_calls: int, *optional*
+        Budget of calls to :func:`pyPRISM.core.PRISM.PRISM.cost` for all
+        attempts
+
+    Returns
+    -------
+    result: scipy.optimize.OptimizeResult
+        Result of the successful (or best) attempt with the additional
+        attributes attempts and strategy. This is also stored as
+        PRISM.minimize_result.
+    '''
+    chain = _strategy_chain(strategy)
+    guess,cr0,hk0 = PRISM._prepare_solve(guess,cr0,hk0,hk_initial)
+    if hk_initial is None:
+        hk_initial = hk0
+
+    if tol is None:
+        tol = 1e-5
+
+    start = time.perf_counter()
+    deadline = np.inf if max_time is None else start + max_time
+    budget = np.inf if max_cost_calls is None else max_cost_calls
+
+    cost_calls = 0
+    timings = dict(PRISM.timings)
+    attempts = []
+    results = []
+    x = guess
+    best = None
+    lowest = [np.inf] # residual of the starting point of the next stage
+    for name,kwargs in chain:
+        if (time.perf_counter()>=deadline) or (cost_calls>=budget):
+            break
+
+        # each stage may have a budget of its own within the total budget
+        kwargs = dict(kwargs)
+        attempt_start = time.perf_counter()
+        attempt_deadline = min(deadline,attempt_start + kwargs.pop('max_time',np.inf))
+        attempt_budget = min(budget - cost_calls,kwargs.pop('max_cost_calls',np.inf))
+
+        # abort the attempt as soon as the residual is no longer finite
+        # or the budget is used up. The calls are counted here as some
+        # stages consist of several solves.
+        calls = [0]
+        def guard():
+            calls[0] += 1
+            if (calls[0]==1) and (best is None):
+                lowest[0] = np.max(np.abs(PRISM.y))
+            if not np.all(np.isfinite(PRISM.y)):
+                raise _AttemptAbort('Non-finite residual encountered.')
+            if calls[0]>=attempt_budget:
+                raise _BudgetAbort('The cost() call budget was exhausted.')
+            if time.perf_counter()>=attempt_deadline:
+                raise _BudgetAbort('The time budget was exhausted.')
+
+        PRISM._reset_telemetry()
+        PRISM._guard = guard
+        try:
+            result = _solve_stage(PRISM,name,kwargs,x,tol,cr0,hk0,hk_initial,packed,callback)
+        except (_AttemptAbort,ValueError,np.linalg.LinAlgError) as error:
+            # errors before the first cost() call are invalid arguments
+            # rather than a failure of the solver
+            if calls[0]==0:
+                raise
+            result = OptimizeResult(x=np.copy(PRISM.x1),fun=np.copy(PRISM.y.reshape((-1,))),success=False,status=1,message=str(error),nfev=calls[0])
+        finally:
+            PRISM._guard = None
+
+        cost_calls += calls[0]
+        for phase in timings:
+            timings[phase] += PRISM.timings[phase]
+
+        residual = np.max(np.abs(result.fun))
+        attempts.append({
+            'strategy':name,
+            'options':kwargs,
+            'success':bool(result.success),
+            'message':result.message,
+            'cost_calls':calls[0],
+            'time':time.perf_counter() - attempt_start,
+            'residual':residual,
+        })
+        results.append(result)
+
+        if result.success:
+            best = result
+            break
+
+        # later stages start from the best finite iterate so far
+        if (residual<lowest[0]) and np.all(np.isfinite(result.x)):
+            best = result
+            lowest[0] = residual
+            x = np.copy(result.x)
+
+    if best is None:
+        if results:
+            best = results[-1]
+        else:
+            best = OptimizeResult(x=guess,fun=np.full(guess.shape,np.nan),success=False,status=1,message='The budget was exhausted before the first attempt.',nfev=0)
+
+    # make sure the stored state of the object corresponds to the returned solution
+    if results and (not np.array_equal(best.x,PRISM.x1)):
+        best.fun = np.copy(PRISM.cost(best.x,cr0,hk0))
+        cost_calls += 1
+
+    best.attempts = attempts
+    best.strategy = chain
+    if best.success:
+        # the successful stage first followed by the rest of the chain
+        i = len(attempts) - 1
+        best.strategy = [chain[i]] + chain[:i] + chain[i+1:]
+
+    PRISM.minimize_result = best
+    PRISM.cost_calls = cost_calls
+    PRISM.timings = timings
+
+    PRISM._check_solution(tol)
+
+    return PRISM.minimize_result
+
+def _strategy_chain(strategy):
+    '''Normalize a solver strategy to a list of (name,kwargs) stages'''
+    if isinstance(strategy,str):
+        if strategy!='auto':
+            raise ValueError('Unknown strategy {}. Pass \'auto\' or a list of stages.'.format(strategy))
+        strategy = default_strategy
+
+    chain = []
+    for stage in strategy:
+        if isinstance(stage,str):
+            name,kwargs = stage,{}
+        else:
+            name,kwargs = stage
+        if name not in ('anderson','newton','picard','homotopy') and name not in _root_methods:
+            raise ValueError('Unknown solver strategy stage {}'.format(name))
+        chain.append((name,dict(kwargs)))
+
+    if not chain:
+        raise ValueError('The solver strategy must contain at least one stage')
+
+    return chain
+
+def _solve_stage(PRISM,name,kwargs,guess,tol,cr0,hk0,hk_initial,packed,callback):
+    '''Run a single stage of a solver strategy; kwargs of the stage take precedence'''
+    stage = dict(guess=guess,tol=tol,cr0=cr0,hk0=hk0,hk_initial=hk_initial,packed=packed,callback=callback)
+    stage.update(kwargs)
+    if name=='anderson':
+        return PRISM.solve_anderson(**stage)
+    elif name=='newton':
+        return PRISM.solve_newton(**stage)
+    elif name=='picard':
+        stage.setdefault('step',0.1)
+        return PRISM.solve_anderson(depth=0,**stage)
+    elif name=='homotopy':
+        return _solve_homotopy(PRISM,**stage)
+    else:
+        if stage.get('options') is None:
+            stage['options'] = {'fatol':stage['tol']} if name=='krylov' else {}
+        return PRISM.solve(method=name,**stage)
+
+def _set_homotopy(PRISM,parameter,target,fraction):
+    '''Move a PRISM object to a fraction of the way along a homotopy path
+
+    For 'density', all site densities are scaled by fraction. For 'kT',
+    the potentials are scaled by fraction via the temperature. The
+    intra-molecular correlation functions and closure potential tables
+    are updated in place rather than rebuilding the object.
+    '''
+    sys = PRISM.sys
+    if parameter=='density':
+        for t,density in target.items():
+            sys.density[t] = fraction*density
+        PRISM.omega = PRISM.omegaConvolution.get_copy()
+        PRISM.omega *= sys.density.site
+    else:
+        sys.kT = target/fraction
+        for (i,j),(t1,t2),U in sys.potential.iterpairs():
+            sys.closure[t1,t2].potential = U.calculate(sys.domain.r) / sys.kT
+        PRISM._group_closures()
+    PRISM._linearization = None
+
+def _solve_homotopy(PRISM,guess,tol,cr0,hk0,hk_initial,packed,callback,parameter='density',steps=10,solver='anderson',max_subdivisions=6,max_point_calls=2000):
+    '''Solve by ramping the densities or potentials from an easy state to the target
+
+    See the homotopy argument of :func:`pyPRISM.core.PRISM.PRISM.solve`.
+    '''
+    sys = PRISM.sys
+    if parameter=='density':
+        target = {t:sys.density[t] for t in sys.types}
+    elif parameter=='kT':
+        target = sys.kT
+    else:
+        raise ValueError('Unknown homotopy {}. Options are \'density\' and \'kT\''.format(parameter))
+
+    if isinstance(solver,str):
+        solver = (solver,{})
+    name,kwargs = solver
+
+    cost_calls = 0
+    timings = {phase:0.0 for phase in PRISM.timings}
+    path = []
+
+    fraction = 0.0 # last converged point on the path
+    step = 1.0/steps
+    subdivisions = 0
+    x = guess
+    result = None
+    message = None
+    exhausted = False
+
+    # a point which uses up its own budget only counts as a failure
+    outer = PRISM._guard
+    point_calls = [0]
+    def guard():
+        point_calls[0] += 1
+        if outer is not None:
+            outer()
+        if point_calls[0]>=max_point_calls:
+            raise _AttemptAbort('The cost() call budget of the point was exhausted.')
+
+    PRISM._guard = guard
+    try:
+        while fraction<1.0:
+            trial = min(1.0,fraction + step)
+            _set_homotopy(PRISM,parameter,target,trial)
+            point_calls[0] = 0
+            try:
+                # the correlation functions of intermediate points are not
+                # physical results, so only the target state is checked
+                with warnings.catch_warnings():
+                    if trial<1.0:
+                        warnings.filterwarnings('ignore',message='Pair correlations are negative')
+                    result = _solve_stage(PRISM,name,kwargs,x,tol,cr0,hk0,hk_initial,packed,callback)
+            except _BudgetAbort as error:
+                message = str(error)
+                exhausted = True
+                break
+            except (_AttemptAbort,ValueError,np.linalg.LinAlgError) as error:
+                if PRISM.cost_calls==0:
+                    raise
+                result = OptimizeResult(x=np.copy(PRISM.x1),success=False,message=str(error))
+            finally:
+                cost_calls += PRISM.cost_calls
+                for phase in timings:
+                    timings[phase] += PRISM.timings[phase]
+
+            converged = result.success and np.all(np.isfinite(result.x))
+            path.append({'fraction':trial,'success':bool(converged),'cost_calls':PRISM.cost_calls})
+            if converged:
+                # each point starts from the previous one and the step
+                # grows again after a success
+                fraction = trial
+                x = np.copy(result.x)
+                step = min(1.5*step,1.0)
+            elif subdivisions<max_subdivisions:
+                step *= 0.5
+                subdivisions += 1
+            else:
+                message = 'The homotopy stalled at {:.4g} of the target {}.'.format(fraction,parameter)
+                break
+    finally:
+        PRISM._guard = outer
+        if fraction<1.0:
+            _set_homotopy(PRISM,parameter,target,1.0)
+        PRISM.cost_calls = cost_calls
+        PRISM.timings = timings
+
+    if fraction<1.0:
+        # the last converged point (or guess) evaluated at the target
+        # state, unless the budget is exhausted or the guess is not finite
+        fun = np.full(np.shape(x),np.nan)
+        if (not exhausted) and np.all(np.isfinite(x)):
+            fun = np.copy(PRISM.cost(x,cr0,hk0))
+            PRISM.cost_calls += 1
+        result = OptimizeResult(x=np.copy(x),fun=fun,success=False,status=1,message=message,nfev=PRISM.cost_calls)
+
+    result.path = path
+    result.nfev = PRISM.cost_calls
+    PRISM.minimize_result = result
+    return result
@@ -0,0 +1,54 @@
+#!python
+import unittest
+import numpy as np
+from pyPRISM.core.AndersonMixing import AndersonMixing
+
+class AndersonMixing_TestCase(unittest.TestCase):
+    def test_linear(self):
+        '''Does a stack of linear fixed-point problems converge independently?'''
+        rng = np.random.default_rng(0)
+        A = 0.3*rng.normal(size=(3,20,20))/np.sqrt(20)
+        b = rng.normal(size=(3,20))
+        residual = lambda x,index: np.einsum('bij,bj->bi',A[index],x) + b[index] - x
+        solution = np.linalg.solve(np.eye(20) - A,b[...,np.newaxis])[...,0]
+
+        x = np.zeros((3,20))
+        mixing = AndersonMixing(x,residual(x,np.arange(3)),depth=5,step=0.5)
+        active = np.arange(3)
+        for iteration in range(50):
+            x_new = mixing.propose(active)
+            accept,failed = mixing.update(active,x_new,residual(x_new,active))
+            self.assertFalse(np.any(failed))
+            active = np.flatnonzero(mixing.error>1e-10)
+            if len(active)==0:
+                break
+        self.assertEqual(len(active),0)
+        np.testing.assert_allclose(mixing.x,solution,atol=1e-8)
+
+    def test_reject(self):
+        '''Are steps which increase the residual rejected?'''
+        x = np.zeros((2,4))
+        f = np.ones((2,4))
+        mixing = AndersonMixing(x,f,depth=3,step=0.5)
+        index = np.arange(2)
+        x_new = mixing.propose(index)
+        f_new = np.stack([0.5*f[0],10.0*f[1]])
+        accept,failed = mixing.update(index,x_new,f_new)
+        np.testing.assert_array_equal(accept,[True,False])
+        np.testing.assert_array_equal(mixing.x[1],x[1])
+        self.assertLess(mixing.beta[1],mixing.beta[0])
+        np.testing.assert_array_equal(mixing.history,[1,0])
+
+        # so does a step which increases the residual at the smallest mixing
+        # fraction without history, and the member has failed
+        mixing.beta[1] = mixing.beta_min
+        for f_new in [np.full((1,4),10.0),np.full((1,4),np.nan)]:
+            accept,failed = mixing.update(index[1:],x_new[1:],f_new)
+            np.testing.assert_array_equal(accept,[False])
+            np.testing.assert_array_equal(failed,[True])
+            np.testing.assert_array_equal(mixing.x[1],x[1])
+
+if __name__ == '__main__':
+    import unittest 
+    suite = unittest.TestLoader().loadTestsFromTestCase(AndersonMixing_TestCase)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,77 @@
+#!python
+import unittest
+import numpy as np
+import pyPRISM
+from pyPRISM.core.BatchPRISM import BatchPRISM
+
+class BatchPRISM_TestCase(unittest.TestCase):
+    def setup(self,kT,dr=0.05):
+        '''Construct a simple binary system'''
+        sys = pyPRISM.System(['A','B'],kT=kT)
+        sys.domain = pyPRISM.Domain(dr=dr,length=256)
+        sys.density['A'] = 0.1
+        sys.density['B'] = 0.25
+        sys.diameter[sys.types] = 1.0
+        sys.closure[sys.types,sys.types] = pyPRISM.closure.PercusYevick(apply_hard_core=True)
+        sys.closure['A','B'] = pyPRISM.closure.HyperNettedChain(apply_hard_core=True)
+        sys.potential[sys.types,sys.types] = pyPRISM.potential.Exponential(epsilon=0.5,alpha=0.5)
+        sys.omega['A','A'] = pyPRISM.omega.Gaussian(sigma=1.0,length=10)
+        sys.omega['A','B'] = pyPRISM.omega.NoIntra()
+        sys.omega['B','B'] = pyPRISM.omega.SingleSite()
+        return sys
+
+    def test_cost(self):
+        '''Does the stacked cost function match that of each member?'''
+        systems = [self.setup(kT,dr) for kT,dr in [(1.0,0.05),(2.0,0.05),(3.0,0.04)]]
+        batch = BatchPRISM(systems)
+
+        x = 0.05*np.random.default_rng(0).normal(size=(3,256,2,2))
+        x = (x + x.transpose(0,1,3,2)).reshape((3,-1))
+        y = batch.cost(x)
+        zeros = np.zeros(batch.size)
+        for i,member in enumerate(batch.members):
+            np.testing.assert_array_almost_equal(y[i],member.cost(x[i],zeros,zeros))
+
+        active = np.array([2,0])
+        np.testing.assert_array_almost_equal(batch.cost(x[active],active),y[active])
+
+        # threaded transforms give the same result
+        for sys in systems:
+            sys.domain = pyPRISM.Domain(dr=sys.domain.dr,length=256,workers=2)
+        batch = BatchPRISM(systems)
+        self.assertEqual(batch.workers,2)
+        np.testing.assert_array_almost_equal(batch.cost(x),y)
+
+    def test_solve(self):
+        '''Do batched solutions match individual solutions?'''
+        kTs = [2.0,3.0,4.0]
+        results = pyPRISM.sweep.solve_batch([self.setup(kT) for kT in kTs],tol=1e-8)
+        self.assertEqual(len(results),3)
+        for kT,PRISM in zip(kTs,results):
+            self.assertTrue(PRISM.minimize_result.success)
+            self.assertEqual(PRISM.sys.kT,kT)
+            self.assertLess(np.max(np.abs(PRISM.minimize_result.fun)),1e-8)
+
+            reference = self.setup(kT).solve_anderson(tol=1e-8)
+            np.testing.assert_allclose(PRISM.totalCorr.data,reference.totalCorr.data,atol=1e-6)
+
+    def test_validation(self):
+        '''Are incompatible Systems rejected?'''
+        sys = self.setup(2.0)
+        sys.domain = pyPRISM.Domain(dr=0.05,length=128)
+        with self.assertRaises(ValueError):
+            BatchPRISM([self.setup(1.0),sys])
+
+        sys = self.setup(2.0)
+        sys.closure['A','B'] = pyPRISM.closure.PercusYevick(apply_hard_core=True)
+        with self.assertRaises(ValueError):
+            BatchPRISM([self.setup(1.0),sys])
+
+        sys = self.setup(2.0)
+        sys.closure[sys.types,sys.types] = pyPRISM.closure.RLWC()
+        with self.assertRaises(ValueError):
+            BatchPRISM([sys])
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(BatchPRISM_TestCase)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,48 @@
+#!python
+from pyPRISM.omega.DiscreteKoyama import DiscreteKoyama
+import unittest
+import numpy as np
+
+class DiscreteKoyama_TestCase(unittest.TestCase):
+    def test_calculate(self):
+        '''Does the vectorized sum over separations match the pairwise sum?'''
+        k = np.arange(0.05,10.0,0.05)
+        length = 20
+        omega = DiscreteKoyama(sigma=1.0,l=1.0,length=length,lp=1.43)
+
+        O1 = np.zeros_like(k)
+        for i in range(1,length-1):
+            for j in range(i+1,length):
+                O1 += omega.koyama_kernel_fourier(k=k,n=abs(i-j))
+        O1 *= 2/length
+        O1 += 1.0
+
+        O2 = omega.calculate(k)
+        np.testing.assert_array_almost_equal(O1,O2)
+
+    def test_density_correction(self):
+        '''Does the vectorized density correction match the pairwise sum?'''
+        r = np.linspace(0.0001,1.0,100)
+        length = 20
+        omega = DiscreteKoyama(sigma=1.0,l=1.0,length=length,lp=2.0)
+
+        factor2 = np.zeros_like(r)
+        for i in range(1,length-1):
+            for j in range(i+2,length+1):
+                factor2 += omega.koyama_kernel_real(r=r,n=abs(i-j))
+        factor1 = np.pi*(1-3.0*r/2.0+r**3.0/2.0)/6.0
+        factor3 = 4.0*np.pi*r**2.0
+
+        np.testing.assert_array_almost_equal(factor1*factor2*factor3,omega.density_correction_kernel(r))
+
+    def test_bad_parameters(self):
+        '''Are unphysical moments reported?'''
+        omega = DiscreteKoyama(sigma=1.0,l=1.0,length=10,lp=1.43)
+        omega.cos2 = -5.0
+        with self.assertRaises(ValueError):
+            omega.calculate(np.arange(0.05,1.0,0.05))
+
+if __name__ == '__main__':
+    import unittest 
+    suite = unittest.TestLoader().loadTestsFromTestCase(DiscreteKoyama_TestCase)
+    unittest.TextTestRunner(verbosity=2).run(suite)
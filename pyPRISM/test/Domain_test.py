@@ -38,6 +38,28 @@ class Domain_TestCase(unittest.TestCase):
         np.testing.assert_array_almost_equal(MA['C','B'],array3)
         np.testing.assert_array_almost_equal(MA['C','C'],array4)
         
+    def test_MatrixArray_workers(self):
+        '''Does a threaded batched transform match the pairwise transform?'''
+        length = 1024
+        rank = 6
+        d = Domain(length=length,dr=0.1,workers=2)
+        
+        MA = MatrixArray(length=length,rank=rank)
+        np.random.seed(0)
+        arrays = {}
+        for (i,j),(t1,t2),pair in MA.iterpairs():
+            arrays[t1,t2] = np.random.random(length)
+            MA[t1,t2] = arrays[t1,t2]
+        
+        d.MatrixArray_to_fourier(MA)
+        for (t1,t2),array in arrays.items():
+            np.testing.assert_array_almost_equal(MA[t1,t2],d.to_fourier(array))
+            np.testing.assert_array_almost_equal(MA[t2,t1],d.to_fourier(array))
+        
+        d.MatrixArray_to_real(MA)
+        for (t1,t2),array in arrays.items():
+            np.testing.assert_array_almost_equal(MA[t1,t2],array)
+        
     def test_array_loop(self):
         '''Can we go to Fourier space and back again?'''
         d = Domain(length=1024,dr=0.1)
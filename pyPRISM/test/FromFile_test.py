@@ -2,8 +2,12 @@
 from pyPRISM.omega.FromFile import FromFile
 import unittest
 import numpy as np
+import importlib
 import os
 
+# the package re-exports the class under the module name
+FromFileModule = importlib.import_module('pyPRISM.omega.FromFile')
+
 class FromFile_TestCase(unittest.TestCase):
     def test_create(self):
         '''Can we create a FromFile Omega?'''
@@ -29,5 +33,67 @@ class FromFile_TestCase(unittest.TestCase):
             FF = FromFile(fname).calculate(k)
         
         os.remove(fname)
-        
-        
+
+    def test_binary(self):
+        '''Can we read .npy and .npz files?'''
+        k = np.arange(0.75,3.5,0.05)
+        omega = 1.0 + np.exp(-k)
+
+        np.save('FromFileTestCase.npy',np.array([k,omega]).T)
+        np.savez('FromFileTestCase.npz',k=k,omega=omega)
+        threshold = FromFileModule.MMAP_THRESHOLD
+        try:
+            np.testing.assert_array_almost_equal(FromFile('FromFileTestCase.npy').calculate(k),omega)
+            np.testing.assert_array_almost_equal(FromFile('FromFileTestCase.npz').calculate(k),omega)
+
+            FromFileModule._parsed.clear()
+            FromFileModule.MMAP_THRESHOLD = 0
+            FF = FromFile('FromFileTestCase.npy').calculate(k)
+            np.testing.assert_array_almost_equal(FF,omega)
+            del FF
+            FromFileModule._parsed.clear()
+
+            with self.assertRaises(AssertionError):
+                FromFile('FromFileTestCase.npz').calculate(k[:-1])
+        finally:
+            FromFileModule.MMAP_THRESHOLD = threshold
+            os.remove('FromFileTestCase.npy')
+            os.remove('FromFileTestCase.npz')
+
+    def test_parse_once(self):
+        '''Is the file only re-parsed when it changes?'''
+        fname = 'FromFileTestCase.dat'
+        k = np.arange(0.75,3.5,0.05)
+        np.savetxt(fname,k)
+        try:
+            FF1 = FromFile(fname).calculate(k)
+            FF2 = FromFile(fname).calculate(k)
+            self.assertIs(FF1,FF2)
+            self.assertFalse(FF1.flags.writeable)
+
+            np.savetxt(fname,k[:-1])
+            FF3 = FromFile(fname).calculate(k[:-1])
+            self.assertEqual(FF3.shape[0],k.shape[0]-1)
+        finally:
+            os.remove(fname)
+
+    def test_recheck(self):
+        '''Is the domain checked again when the file changes?'''
+        fname = 'FromFileTestCase.dat'
+        k = np.arange(0.75,3.5,0.05)
+        np.savetxt(fname,np.array([k,k]).T)
+        try:
+            omega = FromFile(fname)
+            omega.calculate(k)
+
+            np.savetxt(fname,np.array([2.0*k,k]).T)
+            os.utime(fname,ns=(0,0))
+            with self.assertRaises(AssertionError):
+                omega.calculate(k)
+        finally:
+            os.remove(fname)
+
+if __name__ == '__main__':
+    import unittest 
+    suite = unittest.TestLoader().loadTestsFromTestCase(FromFile_TestCase)
+    unittest.TextTestRunner(verbosity=2).run(suite)
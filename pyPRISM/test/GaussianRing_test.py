@@ -21,5 +21,14 @@ class GaussianRing_TestCase(unittest.TestCase):
         G = GaussianRing(sigma,length)
         O2 = G.calculate(k)
         np.testing.assert_array_almost_equal(O1,O2)
-        
-        
+
+    def test_symmetry(self):
+        '''Are odd and even rings counted correctly?'''
+        k = np.arange(0.05,3.5,0.05)
+        sigma = 1.0
+        for length in (1,2,7,8):
+            O1 = np.zeros_like(k)
+            for i in range(length):
+                O1 += np.exp(-sigma*sigma*k*k*i*(length-i)/(6.0*length))
+            O2 = GaussianRing(sigma,length).calculate(k)
+            np.testing.assert_array_almost_equal(O1,O2)
@@ -195,9 +195,60 @@ class MatrixArray_TestCase(unittest.TestCase):
         np.testing.assert_array_almost_equal(MA2.data,array2)
         np.testing.assert_array_almost_equal(MA3.data,array3)
         
+        MA4 = MatrixArray(length=length,rank=rank)
+        MA5 = MA1.dot(MA2,out=MA4)
+        self.assertIs(MA5,MA4)
+        np.testing.assert_array_almost_equal(MA4.data,array3)
+        
         MA1.dot(MA2,inplace=True)
         np.testing.assert_array_almost_equal(MA1.data,MA3.data)
         
+    def test_solve(self):
+        '''Can we solve linear systems for all matrices (closed-form and LAPACK)?'''
+        length = 100
+        for rank in [1,2,3,4]:
+            np.random.seed(rank)
+            MA1 = MatrixArray(length=length,rank=rank,data=np.random.random((length,rank,rank)))
+            MA2 = MatrixArray(length=length,rank=rank,data=np.random.random((length,rank,rank)))
+            MA1.data += 5.0*np.eye(rank) # keep all matrices well conditioned
+            
+            MA3 = MA1.solve(MA2)
+            np.testing.assert_array_almost_equal(MA3.data,MA1.invert().dot(MA2).data)
+            
+            MA4 = MatrixArray(length=length,rank=rank)
+            self.assertIs(MA1.solve(MA2,out=MA4),MA4)
+            np.testing.assert_array_almost_equal(MA4.data,MA3.data)
+        
+        MA1 = MatrixArray(length=length,rank=2)
+        MA2 = MatrixArray(length=length,rank=2,data=np.random.random((length,2,2)))
+        with self.assertRaises(np.linalg.LinAlgError):
+            MA1.solve(MA2)
+
+        # nearly singular matrices are solved accurately
+        for rank in [2,3]:
+            np.random.seed(rank)
+            data = np.random.random((length,rank,rank))
+            data[:,-1] = data[:,0] + 1e-9*np.random.random((length,rank))
+            MA1 = MatrixArray(length=length,rank=rank,data=data)
+            MA2 = MatrixArray(length=length,rank=rank,data=np.random.random((length,rank,rank)))
+            MA3 = MA1.solve(MA2)
+            np.testing.assert_allclose(MA3.data,np.linalg.solve(data,MA2.data),rtol=1e-6)
+        
+    def test_pack(self):
+        '''Can we pack and unpack the upper triangle?'''
+        length = 100
+        rank = 3
+        (MA1,MA2),(array1,array2) = self.set_up_test_arrays(length,rank)
+        
+        packed = MA1.pack()
+        self.assertEqual(packed.shape,(length,MA1.npairs))
+        for n,((i,j),(t1,t2),pair) in enumerate(MA1.iterpairs()):
+            np.testing.assert_array_almost_equal(packed[:,n],pair)
+        
+        MA3 = MatrixArray(length=length,rank=rank)
+        MA3.unpack(packed.reshape(-1))
+        np.testing.assert_array_almost_equal(MA3.data,array1)
+        
     def test_iterpairs(self):
         ''' Can we iterate over the pair-functions?'''
         length = 100
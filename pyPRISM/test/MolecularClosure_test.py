@@ -0,0 +1,70 @@
+#!python
+from pyPRISM.closure.ReferenceLariaWuChandler import ReferenceLariaWuChandler
+from pyPRISM.closure.ReferenceMolecularPercusYevick import ReferenceMolecularPercusYevick
+from pyPRISM.closure.ReferenceMolecularMeanSphericalApproximation import ReferenceMolecularMeanSphericalApproximation
+from pyPRISM.core.Domain import Domain
+import unittest
+import warnings
+import copy
+import numpy as np
+
+class MolecularClosure_TestCase(unittest.TestCase):
+    def setUp(self):
+        self.domain = Domain(dr=0.05,length=256)
+        r = self.domain.r
+        k = self.domain.k
+        self.potential = -0.5*np.exp(-r)
+        self.omega = 1.0 + 5.0*np.exp(-k*k)
+        self.gamma = 0.1*np.exp(-r)
+        self.hk = 0.2*np.exp(-k)
+        self.cr0 = -np.exp(-2*r)
+        self.hk0 = np.exp(-k*k)
+
+    def closures(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for cls in (ReferenceLariaWuChandler,ReferenceMolecularPercusYevick,ReferenceMolecularMeanSphericalApproximation):
+                closure = cls(apply_hard_core=True)
+                closure.sigma = 1.0
+                closure.potential = self.potential
+                yield cls,closure
+
+    def calculate(self,closure,cr0):
+        return closure.calculate(self.domain,self.gamma,self.omega,self.omega,cr0,self.hk0,self.hk).copy()
+
+    def fresh(self,cls,cr0):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            closure = cls(apply_hard_core=True)
+        closure.sigma = 1.0
+        closure.potential = self.potential
+        return self.calculate(closure,cr0)
+
+    def test_cache(self):
+        '''Are cached transforms reused and invalidated when their inputs change?'''
+        for cls,closure in self.closures():
+            value1 = self.calculate(closure,self.cr0)
+            transforms = {name:value for name,(inputs,value) in closure._transforms.items()}
+            value2 = self.calculate(closure,self.cr0)
+            for name,(inputs,value) in closure._transforms.items():
+                self.assertIs(value,transforms[name])
+            np.testing.assert_array_almost_equal(value1,value2)
+
+            cr0 = 0.5*self.cr0
+            np.testing.assert_array_almost_equal(self.calculate(closure,cr0),self.fresh(cls,cr0))
+
+            closure.potential = 2.0*self.potential
+            self.potential = closure.potential
+            np.testing.assert_array_almost_equal(self.calculate(closure,cr0),self.fresh(cls,cr0))
+            self.potential = 0.5*closure.potential
+
+    def test_copy(self):
+        '''Are cached transforms excluded from copies?'''
+        for cls,closure in self.closures():
+            self.calculate(closure,self.cr0)
+            self.assertNotIn('_transforms',vars(copy.copy(closure)))
+
+if __name__ == '__main__':
+    import unittest 
+    suite = unittest.TestLoader().loadTestsFromTestCase(MolecularClosure_TestCase)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,45 @@
+#!python
+from pyPRISM.omega.NonOverlappingFreelyJointedChain import NonOverlappingFreelyJointedChain
+from pyPRISM.omega.FreelyJointedChain import FreelyJointedChain
+import unittest
+import scipy.integrate
+import numpy as np
+
+def direct_nfjc(k,length):
+    '''Evaluate each tau integral separately following Reference [1]'''
+    integrate = scipy.integrate.simpson
+    value = np.zeros_like(k)
+    x = np.arange(0.1,100,0.1)
+    K,X = np.meshgrid(k,x,indexing='ij')
+    ZBase = (1/(np.pi*K))*X*(np.sin(K-X)/(K-X) - np.sin(K+X)/(K+X))
+    sinxx = np.sin(x)/x
+    sinkk = np.sin(k)/k
+    J0Base = (np.sin(x)/x - np.cos(x))
+    for tau in range(2,length):
+        J0val = 2/np.pi * integrate((sinxx)**(tau)*J0Base,x=x)
+        B = (1 - J0val)**(-1.0)
+        Jvals = integrate(ZBase*(np.sin(X)/X)**(tau),x=x,axis=1)
+        value += (length - tau) * (B * ((sinkk)**(tau) - Jvals) - (sinkk)**(tau))
+    value *= 2.0/length
+    value += FreelyJointedChain(length=length,l=1.0).calculate(k)
+    return value
+
+class NonOverlappingFreelyJointedChain_TestCase(unittest.TestCase):
+    def test_calculate(self):
+        '''Does the summed integrand match integrating each tau separately?'''
+        k = np.arange(0.05,15.0,0.0731)
+        length = 25
+        O1 = direct_nfjc(k,length)
+        O2 = NonOverlappingFreelyJointedChain(length=length,l=1.0).calculate(k)
+        np.testing.assert_array_almost_equal(O1,O2)
+
+    def test_grid_points(self):
+        '''Are wavenumbers on the integration grid finite?'''
+        k = np.array([0.5,1.0,2.0])
+        value = NonOverlappingFreelyJointedChain(length=10,l=1.0).calculate(k)
+        self.assertTrue(np.all(np.isfinite(value)))
+
+if __name__ == '__main__':
+    import unittest 
+    suite = unittest.TestLoader().loadTestsFromTestCase(NonOverlappingFreelyJointedChain_TestCase)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,83 @@
+#!python
+import unittest
+import numpy as np
+import pyPRISM
+
+class OmegaCache_TestCase(unittest.TestCase):
+    def test_calculate(self):
+        '''Are evaluations reused and keyed by parameters and grid?'''
+        cache = pyPRISM.omega.OmegaCache()
+        k = pyPRISM.Domain(dr=0.1,length=1024).k
+        
+        omega1 = pyPRISM.omega.Gaussian(sigma=1.0,length=100)
+        value1 = cache.calculate(omega1,k)
+        np.testing.assert_array_almost_equal(value1,omega1.calculate(k))
+        self.assertFalse(value1.flags.writeable)
+        
+        # a separate object with identical parameters is a hit, even
+        # though omega1.value has since been set
+        omega2 = pyPRISM.omega.Gaussian(sigma=1.0,length=100)
+        value2 = cache.calculate(omega2,k)
+        self.assertIs(value2,value1)
+        self.assertIs(omega2.value,value1)
+        value2 = cache.calculate(omega1,k)
+        self.assertIs(value2,value1)
+        self.assertEqual((cache.hits,cache.misses),(2,1))
+        
+        cache.calculate(pyPRISM.omega.Gaussian(sigma=1.0,length=101),k)
+        cache.calculate(omega1,k*2.0)
+        self.assertEqual((cache.hits,cache.misses),(2,3))
+        
+        # stored data is not memoized
+        cache.calculate(pyPRISM.omega.FromArray(np.ones(1024)),k)
+        self.assertEqual(len(cache),3)
+        
+    def test_evict(self):
+        '''Are the least recently used evaluations evicted?'''
+        cache = pyPRISM.omega.OmegaCache(max_entries=2)
+        k = pyPRISM.Domain(dr=0.1,length=1024).k
+        omegas = [pyPRISM.omega.Gaussian(sigma=1.0,length=N) for N in [10,20,30]]
+        cache.calculate(omegas[0],k)
+        cache.calculate(omegas[1],k)
+        cache.calculate(omegas[0],k)
+        cache.calculate(omegas[2],k)
+        self.assertEqual(len(cache),2)
+        cache.calculate(omegas[0],k)
+        self.assertEqual(cache.hits,2)
+        cache.calculate(omegas[1],k)
+        self.assertEqual(cache.misses,4)
+        
+        cache.max_size = 1024*8
+        cache.calculate(omegas[2],k)
+        self.assertEqual(len(cache),1)
+        
+        cache.clear()
+        self.assertEqual(len(cache),0)
+        
+    def test_PRISM(self):
+        '''Do PRISM objects share omega evaluations?'''
+        pyPRISM.omega.cache.clear()
+        hits,misses = pyPRISM.omega.cache.hits,pyPRISM.omega.cache.misses
+        
+        sys = pyPRISM.System(['A','B'])
+        sys.domain = pyPRISM.Domain(dr=0.1,length=1024)
+        sys.density[sys.types] = 0.1
+        sys.diameter[sys.types] = 1.0
+        sys.closure[sys.types,sys.types] = pyPRISM.closure.PercusYevick()
+        sys.potential[sys.types,sys.types] = pyPRISM.potential.HardSphere()
+        sys.omega[sys.types,sys.types] = pyPRISM.omega.GaussianRing(sigma=1.0,length=20)
+        sys.omega['A','B'] = pyPRISM.omega.NoIntra()
+        
+        PRISM1 = sys.createPRISM()
+        sys.density[sys.types] = 0.2
+        PRISM2 = sys.createPRISM()
+        
+        self.assertEqual(pyPRISM.omega.cache.misses-misses,1)
+        self.assertEqual(pyPRISM.omega.cache.hits-hits,3)
+        np.testing.assert_array_almost_equal(PRISM1.omegaConvolution.data,PRISM2.omegaConvolution.data)
+        np.testing.assert_array_almost_equal(PRISM2.omega.data,PRISM2.omegaConvolution.data*0.2)
+
+if __name__ == '__main__':
+    import unittest 
+    suite = unittest.TestLoader().loadTestsFromTestCase(OmegaCache_TestCase)
+    unittest.TextTestRunner(verbosity=2).run(suite)
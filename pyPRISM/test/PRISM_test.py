@@ -1,6 +1,7 @@
 #!python
 import unittest
 import numpy as np
+import warnings
 import pyPRISM
 
 class PRISM_TestCase(unittest.TestCase):
@@ -32,7 +33,318 @@ class PRISM_TestCase(unittest.TestCase):
         PRISM = self.setup()
         result = PRISM.solve(options={'disp':False})
         self.assertIsNot(result,None)
+
+    def test_solve_anderson(self):
+        '''Can we solve the PRISM equations with Anderson mixing?'''
+        PRISM = self.setup()
+        result = PRISM.solve_anderson(tol=1e-6)
+        self.assertTrue(result.success)
+        self.assertLess(np.max(np.abs(result.fun)),1e-6)
+        anderson_calls = PRISM.cost_calls
+
+        # Picard iteration needs many more calls (even though its tol only
+        # bounds step*residual)
+        PRISM = self.setup()
+        PRISM.solve_picard(tol=1e-6)
+        self.assertLess(2*anderson_calls,PRISM.cost_calls)
+
+    def test_callback(self):
+        '''Do the solvers report telemetry and stop when asked?'''
+        for solver,kwargs in [('solve',{'options':{'disp':False}}),('solve',{'method':'hybr','packed':True}),('solve_anderson',{}),('solve_picard',{'disp':False})]:
+            PRISM = self.setup()
+            infos = []
+            def callback(info):
+                infos.append(info)
+                return len(infos)==3
+            result = getattr(PRISM,solver)(callback=callback,**kwargs)
+            
+            self.assertEqual(len(infos),3)
+            self.assertEqual(set(infos[-1]['pair_residual'].keys()),{('A','A'),('A','B'),('B','B')})
+            self.assertEqual(set(infos[-1]['timings'].keys()),{'closure','transform','inversion'})
+            self.assertGreater(infos[-1]['timings']['transform'],0.0)
+            self.assertLess(infos[0]['cost_calls'],infos[-1]['cost_calls'])
+            self.assertEqual(infos[-1]['cost_calls'],PRISM.cost_calls)
+            self.assertAlmostEqual(infos[-1]['residual'],max(infos[-1]['pair_residual'].values()))
+            if solver!='solve_picard':
+                self.assertFalse(result.success)
+        
+    def test_solve_packed(self):
+        '''Can we solve the PRISM equations using only the independent pairs?'''
+        PRISM = self.setup()
+        result = PRISM.solve_anderson(tol=1e-6,packed=True)
+        self.assertTrue(result.success)
+        self.assertEqual(result.x.shape,(2*2*1024,))
+        self.assertLess(np.max(np.abs(result.fun)),1e-6)
+        np.testing.assert_array_almost_equal(PRISM.cost(result.x,PRISM.x2,PRISM.x3),result.fun)
         
+        packed = PRISM.cost_packed(PRISM._pack(result.x),PRISM.x2,PRISM.x3)
+        self.assertEqual(packed.shape,(3*1024,))
+        np.testing.assert_array_almost_equal(PRISM._unpack(packed),result.fun)
+
+        # Anderson mixing follows the same iterates in both layouts
+        full = self.setup().solve_anderson(maxiter=5)
+        half = self.setup().solve_anderson(maxiter=5,packed=True)
+        np.testing.assert_allclose(half.x,full.x,rtol=1e-8,atol=1e-10)
+
+    def test_grouped_closures(self):
+        '''Do grouped closure kernels match pair-by-pair evaluation?'''
+        sys = pyPRISM.System(['A','B','C'],kT=2.0)
+        sys.domain = pyPRISM.Domain(dr=0.1,length=256)
+        sys.density[sys.types] = 0.1
+        sys.diameter[sys.types] = 1.0
+        sys.closure[sys.types,sys.types] = pyPRISM.closure.PercusYevick(apply_hard_core=True)
+        sys.closure['A','A'] = pyPRISM.closure.HyperNettedChain()
+        sys.closure['B','C'] = pyPRISM.closure.HyperNettedChain(apply_hard_core=True)
+        sys.potential[sys.types,sys.types] = pyPRISM.potential.HardSphere()
+        sys.potential['A','A'] = pyPRISM.potential.LennardJones(epsilon=1.0,sigma=1.0,rcut=2.5)
+        sys.omega[sys.types,sys.types] = pyPRISM.omega.SingleSite()
+        sys.omega.setUnset(pyPRISM.omega.NoIntra())
+        PRISM = sys.createPRISM()
+        self.assertEqual(len(PRISM._closure_groups),2)
+        self.assertEqual(len(PRISM._pairwise_closures),0)
+
+        x = 0.1*np.random.default_rng(0).normal(size=(256,3,3))
+        x = (x + x.transpose(0,2,1)).reshape(-1)
+        zeros = np.zeros_like(x)
+        grouped = PRISM.cost(x,zeros,zeros).copy()
+        values = {}
+        for (i,j),(t1,t2),closure in PRISM.sys.closure.iterpairs():
+            values[t1,t2] = np.copy(closure.value)
+
+        PRISM._closure_groups = []
+        PRISM._grouped_closures = []
+        PRISM._pairwise_closures = list(PRISM.sys.closure.iterpairs())
+        pairwise = PRISM.cost(x,zeros,zeros)
+        np.testing.assert_array_almost_equal(grouped,pairwise)
+        for (i,j),(t1,t2),closure in PRISM.sys.closure.iterpairs():
+            np.testing.assert_array_almost_equal(values[t1,t2],closure.value)
+
+        # subclasses which override calculate are evaluated pair-by-pair
+        class Shifted(pyPRISM.closure.PercusYevick):
+            def calculate(self,r,gamma):
+                return super().calculate(r,gamma) + 1.0
+        sys.closure['B','B'] = Shifted(apply_hard_core=True)
+        PRISM = sys.createPRISM()
+        self.assertEqual(len(PRISM._closure_groups),2)
+        self.assertEqual([(t1,t2) for (i,j),(t1,t2),closure in PRISM._pairwise_closures],[('B','B')])
+        shifted = PRISM.cost(x,zeros,zeros)
+        self.assertFalse(np.allclose(shifted,grouped))
+
+    def test_jvp(self):
+        '''Do the Jacobian-vector products match finite differences of cost?'''
+        systems = []
+        
+        sys = pyPRISM.System(['A','B','C'],kT=2.0)
+        sys.domain = pyPRISM.Domain(dr=0.1,length=256)
+        sys.density[sys.types] = 0.1
+        sys.diameter[sys.types] = 1.0
+        sys.closure[sys.types,sys.types] = pyPRISM.closure.PercusYevick(apply_hard_core=True)
+        sys.closure['A','A'] = pyPRISM.closure.HyperNettedChain()
+        sys.closure['B','B'] = pyPRISM.closure.MeanSphericalApproximation(apply_hard_core=True)
+        sys.closure['B','C'] = pyPRISM.closure.MartynovSarkisov(apply_hard_core=True)
+        sys.potential[sys.types,sys.types] = pyPRISM.potential.HardSphere()
+        sys.potential['A','A'] = pyPRISM.potential.LennardJones(epsilon=1.0,sigma=1.0,rcut=2.5)
+        sys.omega[sys.types,sys.types] = pyPRISM.omega.SingleSite()
+        sys.omega.setUnset(pyPRISM.omega.NoIntra())
+        systems.append(sys)
+
+        for closure in (pyPRISM.closure.RLWC,pyPRISM.closure.RMMSA):
+            sys = pyPRISM.System(['A','B'])
+            sys.domain = pyPRISM.Domain(dr=0.1,length=256)
+            sys.density['A'] = 0.3
+            sys.density['B'] = 0.4
+            sys.diameter[sys.types] = 1.0
+            sys.closure[sys.types,sys.types] = closure(apply_hard_core=True)
+            sys.potential[sys.types,sys.types] = pyPRISM.potential.Exponential(epsilon=0.1,alpha=0.5)
+            sys.omega['A','A'] = pyPRISM.omega.Gaussian(sigma=1.0,length=20)
+            sys.omega['B','B'] = pyPRISM.omega.Gaussian(sigma=1.0,length=10)
+            sys.omega['A','B'] = pyPRISM.omega.NoIntra()
+            systems.append(sys)
+
+        rng = np.random.default_rng(0)
+        for sys in systems:
+            PRISM = sys.createPRISM()
+            x = 0.03*rng.normal(size=(256,sys.rank,sys.rank))
+            x = (x + x.transpose(0,2,1)).reshape(-1)
+            v = rng.normal(size=x.shape)
+            zeros = np.zeros_like(x)
+
+            eps = 1.0E-7
+            fp = PRISM.cost(x+eps*v,zeros,zeros).copy()
+            fm = PRISM.cost(x-eps*v,zeros,zeros).copy()
+            PRISM.cost(x,zeros,zeros)
+            Jv = PRISM.jvp(v)
+            fd = (fp-fm)/(2*eps)
+            self.assertLess(np.max(np.abs(Jv-fd)),1.0E-5*np.max(np.abs(fd)))
+
+    def test_solve_newton(self):
+        '''Can we solve the PRISM equations with the exact Newton-Krylov method?'''
+        for packed in (False,True):
+            PRISM = self.setup()
+            result = PRISM.solve_newton(tol=1e-6,packed=packed)
+            self.assertTrue(result.success)
+            self.assertGreater(result.njev,0)
+            self.assertLess(np.max(np.abs(result.fun)),1e-6)
+            np.testing.assert_array_almost_equal(PRISM.cost(result.x,PRISM.x2,PRISM.x3),result.fun)
+
+    def test_solve_direct(self):
+        '''Are Systems whose closures do not depend on gamma solved directly?'''
+        sys = pyPRISM.System(['A','B'],kT=2.0)
+        sys.domain = pyPRISM.Domain(dr=0.1,length=512)
+        sys.density['A'] = 0.2
+        sys.density['B'] = 0.3
+        sys.diameter[sys.types] = 1.0
+        sys.closure[sys.types,sys.types] = pyPRISM.closure.MeanSphericalApproximation()
+        sys.closure['B','B'] = pyPRISM.closure.RMMSA()
+        sys.potential[sys.types,sys.types] = pyPRISM.potential.Exponential(epsilon=0.5,alpha=0.5,sigma=0.5)
+        sys.omega['A','A'] = pyPRISM.omega.SingleSite()
+        sys.omega['A','B'] = pyPRISM.omega.NoIntra()
+        sys.omega['B','B'] = pyPRISM.omega.Gaussian(sigma=1.0,length=10)
+
+        results = []
+        for solver,kwargs in [('solve',{'options':{'disp':False}}),('solve_anderson',{}),('solve_newton',{})]:
+            PRISM = sys.createPRISM()
+            result = getattr(PRISM,solver)(**kwargs)
+            self.assertTrue(result.success)
+            self.assertEqual(result.nfev,2)
+            self.assertEqual(PRISM.cost_calls,2)
+            self.assertLess(np.max(np.abs(result.fun)),1e-10)
+            results.append(PRISM.totalCorr.data)
+
+        PRISM = sys.createPRISM()
+        PRISM._solve_direct = lambda cr0,hk0,tol: None
+        result = PRISM.solve_anderson(tol=1e-10)
+        self.assertGreater(result.nfev,2)
+        for data in results:
+            np.testing.assert_array_almost_equal(data,PRISM.totalCorr.data)
+
+        # with the hard core, the closures are still affine in gamma and
+        # solve uses the exact Newton method
+        sys.closure[sys.types,sys.types] = pyPRISM.closure.MeanSphericalApproximation(apply_hard_core=True)
+        PRISM = sys.createPRISM()
+        result = PRISM.solve(options={'disp':False},tol=1e-8)
+        self.assertTrue(result.success)
+        self.assertIn('njev',result)
+        self.assertLess(np.max(np.abs(result.fun)),1e-8)
+        self.assertLess(PRISM.cost_calls,20)
+
+        reference = sys.createPRISM()
+        reference.solve(method='broyden1',options={'disp':False},tol=1e-8)
+        self.assertLess(PRISM.cost_calls,reference.cost_calls)
+        np.testing.assert_array_almost_equal(PRISM.totalCorr.data,reference.totalCorr.data,decimal=4)
+
+        sys.closure['A','A'] = pyPRISM.closure.MeanSphericalApproximation(apply_hard_core=True)
+        PRISM = sys.createPRISM()
+        self.assertIsNone(PRISM._solve_direct(np.zeros(2*2*512),np.zeros(2*2*512),1e-6))
+
+    def test_solve_multigrid(self):
+        '''Can we solve the PRISM equations starting from coarser grids?'''
+        for coarsen in ('dr','rmax'):
+            PRISM = self.setup()
+            result = PRISM.solve_multigrid(levels=3,coarsen=coarsen,solver='solve_newton',tol=1e-6)
+            self.assertTrue(result.success)
+            self.assertEqual(len(result.levels),2)
+            self.assertEqual(PRISM.x1.shape,(2*2*1024,))
+            self.assertLess(np.max(np.abs(result.fun)),1e-6)
+
+        PRISM = self.setup()
+        result = PRISM.solve_multigrid(levels=2,options={'disp':False})
+        self.assertTrue(result.success)
+
+        with self.assertRaises(ValueError):
+            PRISM.solve_multigrid(coarsen='k')
+
+        with self.assertRaises(ValueError):
+            PRISM.solve_multigrid(solver='solve_picard')
+
+    def test_solve_strategy(self):
+        '''Do solver strategies fall back to later stages within their budget?'''
+        PRISM = self.setup()
+        strategy = [('krylov',{'max_cost_calls':5}),('anderson',{'tol':1e-7})]
+        result = PRISM.solve(strategy=strategy,tol=1e-6)
+        self.assertTrue(result.success)
+        self.assertEqual([attempt['strategy'] for attempt in result.attempts],['krylov','anderson'])
+        self.assertEqual(result.attempts[0]['cost_calls'],5)
+        self.assertFalse(result.attempts[0]['success'])
+        self.assertEqual(result.strategy[0],('anderson',{'tol':1e-7}))
+        self.assertEqual(PRISM.cost_calls,sum(attempt['cost_calls'] for attempt in result.attempts))
+        np.testing.assert_array_equal(PRISM.x1,result.x)
+
+        # non-finite residuals abort each attempt immediately
+        PRISM = self.setup()
+        guess = np.full(2*2*1024,np.nan)
+        result = PRISM.solve(guess=guess,strategy='auto')
+        self.assertFalse(result.success)
+        self.assertEqual(len(result.attempts),len(pyPRISM.sweep.strategy.default_strategy))
+        for attempt in result.attempts[:-1]:
+            self.assertEqual(attempt['cost_calls'],1)
+            self.assertEqual(attempt['message'],'Non-finite residual encountered.')
+
+        # each point of the homotopy is aborted in turn
+        self.assertEqual(result.attempts[-1]['strategy'],'homotopy')
+        self.assertEqual(len(result.path),7)
+        for point in result.path:
+            self.assertEqual(point['cost_calls'],1)
+
+        # a budget alone applies to the requested method
+        PRISM = self.setup()
+        result = PRISM.solve(max_cost_calls=10)
+        self.assertFalse(result.success)
+        self.assertEqual(PRISM.cost_calls,10)
+        self.assertEqual(len(result.attempts),1)
+
+        with self.assertRaises(ValueError):
+            PRISM.solve(strategy=['simplex'])
+
+    def test_solve_homotopy(self):
+        '''Can we reach dense states by ramping the density or potential?'''
+        sys = pyPRISM.System(['A'],kT=1.0)
+        sys.domain = pyPRISM.Domain(dr=0.02,length=1024)
+        sys.density['A'] = 0.9
+        sys.diameter['A'] = 1.0
+        sys.closure['A','A'] = pyPRISM.closure.HyperNettedChain()
+        sys.potential['A','A'] = pyPRISM.potential.LennardJones(epsilon=1.0)
+        sys.omega['A','A'] = pyPRISM.omega.SingleSite()
+
+        for strategy in [[('homotopy',{'parameter':'density','steps':10})],[('homotopy',{'parameter':'kT','steps':5,'solver':'krylov'})]]:
+            PRISM = sys.createPRISM()
+            result = PRISM.solve(strategy=strategy,tol=1e-6)
+            self.assertTrue(result.success)
+            self.assertEqual(result.path[-1]['fraction'],1.0)
+            self.assertTrue(all(point['fraction']<1.0 for point in result.path[:-1] if point['success']))
+            self.assertEqual(PRISM.sys.density['A'],0.9)
+            self.assertEqual(PRISM.sys.kT,1.0)
+            residual = PRISM.cost(result.x,PRISM.x2,PRISM.x3)
+            self.assertLess(np.max(np.abs(residual)),1e-6)
+
+        PRISM = sys.createPRISM()
+        result = PRISM.solve(homotopy='kT',steps=5,tol=1e-6)
+        self.assertTrue(result.success)
+
+        # only the target state is checked for negative pair correlations
+        PRISM = sys.createPRISM()
+        def check(tol=1e-5):
+            warnings.warn('Pair correlations are negative (value = -2.00e+00) for A-A pair!')
+        PRISM._check_solution = check
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            result = PRISM.solve(homotopy='density',steps=10,tol=1e-6)
+        self.assertTrue(result.success)
+        targets = sum(point['fraction']==1.0 for point in result.path)
+        self.assertEqual(len(caught),targets+1)
+
+        # a failed homotopy leaves the object at the target state
+        PRISM = sys.createPRISM()
+        strategy = [('homotopy',{'parameter':'density','max_point_calls':5,'max_subdivisions':1})]
+        result = PRISM.solve(strategy=strategy)
+        self.assertFalse(result.success)
+        self.assertEqual(len(result.path),2)
+        self.assertEqual(PRISM.sys.density['A'],0.9)
+        np.testing.assert_array_almost_equal(PRISM.omega.data,0.9*PRISM.omegaConvolution.data)
+        np.testing.assert_array_equal(result.fun,PRISM.cost(result.x,PRISM.x2,PRISM.x3))
+
+        with self.assertRaises(ValueError):
+            PRISM.solve(homotopy='epsilon')
         
         
 if __name__ == '__main__':
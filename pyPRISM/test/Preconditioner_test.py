@@ -0,0 +1,133 @@
+#!python
+import unittest
+import numpy as np
+import pyPRISM
+from pyPRISM.core.Preconditioner import Preconditioner
+
+class Preconditioner_TestCase(unittest.TestCase):
+    def test_inverse(self):
+        '''Does the preconditioner invert the Jacobian when the closure derivatives are constant?'''
+        for closure in (pyPRISM.closure.HyperNettedChain,pyPRISM.closure.RMMSA):
+            sys = pyPRISM.System(['A','B'])
+            sys.domain = pyPRISM.Domain(dr=0.1,length=256)
+            sys.density['A'] = 0.2
+            sys.density['B'] = 0.3
+            sys.diameter[sys.types] = 1.0
+            sys.closure[sys.types,sys.types] = closure()
+            sys.potential[sys.types,sys.types] = pyPRISM.potential.Exponential(epsilon=0.0,alpha=1.0,sigma=0.0)
+            sys.omega['A','A'] = pyPRISM.omega.Gaussian(sigma=1.0,length=10)
+            sys.omega['A','B'] = pyPRISM.omega.NoIntra()
+            sys.omega['B','B'] = pyPRISM.omega.SingleSite()
+            PRISM = sys.createPRISM()
+
+            # with a flat potential and gamma, the closure derivatives are constant
+            x = np.full(256*2*2,0.1)
+            zeros = np.zeros_like(x)
+            PRISM.cost(x,zeros,zeros)
+
+            v = np.random.default_rng(0).normal(size=x.shape)
+            M = Preconditioner(PRISM)
+            np.testing.assert_allclose(M.matvec(PRISM.jvp(v)),v,atol=1e-8)
+
+            M = Preconditioner(PRISM,packed=True)
+            v = PRISM._pack(v)
+            np.testing.assert_allclose(M.matvec(PRISM.jvp_packed(v)),v,atol=1e-8)
+
+    def test_refresh(self):
+        '''Is the preconditioner rebuilt every refresh updates?'''
+        sys = pyPRISM.System(['A'])
+        sys.domain = pyPRISM.Domain(dr=0.1,length=128)
+        sys.density['A'] = 0.3
+        sys.diameter['A'] = 1.0
+        sys.closure['A','A'] = pyPRISM.closure.PercusYevick()
+        sys.potential['A','A'] = pyPRISM.potential.HardSphere()
+        sys.omega['A','A'] = pyPRISM.omega.SingleSite()
+        PRISM = sys.createPRISM()
+        x = np.zeros(128)
+        PRISM.cost(x,x,x)
+
+        M = Preconditioner(PRISM,refresh=3)
+        M.matvec(np.ones(128))
+        self.assertEqual(M.builds,1)
+        for i in range(6):
+            M.update()
+        self.assertEqual(M.builds,3)
+
+    def hard_sphere_mixture(self):
+        '''Construct an atomic hard-sphere mixture with PY closures'''
+        sys = pyPRISM.System(['A','B'])
+        sys.domain = pyPRISM.Domain(dr=0.01,length=2048)
+        sys.density['A'] = 0.3
+        sys.density['B'] = 0.1
+        sys.diameter['A'] = 1.0
+        sys.diameter['B'] = 1.6
+        sys.closure[sys.types,sys.types] = pyPRISM.closure.PercusYevick(apply_hard_core=True)
+        sys.potential[sys.types,sys.types] = pyPRISM.potential.HardSphere()
+        sys.omega['A','A'] = pyPRISM.omega.SingleSite()
+        sys.omega['A','B'] = pyPRISM.omega.NoIntra()
+        sys.omega['B','B'] = pyPRISM.omega.SingleSite()
+        return sys
+
+    def test_hard_core(self):
+        '''Does the preconditioner invert the Jacobian of hard-sphere PY systems?'''
+        sys = self.hard_sphere_mixture()
+        PRISM = sys.createPRISM()
+
+        # the closure derivatives are -1 inside the cores and zero outside
+        x = np.random.default_rng(1).normal(scale=0.1,size=(2048,2,2))
+        x = (x + x.transpose((0,2,1))).reshape((-1,))
+        zeros = np.zeros_like(x)
+        PRISM.cost(x,zeros,zeros)
+
+        v = np.random.default_rng(0).normal(size=x.shape)
+        M = Preconditioner(PRISM)
+        np.testing.assert_allclose(M.matvec(PRISM.jvp(v)),v,atol=1e-8)
+        self.assertGreater(M.offsets[-1],0)
+
+        # too many core points fall back to averaging over all points
+        M = Preconditioner(PRISM,max_core=10)
+        with self.assertWarns(UserWarning):
+            M.build()
+        self.assertIsNone(M.schur)
+        self.assertEqual(M.offsets[-1],0)
+
+        # closures without the hard core condition have no core
+        sys.closure[sys.types,sys.types] = pyPRISM.closure.PercusYevick()
+        PRISM = sys.createPRISM()
+        PRISM.cost(x,zeros,zeros)
+        M = Preconditioner(PRISM)
+        M.build()
+        self.assertIsNone(M.schur)
+
+    def test_solve(self):
+        '''Does preconditioning reduce the number of cost() calls?'''
+        sys = self.hard_sphere_mixture()
+
+        PRISM = sys.createPRISM()
+        result = PRISM.solve(options={'disp':False})
+        self.assertTrue(result.success)
+        plain = PRISM.cost_calls
+
+        PRISM = sys.createPRISM()
+        result = PRISM.solve(options={'disp':False},precondition=True,refresh=2)
+        self.assertTrue(result.success)
+        self.assertLess(np.max(np.abs(result.fun)),1e-5)
+        self.assertLess(PRISM.cost_calls,plain)
+
+        PRISM = sys.createPRISM()
+        result = PRISM.solve_newton(tol=1e-6,packed=True)
+        self.assertTrue(result.success)
+        plain = result.njev
+
+        PRISM = sys.createPRISM()
+        result = PRISM.solve_newton(tol=1e-6,packed=True,precondition=True)
+        self.assertTrue(result.success)
+        self.assertLess(np.max(np.abs(result.fun)),1e-6)
+        self.assertLess(result.njev,plain)
+
+        with self.assertRaises(ValueError):
+            PRISM.solve(method='hybr',precondition=True)
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(Preconditioner_TestCase)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,138 @@
+#!python
+import unittest
+import tempfile
+import os
+import shutil
+import numpy as np
+import pyPRISM
+
+class SolutionCache_TestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def setup(self,kT=2.0,epsilon=1.0):
+        '''Construct a simple Lennard-Jones fluid'''
+        sys = pyPRISM.System(['A'],kT=kT)
+        sys.domain = pyPRISM.Domain(dr=0.05,length=1024)
+        sys.density['A'] = 0.6
+        sys.diameter['A'] = 1.0
+        sys.closure['A','A'] = pyPRISM.closure.PercusYevick()
+        sys.potential['A','A'] = pyPRISM.potential.LennardJones(epsilon=epsilon)
+        sys.omega['A','A'] = pyPRISM.omega.SingleSite()
+        return sys
+
+    def test_fingerprint(self):
+        '''Are fingerprints stable and parameter dependent?'''
+        fingerprint = pyPRISM.util.fingerprint
+        self.assertEqual(fingerprint(self.setup()),fingerprint(self.setup()))
+        self.assertNotEqual(fingerprint(self.setup()),fingerprint(self.setup(kT=2.1)))
+        self.assertNotEqual(fingerprint(self.setup()),fingerprint(self.setup(epsilon=1.1)))
+
+    def test_hit(self):
+        '''Are solved Systems loaded from the cache?'''
+        cache = pyPRISM.util.SolutionCache(self.directory)
+        PRISM1 = self.setup().solve_anderson(cache=cache)
+        self.assertEqual(len(cache),1)
+        self.assertEqual(cache.misses,1)
+
+        # a new cache object should read the index from disk
+        cache = pyPRISM.util.SolutionCache(self.directory)
+        PRISM2 = self.setup().solve_anderson(cache=cache)
+        self.assertEqual(cache.hits,1)
+        self.assertEqual(PRISM2.minimize_result.message,'Solution loaded from cache.')
+        np.testing.assert_array_almost_equal(PRISM2.totalCorr.data,PRISM1.totalCorr.data)
+        np.testing.assert_array_almost_equal(PRISM2.directCorr.data,PRISM1.directCorr.data)
+        np.testing.assert_array_almost_equal(PRISM2.minimize_result.x,PRISM1.minimize_result.x)
+        self.assertEqual(PRISM2.totalCorr.space,PRISM1.totalCorr.space)
+
+        pyPRISM.calculate.structure_factor(PRISM2)
+
+    def test_file_contents(self):
+        '''Are Systems with modified omega files solved again?'''
+        sys = self.setup()
+        fileName = os.path.join(self.directory,'omega.dat')
+        np.savetxt(fileName,np.ones(sys.domain.length))
+        sys.omega['A','A'] = pyPRISM.omega.FromFile(fileName)
+
+        cache = pyPRISM.util.SolutionCache(os.path.join(self.directory,'cache'))
+        PRISM1 = sys.solve_anderson(cache=cache)
+        self.assertEqual(cache.misses,1)
+
+        omega = pyPRISM.omega.Gaussian(sigma=1.0,length=2).calculate(sys.domain.k)
+        np.savetxt(fileName,omega)
+        PRISM2 = sys.solve_anderson(cache=cache)
+        self.assertEqual(cache.hits,0)
+        self.assertEqual(cache.misses,2)
+        self.assertFalse(np.allclose(PRISM2.totalCorr.data,PRISM1.totalCorr.data))
+
+    def test_tolerance(self):
+        '''Are solutions stored for a loose tolerance solved again for a tight one?'''
+        cache = pyPRISM.util.SolutionCache(self.directory)
+        self.setup().solve_anderson(tol=1e-1,cache=cache)
+        PRISM = self.setup().solve_anderson(tol=1e-8,cache=cache)
+        self.assertEqual(cache.hits,0)
+        self.assertLess(np.max(np.abs(PRISM.minimize_result.fun)),1e-8)
+
+        # the display and guess arguments do not change the key
+        self.setup().solve_anderson(tol=1e-8,guess=PRISM.minimize_result.x,cache=cache)
+        self.assertEqual(cache.hits,1)
+
+    def test_state(self):
+        '''Is the complete solved state restored and are missing files misses?'''
+        cache = pyPRISM.util.SolutionCache(self.directory)
+        PRISM1 = self.setup().solve_anderson(cache=cache)
+        PRISM2 = self.setup().solve_anderson(cache=cache)
+        self.assertEqual(cache.hits,1)
+        for name in ('x2','x3'):
+            np.testing.assert_array_equal(getattr(PRISM2,name),getattr(PRISM1,name))
+        for name in cache.arrays:
+            np.testing.assert_array_almost_equal(getattr(PRISM2,name).data,getattr(PRISM1,name).data)
+            self.assertEqual(getattr(PRISM2,name).space,getattr(PRISM1,name).space)
+
+        # the Domain threading setting is not part of the key
+        sys = self.setup()
+        sys.domain = pyPRISM.Domain(dr=0.05,length=1024,workers=2)
+        sys.solve_anderson(cache=cache)
+        self.assertEqual(cache.hits,2)
+
+        key = cache.key(self.setup(),'solve_anderson')
+        os.remove(cache._path(key))
+        PRISM3 = self.setup().solve_anderson(cache=cache)
+        self.assertEqual(cache.hits,2)
+        self.assertTrue(PRISM3.minimize_result.success)
+        self.assertIn(key,cache)
+
+    def test_near_miss(self):
+        '''Are similar Systems warm-started from the cache?'''
+        cache = pyPRISM.util.SolutionCache(self.directory)
+        self.setup(kT=2.0).solve_anderson(cache=cache)
+        cold = self.setup(kT=2.1).solve_anderson()
+        warm = self.setup(kT=2.1).solve_anderson(cache=cache)
+        self.assertEqual(cache.hits,0)
+        self.assertTrue(warm.minimize_result.success)
+        self.assertLess(warm.minimize_result.nfev,cold.minimize_result.nfev)
+        self.assertEqual(len(cache),2)
+
+    def test_eviction(self):
+        '''Are the least recently used entries evicted?'''
+        cache = pyPRISM.util.SolutionCache(self.directory,near_miss=False)
+        self.setup(kT=2.0).solve_anderson(cache=cache)
+        size = cache.size
+        cache.max_size = 2.5*size
+        self.setup(kT=2.5).solve_anderson(cache=cache)
+        self.setup(kT=2.0).solve_anderson(cache=cache) # hit; kT=2.5 is now least recent
+        self.setup(kT=3.0).solve_anderson(cache=cache)
+        self.assertEqual(len(cache),2)
+        self.assertIn(cache.key(self.setup(kT=2.0),'solve_anderson'),cache)
+        self.assertNotIn(cache.key(self.setup(kT=2.5),'solve_anderson'),cache)
+
+        cache.clear()
+        self.assertEqual(len(cache),0)
+
+if __name__ == '__main__':
+    import unittest 
+    suite = unittest.TestLoader().loadTestsFromTestCase(SolutionCache_TestCase)
+    unittest.TextTestRunner(verbosity=2).run(suite)
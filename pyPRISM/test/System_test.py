@@ -52,6 +52,45 @@ class System_TestCase(unittest.TestCase):
         
         self.assertIsInstance(PRISM,pyPRISM.core.PRISM.PRISM)
         
+    def test_snapshot(self):
+        '''Are snapshots isolated from the System without copying large data?'''
+        sys = pyPRISM.System(['A','B'])
+        sys.domain = pyPRISM.Domain(dr=0.1,length=1024)
+        sys.density[sys.types] = 0.4
+        sys.diameter[sys.types] = 1.0
+        sys.closure[sys.types,sys.types] = pyPRISM.closure.PercusYevick()
+        sys.potential[sys.types,sys.types] = pyPRISM.potential.LennardJones(epsilon=1.0)
+        sys.omega[sys.types,sys.types] = pyPRISM.omega.NoIntra()
+        sys.omega['A','A'] = pyPRISM.omega.FromArray(np.ones(1024))
+        sys.omega['B','B'] = pyPRISM.omega.SingleSite()
+        
+        PRISM = sys.createPRISM()
+        
+        # the PRISM object sets these on its own copies
+        for i,t,U in sys.potential.iterpairs():
+            self.assertIsNone(U.sigma)
+        for i,t,closure in sys.closure.iterpairs():
+            self.assertIsNone(closure.potential)
+        
+        # tabulated data is shared rather than copied
+        self.assertTrue(np.shares_memory(PRISM.sys.omega['A','A'].value,sys.omega['A','A'].value))
+        
+        # symmetric pairs still refer to the same object
+        snap = sys.snapshot()
+        self.assertIs(snap.potential['A','B'],snap.potential['B','A'])
+        self.assertIsNot(snap.potential['A','B'],sys.potential['A','B'])
+        
+        # later changes to the System do not affect the snapshot
+        sys.kT = 2.0
+        sys.density['A'] = 0.1
+        sys.potential['A','B'].epsilon = 2.0
+        sys.domain.dr = 0.2
+        self.assertEqual(snap.kT,1.0)
+        self.assertEqual(snap.density['A'],0.4)
+        self.assertEqual(snap.density.pair['A','B'][0],0.4*0.4)
+        self.assertEqual(snap.potential['A','B'].epsilon,1.0)
+        self.assertEqual(snap.domain.dr,0.1)
+        
         
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(System_TestCase)
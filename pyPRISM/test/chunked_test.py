@@ -0,0 +1,37 @@
+#!python
+from pyPRISM.omega.chunked import weighted_sum,powers
+import unittest
+import numpy as np
+
+class chunked_TestCase(unittest.TestCase):
+    def test_weighted_sum(self):
+        '''Is the blocked sum independent of the block size?'''
+        x = np.linspace(0.1,5.0,37)
+        n = np.arange(1,24)
+        weight = np.linspace(1.0,2.0,n.size)
+        kernel = lambda x,n: np.exp(-np.multiply.outer(n,x)/10.0)
+
+        S1 = np.zeros_like(x)
+        for i in range(n.size):
+            S1 += weight[i]*np.exp(-n[i]*x/10.0)
+
+        for chunk in (None,1,2,5,23,100):
+            S2 = weighted_sum(kernel,x,n,weight,chunk=chunk)
+            np.testing.assert_array_almost_equal(S1,S2)
+
+    def test_powers(self):
+        '''Are all powers yielded once and in order for any block size?'''
+        base = np.linspace(-0.9,0.9,11)
+        for chunk in (None,1,3,7,50):
+            expected = 3
+            for first,block in powers(base,3,20,chunk=chunk):
+                self.assertEqual(first,expected)
+                for i in range(block.shape[0]):
+                    np.testing.assert_array_almost_equal(block[i],base**(first+i))
+                expected += block.shape[0]
+            self.assertEqual(expected,20)
+
+if __name__ == '__main__':
+    import unittest 
+    suite = unittest.TestLoader().loadTestsFromTestCase(chunked_TestCase)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,62 @@
+#!python
+import unittest
+import numpy as np
+import pyPRISM
+
+class continuation_TestCase(unittest.TestCase):
+    def setup(self):
+        '''Construct a simple hard-sphere fluid'''
+        sys = pyPRISM.System(['A'],kT=1.0)
+        sys.domain = pyPRISM.Domain(dr=0.05,length=1024)
+        sys.density['A'] = 0.3
+        sys.diameter['A'] = 1.0
+        sys.closure['A','A'] = pyPRISM.closure.PercusYevick()
+        sys.potential['A','A'] = pyPRISM.potential.HardSphere()
+        sys.omega['A','A'] = pyPRISM.omega.SingleSite()
+        return sys
+
+    def test_attribute(self):
+        '''Can we sweep a System attribute?'''
+        sys = self.setup()
+        values = [1.0,1.5,2.0]
+        results = list(pyPRISM.sweep.continuation(sys,'kT',values,solver='solve_anderson'))
+        self.assertEqual([value for value,PRISM in results],values)
+        for value,PRISM in results:
+            self.assertTrue(PRISM.minimize_result.success)
+            self.assertEqual(PRISM.sys.kT,value)
+        self.assertEqual(sys.kT,1.0)
+
+    def test_subdivision(self):
+        '''Are failed steps subdivided to reach the requested value?'''
+        sys = self.setup()
+        visited = []
+        def set_density(sys,value):
+            visited.append(value)
+            sys.density['A'] = value
+
+        # 0.9 cannot be reached from zero or directly from 0.3 in 20 iterations
+        results = list(pyPRISM.sweep.continuation(sys,set_density,[0.3,0.9],solver='solve_anderson',maxiter=20))
+        self.assertEqual(len(results),2)
+        for value,PRISM in results:
+            self.assertTrue(PRISM.minimize_result.success)
+        self.assertEqual(results[-1][1].sys.density['A'],0.9)
+        self.assertIn(0.6,visited)
+
+        PRISM = results[-1][1]
+        residual = PRISM.cost(PRISM.minimize_result.x,PRISM.x2,PRISM.x3)
+        self.assertLess(np.max(np.abs(residual)),1e-6)
+
+    def test_strategy(self):
+        '''Are points started with the solver stage which succeeded before?'''
+        sys = self.setup()
+        strategy = [('krylov',{'max_cost_calls':3}),'anderson']
+        results = list(pyPRISM.sweep.continuation(sys,'kT',[1.0,1.5],strategy=strategy))
+        for value,PRISM in results:
+            self.assertTrue(PRISM.minimize_result.success)
+        self.assertEqual(results[0][1].minimize_result.attempts[0]['strategy'],'krylov')
+        self.assertEqual(results[1][1].minimize_result.attempts[0]['strategy'],'anderson')
+
+if __name__ == '__main__':
+    import unittest 
+    suite = unittest.TestLoader().loadTestsFromTestCase(continuation_TestCase)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,94 @@
+#!python
+import unittest
+import numpy as np
+import pyPRISM
+
+class hard_sphere_py_TestCase(unittest.TestCase):
+    def setup(self,diameters,densities,dr=0.005,length=4096):
+        '''Construct an atomic hard-sphere mixture with PY closures'''
+        types = ['A','B','C'][:len(diameters)]
+        sys = pyPRISM.System(types,kT=1.0)
+        sys.domain = pyPRISM.Domain(dr=dr,length=length)
+        for t,diameter,density in zip(types,diameters,densities):
+            sys.diameter[t] = diameter
+            sys.density[t] = density
+        sys.closure[types,types] = pyPRISM.closure.PercusYevick()
+        sys.potential[types,types] = pyPRISM.potential.HardSphere()
+        sys.omega[types,types] = pyPRISM.omega.NoIntra()
+        for t in types:
+            sys.omega[t,t] = pyPRISM.omega.SingleSite()
+        return sys
+
+    def test_one_component(self):
+        '''Do we recover the closed form PY direct correlation function?'''
+        sys = self.setup([1.0],[0.6])
+        directCorr,totalCorr = pyPRISM.calculate.hard_sphere_py(sys)
+
+        r = sys.domain.r
+        eta = np.pi/6.0*0.6
+        l1 = (1.0 + 2.0*eta)**2/(1.0 - eta)**4
+        l2 = -(1.0 + eta/2.0)**2/(1.0 - eta)**4
+        known = np.where(r<1.0,-l1 - 6.0*eta*l2*r - 0.5*eta*l1*r**3,0.0)
+        np.testing.assert_array_almost_equal(directCorr['A','A'],known)
+
+        # contact value of the radial distribution function
+        contact = (1.0 + eta/2.0)/(1.0 - eta)**2
+        self.assertAlmostEqual(totalCorr['A','A'][np.argmax(r>1.0)] + 1.0,contact,places=1)
+
+    def test_compressibility(self):
+        '''Does the mixture solution satisfy the PY compressibility equation?'''
+        diameters = np.array([1.0,0.7,2.0])
+        densities = np.array([0.2,0.3,0.05])
+        sys = self.setup(diameters,densities,dr=0.001,length=8192)
+        directCorr,totalCorr = pyPRISM.calculate.hard_sphere_py(sys)
+
+        np.testing.assert_array_almost_equal(directCorr.data,directCorr.data.transpose((0,2,1)))
+
+        r = sys.domain.r
+        c0 = 4.0*np.pi*np.sum(r[:,np.newaxis,np.newaxis]**2*directCorr.data,axis=0)*sys.domain.dr
+        measured = 1.0 - c0.dot(densities)
+
+        # density derivatives of the PY compressibility equation of state
+        def pressure(densities):
+            xi = [np.pi/6.0*np.sum(densities*diameters**n) for n in range(4)]
+            return 6.0/np.pi*(xi[0]/(1.0-xi[3]) + 3.0*xi[1]*xi[2]/(1.0-xi[3])**2 + 3.0*xi[2]**3/(1.0-xi[3])**3)
+        step = 1e-6*np.eye(3)
+        known = [(pressure(densities+dx) - pressure(densities-dx))/2e-6 for dx in step]
+        np.testing.assert_allclose(measured,known,rtol=1e-2)
+
+    def test_atomic_only(self):
+        '''Are molecular systems rejected?'''
+        sys = self.setup([1.0,1.0],[0.3,0.3])
+        sys.omega['A','A'] = pyPRISM.omega.Gaussian(sigma=1.0,length=10)
+        with self.assertRaises(ValueError):
+            pyPRISM.calculate.hard_sphere_py(sys)
+
+    def test_guess(self):
+        '''Does the analytical guess accelerate hard-sphere solves?'''
+        sys = self.setup([1.0,1.6],[0.3,0.08])
+        size = sys.rank*sys.rank*sys.domain.length
+
+        PRISM = sys.createPRISM()
+        result = PRISM.solve_newton(guess=np.zeros(size))
+        self.assertTrue(result.success)
+        cold = PRISM.cost_calls
+        totalCorr = PRISM.totalCorr.data.copy()
+
+        # the analytical guess is used by default for HS/PY systems
+        PRISM = sys.createPRISM()
+        result = PRISM.solve_newton()
+        self.assertTrue(result.success)
+        self.assertLess(PRISM.cost_calls,cold)
+        np.testing.assert_array_almost_equal(PRISM.totalCorr.data,totalCorr,decimal=4)
+
+        # and can be used explicitly for nearby soft systems
+        sys.potential[sys.types,sys.types] = pyPRISM.potential.WeeksChandlerAndersen(epsilon=1.0)
+        guess = pyPRISM.calculate.hard_sphere_guess(sys)
+        PRISM = sys.createPRISM()
+        result = PRISM.solve_newton(guess=guess)
+        self.assertTrue(result.success)
+
+if __name__ == '__main__':
+    import unittest
+    suite = unittest.TestLoader().loadTestsFromTestCase(hard_sphere_py_TestCase)
+    unittest.TextTestRunner(verbosity=2).run(suite)
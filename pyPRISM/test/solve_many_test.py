@@ -0,0 +1,69 @@
+#!python
+import unittest
+import pickle
+import time
+import numpy as np
+import pyPRISM
+
+def _slow(info):
+    '''Solver callback which makes each solution take a while'''
+    time.sleep(0.25)
+    return True
+
+class solve_many_TestCase(unittest.TestCase):
+    def setup(self,density):
+        '''Construct a simple Lennard-Jones fluid'''
+        sys = pyPRISM.System(['A'],kT=2.0)
+        sys.domain = pyPRISM.Domain(dr=0.05,length=1024)
+        sys.density['A'] = density
+        sys.diameter['A'] = 1.0
+        sys.closure['A','A'] = pyPRISM.closure.PercusYevick()
+        sys.potential['A','A'] = pyPRISM.potential.LennardJones(epsilon=1.0)
+        sys.omega['A','A'] = pyPRISM.omega.SingleSite()
+        return sys
+
+    def test_pickle(self):
+        '''Can we pickle Systems and solved PRISM objects?'''
+        sys = self.setup(0.5)
+        PRISM = sys.solve_anderson()
+        PRISM2 = pickle.loads(pickle.dumps(PRISM))
+        np.testing.assert_array_almost_equal(PRISM2.totalCorr.data,PRISM.totalCorr.data)
+        np.testing.assert_array_almost_equal(PRISM2.sys.domain.k,PRISM.sys.domain.k)
+        residual = PRISM2.cost(PRISM.minimize_result.x,PRISM.x2,PRISM.x3)
+        np.testing.assert_array_almost_equal(residual,PRISM.minimize_result.fun)
+
+        U = PRISM.sys.potential['A','A']
+        U2 = pickle.loads(pickle.dumps(U))
+        np.testing.assert_array_equal(U2.calculate(sys.domain.r),U.calculate(sys.domain.r))
+
+    def test_solve_many(self):
+        '''Can we solve several Systems in parallel?'''
+        densities = [0.2,0.4,0.6]
+        systems = [self.setup(density) for density in densities]
+        results = dict(pyPRISM.solve_many(systems,workers=2,solver='solve_anderson'))
+        self.assertEqual(sorted(results.keys()),[0,1,2])
+        for i,density in enumerate(densities):
+            PRISM = results[i]
+            self.assertTrue(PRISM.minimize_result.success)
+            self.assertEqual(PRISM.sys.density['A'],density)
+
+    def test_timeout(self):
+        '''Are timed out solutions returned as exceptions?'''
+        systems = [self.setup(0.6)]
+        results = list(pyPRISM.solve_many(systems,workers=1,timeout=1e-4,solver='solve_anderson'))
+        self.assertEqual(len(results),1)
+        self.assertIsInstance(results[0][1],TimeoutError)
+
+    def test_stop_early(self):
+        '''Are queued solutions cancelled when the caller stops iterating?'''
+        systems = [self.setup(0.2) for i in range(24)]
+        start = time.perf_counter()
+        for i,PRISM in pyPRISM.solve_many(systems,workers=1,solver='solve_anderson',callback=_slow):
+            break
+        # all 24 solutions would take at least 6 seconds
+        self.assertLess(time.perf_counter() - start,3.0)
+
+if __name__ == '__main__':
+    import unittest 
+    suite = unittest.TestLoader().loadTestsFromTestCase(solve_many_TestCase)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,303 @@
+#!python
+from pyPRISM.core.Space import Space
+from pyPRISM.util.fingerprint import fingerprint,structure_fingerprint
+from scipy.optimize import OptimizeResult
+import numpy as np
+import inspect
+import json
+import os
+import time
+import zipfile
+
+class SolutionCache(object):
+    r'''On-disk cache of converged PRISM solutions
+
+    **Description**
+
+        Solving the PRISM equations for a System which has already been
+        solved is wasteful. This class stores converged solutions on disk,
+        keyed by a stable hash (see :func:`pyPRISM.util.fingerprint`) of
+        everything that defines the problem: site types, kT, densities,
+        diameters, the parameters of all potentials, closures and omegas,
+        the Domain, the solver and all arguments passed to it (e.g. tol and
+        the reference correlation functions cr0 and hk0).
+
+        When a System is solved through the cache, a matching entry (a *hit*)
+        is loaded directly into a new PRISM object instead of solving. If
+        there is no match, the cache looks for a *near-miss*: a stored
+        solution of a System with the same structure (types, closures,
+        potential and omega classes, domain size, ...) but different
+        continuous parameters (kT, densities, interaction strengths, ...).
+        The stored solution with the closest parameters is used as the
+        initial guess.
+
+        Each entry is stored as a compressed numpy archive. The total size
+        of the cache is bounded and the least recently used entries are
+        evicted first. The cache directory can be shared between sessions,
+        but not safely between simultaneously running processes.
+
+        Only successful solutions are stored, which requires a solver that
+        returns a scipy OptimizeResult (i.e. not
+        :func:`pyPRISM.core.PRISM.PRISM.solve_picard`).
+
+    Example
+    -------
+    .. code-block:: python
+
+        import pyPRISM
+
+        cache = pyPRISM.util.SolutionCache('prism_cache',max_size=2e9)
+
+        sys = pyPRISM.System(['A','B'],kT=1.0)
+        # ... fully specify the system ...
+
+        PRISM = sys.solve(cache=cache)  # solved and stored
+        PRISM = sys.solve(cache=cache)  # loaded from disk
+
+        sys.kT = 1.1
+        PRISM = sys.solve(cache=cache)  # warm-started from kT=1.0
+
+    '''
+    # arguments which do not change the solution
+    ignored = ('guess','callback','disp')
+
+    # stored parts of the solved state of a PRISM object
+    vectors = ('x','x2','x3','fun')
+    arrays = ('totalCorr','directCorr','directCorrForCost','GammaIn','GammaOut','referenceDirectCorr','referenceTotalCorr')
+
+    def __init__(self,directory,max_size=1e9,near_miss=True):
+        r'''Constructor
+
+        Arguments
+        ---------
+        directory: str
+            Path to the directory used to store the cache. This directory is
+            created if it does not exist.
+
+        max_size: float
+            Maximum total size of the stored solutions in bytes. Default is
+            1 GB.
+
+        near_miss: bool
+            If *True*, the closest stored solution of a structurally identical
+            System is used as an initial guess when there is no exact match.
+        '''
+        self.directory = directory
+        self.max_size = max_size
+        self.near_miss = near_miss
+        self.hits = 0
+        self.misses = 0
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        self.index_path = os.path.join(directory,'index.json')
+        if os.path.exists(self.index_path):
+            with open(self.index_path,'r') as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+
+    def __repr__(self):
+        return '<SolutionCache entries:{} size:{:d}>'.format(len(self),self.size)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self,key):
+        return key in self.index
+
+    @property
+    def size(self):
+        '''Total size of all stored solutions in bytes'''
+        return sum(entry['size'] for entry in self.index.values())
+
+    def key(self,system,solver='solve',*args,**kwargs):
+        '''Cache key of a System, the solver and the arguments of the solver
+
+        The arguments are completed with the defaults of the solver. The
+        initial guess, callbacks and display options do not change the
+        solution and are not part of the key.
+        '''
+        # imported here as pyPRISM.core.PRISM imports this module indirectly
+        from pyPRISM.core.PRISM import PRISM
+        signature = inspect.signature(getattr(PRISM,solver))
+        signature = signature.replace(parameters=list(signature.parameters.values())[1:])
+        return self._key(system,solver,self._bind(signature,args,kwargs).arguments)
+
+    def _key(self,system,solver,arguments):
+        settings = {name:value for name,value in arguments.items() if name not in self.ignored}
+        if isinstance(settings.get('options',None),dict):
+            settings['options'] = {name:value for name,value in settings['options'].items() if name not in self.ignored}
+        return fingerprint((system,solver,settings))
+
+    def _bind(self,signature,args,kwargs):
+        bound = signature.bind_partial(*args,**kwargs)
+        bound.apply_defaults()
+        return bound
+
+    def solve(self,system,*args,solver='solve',**kwargs):
+        r'''Solve a System using the cache
+
+        Arguments
+        ---------
+        system: pyPRISM.core.System
+            Fully specified System to solve
+
+        solver: str
+            Name of the :class:`pyPRISM.core.PRISM` method used to solve the
+            System if it is not found in the cache
+
+        args,kwargs:
+            All other arguments are passed to the solver method. Together
+            with the solver name, they are part of the cache key, so e.g. a
+            solution stored for a loose tolerance is not returned for a
+            tighter one.
+
+        Returns
+        -------
+        PRISM: pyPRISM.core.PRISM
+            **Solved** PRISM object. If the solution was loaded from the
+            cache, PRISM.minimize_result.message says so.
+        '''
+        PRISM = system.createPRISM()
+        method = getattr(PRISM,solver)
+        bound = self._bind(inspect.signature(method),args,kwargs)
+        arguments = bound.arguments
+        cr0 = arguments.get('cr0',None)
+        hk0 = arguments.get('hk0',None)
+
+        key = self._key(system,solver,arguments)
+        if self.load(key,PRISM):
+            self.hits += 1
+            return PRISM
+        self.misses += 1
+
+        if self.near_miss and ('guess' in arguments) and (arguments['guess'] is None):
+            arguments['guess'] = self.nearest(system,cr0,hk0)
+
+        method(*bound.args,**bound.kwargs)
+
+        result = PRISM.minimize_result
+        if getattr(result,'success',False):
+            self.store(key,system,PRISM,cr0,hk0)
+        return PRISM
+
+    def load(self,key,PRISM):
+        '''Load a stored solution into a PRISM object
+
+        The complete solved state (the inputs and output of the last call of
+        :func:`pyPRISM.core.PRISM.PRISM.cost` and all correlation functions)
+        is restored.
+
+        Returns
+        -------
+        found: bool
+            *False* if the key is not in the cache or the stored solution is
+            missing or unreadable. Such entries are removed from the index.
+        '''
+        if key not in self.index:
+            return False
+
+        try:
+            with np.load(self._path(key)) as data:
+                stored = {name:data[name] for name in data.files}
+            vectors = [stored[name] for name in self.vectors]
+            arrays = [(stored[name],Space(int(stored[name+'_space']))) for name in self.arrays]
+        except (OSError,KeyError,ValueError,zipfile.BadZipFile):
+            self._remove(key)
+            self._write_index()
+            return False
+
+        x,x2,x3,fun = vectors
+        rank = PRISM.sys.rank
+        PRISM.x1,PRISM.x2,PRISM.x3 = x,x2,x3
+        PRISM.y = fun.reshape((-1,rank,rank))
+        for name,(data,space) in zip(self.arrays,arrays):
+            MA = getattr(PRISM,name)
+            MA.data = data
+            MA.space = space
+        PRISM.minimize_result = OptimizeResult(x=x,fun=fun,success=True,status=0,message='Solution loaded from cache.',nit=0,nfev=0)
+
+        self.index[key]['access'] = time.time()
+        self._write_index()
+        return True
+
+    def nearest(self,system,cr0=None,hk0=None):
+        '''Stored solution of the closest structurally identical System
+
+        Returns
+        -------
+        guess: np.ndarray or None
+            Stored :math:`\\gamma` of the closest System, or None if no
+            structurally identical System is stored
+        '''
+        structure,params = self._structure(system,cr0,hk0)
+        best,best_distance = None,np.inf
+        for key,entry in self.index.items():
+            if entry['structure']!=structure:
+                continue
+            other = np.array(entry['parameters'])
+            scale = np.abs(params) + np.abs(other)
+            scale[scale==0] = 1.0
+            distance = np.linalg.norm((params-other)/scale)
+            if distance<best_distance:
+                best,best_distance = key,distance
+
+        if best is None:
+            return None
+
+        with np.load(self._path(best)) as data:
+            return data['x']
+
+    def store(self,key,system,PRISM,cr0=None,hk0=None):
+        '''Store a solved PRISM object and evict old entries if needed'''
+        path = self._path(key)
+        stored = dict(x=PRISM.minimize_result.x,x2=PRISM.x2,x3=PRISM.x3,fun=PRISM.minimize_result.fun)
+        for name in self.arrays:
+            MA = getattr(PRISM,name)
+            stored[name] = MA.data
+            stored[name+'_space'] = int(MA.space.value)
+        np.savez_compressed(path,**stored)
+        structure,params = self._structure(system,cr0,hk0)
+        self.index[key] = {
+            'structure':structure,
+            'parameters':params.tolist(),
+            'size':os.path.getsize(path),
+            'access':time.time(),
+        }
+        self._evict()
+        self._write_index()
+
+    def clear(self):
+        '''Remove all stored solutions'''
+        for key in list(self.index.keys()):
+            self._remove(key)
+        self._write_index()
+
+    def _structure(self,system,cr0,hk0):
+        return structure_fingerprint((system,cr0,hk0))
+
+    def _path(self,key):
+        return os.path.join(self.directory,key+'.npz')
+
+    def _remove(self,key):
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+        del self.index[key]
+
+    def _evict(self):
+        '''Remove least recently used entries until the cache fits in max_size'''
+        by_access = sorted(self.index.keys(),key=lambda key:self.index[key]['access'])
+        total = self.size
+        while (total>self.max_size) and by_access:
+            key = by_access.pop(0)
+            total -= self.index[key]['size']
+            self._remove(key)
+
+    def _write_index(self):
+        tmp = self.index_path + '.tmp'
+        with open(tmp,'w') as f:
+            json.dump(self.index,f)
+        os.replace(tmp,self.index_path)
@@ -1,5 +1,8 @@
 import warnings
 
+from pyPRISM.util.fingerprint import fingerprint
+from pyPRISM.util.SolutionCache import SolutionCache
+
 try:
     import pint
 except ImportError:
@@ -0,0 +1,123 @@
+#!python
+import hashlib
+import enum
+import functools
+import numpy as np
+
+def fingerprint(obj):
+    r'''Stable hash of a pyPRISM object and all of its parameters
+
+    Parameters
+    ----------
+    obj: object
+        Any pyPRISM object (e.g. a :class:`pyPRISM.core.System`), number,
+        string, array or container of these
+
+    Returns
+    -------
+    digest: str
+        Hexadecimal SHA-256 digest
+
+    **Description**
+
+        The object is walked recursively and every parameter that defines it
+        (class names, attributes, numbers, strings and the contents of numpy
+        arrays) is fed to a hash. Two objects with identical parameters
+        therefore have identical fingerprints across Python sessions and
+        machines. Unlike the built-in hash(), this does not depend on object
+        identity.
+
+        Objects are walked using their pickle state (__getstate__) so that
+        derived data which is not pickled (e.g. the grids of a
+        :class:`pyPRISM.core.Domain`) is not hashed. Objects whose pickle
+        state does not define them completely (e.g.
+        :class:`pyPRISM.omega.FromFile`, which depends on the contents of a
+        file) provide a _fingerprint_state method which is used instead.
+    '''
+    return _Fingerprint(obj).digest
+
+def structure_fingerprint(obj):
+    r'''Hash of the structure of a pyPRISM object and its continuous parameters
+
+    Parameters
+    ----------
+    obj: object
+        Any object accepted by :func:`fingerprint`
+
+    Returns
+    -------
+    digest: str
+        Hexadecimal SHA-256 digest of everything except floating point
+        values and array contents
+
+    parameters: np.ndarray
+        All floating point values encountered while walking the object, in
+        a stable order
+
+    **Description**
+
+        Objects which only differ in continuous parameters (e.g. kT, density
+        or interaction strength) have the same structure digest. The
+        returned parameters can then be used to measure how far apart two
+        such objects are.
+    '''
+    walk = _Fingerprint(obj)
+    return walk.structure_digest,np.array(walk.parameters,dtype=float)
+
+class _Fingerprint(object):
+    '''Recursively walk an object and accumulate its hashes'''
+    def __init__(self,obj):
+        self.full = hashlib.sha256()
+        self.structure = hashlib.sha256()
+        self.parameters = []
+        self._visit(obj)
+        self.digest = self.full.hexdigest()
+        self.structure_digest = self.structure.hexdigest()
+
+    def _token(self,value,structural=True):
+        value = value.encode('utf8') + b'\x00'
+        self.full.update(value)
+        if structural:
+            self.structure.update(value)
+
+    def _visit(self,obj):
+        if obj is None or isinstance(obj,(bool,np.bool_,str,enum.Enum)):
+            self._token(repr(obj))
+        elif isinstance(obj,(int,np.integer)):
+            self._token('int:'+repr(int(obj)))
+        elif isinstance(obj,(float,np.floating)):
+            self._token('float',structural=True)
+            self._token(repr(float(obj)),structural=False)
+            self.parameters.append(float(obj))
+        elif isinstance(obj,np.ndarray):
+            self._token('ndarray:{}:{}'.format(obj.dtype.str,obj.shape))
+            self.full.update(np.ascontiguousarray(obj).tobytes())
+        elif isinstance(obj,(list,tuple)):
+            self._token('{}:{}'.format(type(obj).__name__,len(obj)))
+            for item in obj:
+                self._visit(item)
+        elif isinstance(obj,dict):
+            self._token('dict:{}'.format(len(obj)))
+            for key in sorted(obj,key=repr):
+                self._visit(key)
+                self._visit(obj[key])
+        elif isinstance(obj,functools.partial):
+            self._token('partial')
+            self._visit(obj.func)
+            self._visit(obj.args)
+            self._visit(obj.keywords)
+        elif callable(obj) and not hasattr(obj,'__dict__'):
+            self._token('callable:{}.{}'.format(getattr(obj,'__module__',''),getattr(obj,'__qualname__',repr(obj))))
+        else:
+            cls = type(obj)
+            self._token('object:{}.{}'.format(cls.__module__,cls.__qualname__))
+            if hasattr(obj,'_fingerprint_state'):
+                state = obj._fingerprint_state()
+            elif hasattr(obj,'__getstate__'):
+                state = obj.__getstate__()
+            else:
+                state = getattr(obj,'__dict__',None)
+            if state is None:
+                self._token(repr(obj))
+            else:
+                self._visit(state)